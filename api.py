@@ -1,90 +1,226 @@
-from fastapi import FastAPI, UploadFile, File, Form
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Request, UploadFile, File, Form, Query, Header, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse, FileResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.background import BackgroundTask
+import asyncio
 import tempfile
 import os
 import json
-
-from utils.speech_to_text import transcribe_video
-from utils.eye_focus_detection import process_video_for_gaze
-from utils.transcript_evaluator import evaluate_transcript
+import socket
+
+from utils.inference_client import transcribe_video, iter_transcribe_video, evaluate_transcript, scheduler_stats, model_stats
+from utils.gaze_pool import run_gaze_analysis, shutdown_gaze_pool
+from utils.pipeline import process_candidate, load_payload, find_question, cleanup_temp, build_manifest, TRANSCRIBE_PROMPT
+from utils.live_interview import LiveInterviewSession
+from utils.results_store import try_save_result, query_results, get_result
+from utils.job_broker import submit_batch, get_batch
+from utils.job_worker import start_workers, stop_workers
+from utils.media_probe import MediaRejected
+from utils.proxy_media import prepare_media, release_media
+from utils.scheduler import priority_scope
+from utils.profiling import profile_requested, profile_request, list_profiles, profile_file, top_functions
+from utils.cancellation import (
+    Cancelled, CancelToken, JobConflict, JobNotFound, run_in_scope, register_job, unregister_job,
+    active_jobs, request_cancel, check_job_id
+)
+from utils.config import PAYLOAD_PATH, REQUEST_DEADLINE_SECONDS, CANCEL_POLL_SECONDS
 
 
 app = FastAPI(title="AI Interview Backend API")
 
 
+@app.on_event("startup")
+def startup():
+    # Worker broker: ikut mengerjakan batch yang di-submit ke node mana pun
+    start_workers()
+
+
+@app.on_event("shutdown")
+def shutdown():
+    stop_workers(timeout=5)
+    shutdown_gaze_pool()
+
+
 # ======================================================
-# Helpers
+# Cancellation helpers
 # ======================================================
-def load_payload(path="data/payload.json"):
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+def start_cancel_token(job_id, deadline_seconds, label):
+    """
+    Buat + daftarkan token untuk satu request. `job_id` dari header X-Job-ID
+    (untuk DELETE /jobs/{id}), deadline dari header X-Deadline-Seconds atau
+    REQUEST_DEADLINE_SECONDS. Pemanggil wajib `unregister_job` setelah selesai.
+
+    Returns:
+        (CancelToken, JSONResponse | None): Response 400/409 jika ID tidak bisa dipakai.
+    """
+    deadline = deadline_seconds if deadline_seconds is not None else REQUEST_DEADLINE_SECONDS
+    try:
+        return register_job(CancelToken(job_id, deadline, label=label)), None
+    except JobConflict as e:
+        return None, JSONResponse(status_code=409, content={"error": str(e)})
+    except ValueError as e:
+        return None, JSONResponse(status_code=400, content={"error": str(e)})
+
+
+def cancelled_response(token):
+    # 504 jika deadline habis; 499 (client closed request) untuk client putus / DELETE
+    status_code = 504 if token.reason == "deadline" else 499
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": f"Cancelled: {token.reason}", "job_id": token.id}
+    )
+
+
+async def run_cancellable(request, token, fn, *args):
+    """
+    Jalankan `fn` di threadpool dengan token aktif. Selama berjalan, koneksi client
+    dicek tiap CANCEL_POLL_SECONDS; jika putus, token dibatalkan dan kita tetap
+    menunggu `fn` selesai membereskan file sementaranya.
+    """
+    work = asyncio.ensure_future(run_in_threadpool(run_in_scope, token, fn, *args))
+    try:
+        while True:
+            done, _ = await asyncio.wait([work], timeout=CANCEL_POLL_SECONDS)
+            if done:
+                return work.result()
+            if not token.cancelled and await request.is_disconnected():
+                token.cancel("client_disconnected")
+    except asyncio.CancelledError:
+        token.cancel("server_shutdown")
+        raise
 
 
 # ======================================================
 # API: Single Processing
 # ======================================================
+def run_single_video(video_path, filename, enable_evaluator, profiled):
+    # Profil di thread yang menjalankan pipeline (cProfile per thread)
+    with profile_request(f"process_single:{filename}", profiled) as profile_id:
+        try:
+            result = process_single_video(video_path, filename, enable_evaluator, gaze_in_process=profile_id is not None)
+        except Cancelled:
+            cleanup_temp(video_path)
+            raise
+    return result, profile_id
+
+
 @app.post("/process/single")
 async def process_single(
+    request: Request,
     file: UploadFile = File(...),
-    enable_evaluator: bool = Form(True)
+    enable_evaluator: bool = Form(True),
+    profile: bool = Form(False),
+    x_profile: str = Header(None),
+    x_job_id: str = Header(None),
+    x_deadline_seconds: float = Header(None)
 ):
-    # -----------------------------
-    # Save temp video
-    # -----------------------------
-    suffix = "." + file.filename.split(".")[-1]
-    temp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-    temp.write(await file.read())
-    temp.flush()
-    temp.close()
+    token, error = start_cancel_token(x_job_id, x_deadline_seconds, f"process_single:{file.filename}")
+    if error is not None:
+        return error
 
-    video_path = temp.name
+    try:
+        # -----------------------------
+        # Save temp video
+        # -----------------------------
+        suffix = "." + file.filename.split(".")[-1]
+        temp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+        temp.write(await file.read())
+        temp.flush()
+        temp.close()
+
+        video_path = temp.name
+
+        # Profil opsional (header X-Profile: 1 atau form profile=true), lihat /debug/profiles
+        result, profile_id = await run_cancellable(
+            request, token, run_single_video,
+            video_path, file.filename, enable_evaluator, profile_requested(x_profile, profile)
+        )
+    except Cancelled:
+        return cancelled_response(token)
+    finally:
+        unregister_job(token)
 
-    # -----------------------------
-    # 1. Transcription
-    # -----------------------------
-    transcript_text = transcribe_video(
-        video_path,
-        prompt="This audio is an English HR interview. Transcribe clearly."
-    )
+    if isinstance(result, JSONResponse):
+        return result
 
-    # -----------------------------
-    # 2. Eye Focus
-    # -----------------------------
-    try:
-        gaze_result = process_video_for_gaze(video_path)
-    except Exception as e:
-        gaze_result = {"status": "failed", "error": str(e)}
+    try_save_result(result, source="single", file=file.filename)
+
+    if profile_id is not None:
+        result["profile_id"] = profile_id
+    return result
+
+
+def reject_media(video_path, error):
+    cleanup_temp(video_path)
+    return JSONResponse(status_code=422, content={"error": f"Media rejected: {error}"})
 
+
+def process_single_video(video_path, filename, enable_evaluator, gaze_in_process=False):
     # -----------------------------
-    # 3. Evaluator (optional)
+    # 0a. Validasi question ID (sebelum transkripsi/gaze, sama seperti endpoint stream)
     # -----------------------------
-    evaluation = None
+    question_id, question_text = None, None
     if enable_evaluator:
-
-        # extract question id
-        base = os.path.basename(file.filename)
+        base = os.path.basename(filename)
         try:
             question_id = int(base.split("_")[-1].split(".")[0])
-        except:
+        except ValueError:
             os.remove(video_path)
             return JSONResponse(
                 status_code=400,
                 content={"error": "Filename must contain question ID, e.g. video_12.mp4"}
             )
 
-        payload = load_payload()
-        items = payload["data"]["reviewChecklists"]["interviews"]
-
-        item = next((q for q in items if q["positionId"] == question_id), None)
+        item = find_question(load_payload(), question_id)
         if not item:
             os.remove(video_path)
             return JSONResponse(
                 status_code=400,
                 content={"error": f"Question ID {question_id} not found in payload"}
             )
-
         question_text = item["question"]
 
+    # -----------------------------
+    # 0b. Pre-flight probe
+    # -----------------------------
+    try:
+        media = prepare_media(video_path)
+    except MediaRejected as e:
+        return reject_media(video_path, e)
+    plan = media["plan"]
+
+    try:
+        # -----------------------------
+        # 1. Transcription
+        # -----------------------------
+        transcript_text = transcribe_video(
+            video_path,
+            prompt="This audio is an English HR interview. Transcribe clearly.",
+            audio_path=plan["audio_path"]
+        ) if plan["transcribe"] else ""
+
+        # -----------------------------
+        # 2. Eye Focus
+        # -----------------------------
+        try:
+            gaze_result = run_gaze_analysis(
+                plan["gaze_video"],
+                in_process=gaze_in_process,
+                fps=plan["gaze_fps"],
+                scale=plan["gaze_scale"]
+            )
+        except Cancelled:
+            raise
+        except Exception as e:
+            gaze_result = {"status": "failed", "error": str(e)}
+    finally:
+        release_media(media)
+
+    # -----------------------------
+    # 3. Evaluator (optional)
+    # -----------------------------
+    evaluation = None
+    if enable_evaluator:
         evaluation = evaluate_transcript(
             question_id=question_id,
             question=question_text,
@@ -97,15 +233,304 @@ async def process_single(
     return {
         "transcription": transcript_text,
         "evaluation": evaluation,
-        "eye_focus": gaze_result
+        "eye_focus": gaze_result,
+        "media": media
     }
 
 
+# ======================================================
+# API: Single Processing (streaming, Server-Sent Events)
+# ======================================================
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def iterate_cancellable(token, iterator):
+    """
+    Seperti `iterate_in_threadpool`, tapi setiap `next` berjalan dengan token aktif.
+    """
+    end = object()
+    while True:
+        item = await run_in_threadpool(run_in_scope, token, next, iterator, end)
+        if item is end:
+            return
+        yield item
+
+
+@app.post("/process/single/stream")
+async def process_single_stream(
+    file: UploadFile = File(...),
+    enable_evaluator: bool = Form(True),
+    x_job_id: str = Header(None),
+    x_deadline_seconds: float = Header(None)
+):
+    """
+    Sama seperti /process/single, tapi hasil dikirim bertahap lewat SSE:
+    `transcript` (per segmen), `transcription`, `eye_focus`, `evaluation`, `done`
+    (atau `cancelled` jika deadline habis / DELETE /jobs/{id}).
+    """
+    token, error = start_cancel_token(x_job_id, x_deadline_seconds, f"process_single_stream:{file.filename}")
+    if error is not None:
+        return error
+
+    video_path = None
+    media = None
+    # Setelah events() mulai, file dihapus oleh `finish` (menunggu gaze berhenti)
+    state = {"started": False}
+
+    def abandon():
+        release_media(media)
+        if video_path is not None:
+            cleanup_temp(video_path)
+        unregister_job(token)
+
+    try:
+        suffix = "." + file.filename.split(".")[-1]
+        temp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+        temp.write(await file.read())
+        temp.flush()
+        temp.close()
+
+        video_path = temp.name
+
+        # Validasi question ID sebelum stream dimulai, supaya error tetap 400
+        question_id, question_text = None, None
+        if enable_evaluator:
+            base = os.path.basename(file.filename)
+            try:
+                question_id = int(base.split("_")[-1].split(".")[0])
+            except ValueError:
+                abandon()
+                return JSONResponse(
+                    status_code=400,
+                    content={"error": "Filename must contain question ID, e.g. video_12.mp4"}
+                )
+
+            item = find_question(load_payload(), question_id)
+            if not item:
+                abandon()
+                return JSONResponse(
+                    status_code=400,
+                    content={"error": f"Question ID {question_id} not found in payload"}
+                )
+            question_text = item["question"]
+
+        # Probe + proxy sebelum stream dimulai: file yang ditolak langsung 422
+        try:
+            media = await run_in_threadpool(prepare_media, video_path)
+        except MediaRejected as e:
+            unregister_job(token)
+            return reject_media(video_path, e)
+        plan = media["plan"]
+    except BaseException:
+        abandon()
+        raise
+
+    def finish(gaze_task):
+        # Setelah gaze selesai (atau berhenti karena dibatalkan) file aman dihapus
+        if not gaze_task.cancelled():
+            gaze_task.exception()
+        release_media(media)
+        cleanup_temp(video_path)
+        unregister_job(token)
+
+    def cleanup_if_not_started():
+        # Client putus sebelum StreamingResponse mulai iterasi: events() tidak pernah jalan
+        if not state["started"]:
+            abandon()
+
+    async def events():
+        state["started"] = True
+        finished = False
+
+        # Eye focus jalan paralel dengan transkripsi
+        gaze_task = asyncio.ensure_future(run_in_threadpool(
+            run_in_scope,
+            token,
+            run_gaze_analysis,
+            plan["gaze_video"],
+            fps=plan["gaze_fps"],
+            scale=plan["gaze_scale"]
+        ))
+        try:
+            texts = []
+            if plan["transcribe"]:
+                segments = iter_transcribe_video(video_path, prompt=TRANSCRIBE_PROMPT, audio_path=plan["audio_path"])
+                async for segment in iterate_cancellable(token, segments):
+                    texts.append(segment["text"])
+                    yield sse_event("transcript", segment)
+
+            transcript_text = " ".join(texts)
+            yield sse_event("transcription", {"transcription": transcript_text})
+
+            try:
+                gaze_result = await gaze_task
+            except Cancelled:
+                raise
+            except Exception as e:
+                gaze_result = {"status": "failed", "error": str(e)}
+            yield sse_event("eye_focus", gaze_result)
+
+            evaluation = None
+            if enable_evaluator:
+                evaluation = await run_in_threadpool(
+                    run_in_scope,
+                    token,
+                    evaluate_transcript,
+                    question_id=question_id,
+                    question=question_text,
+                    answer=transcript_text
+                )
+                yield sse_event("evaluation", evaluation)
+
+            result = {
+                "transcription": transcript_text,
+                "evaluation": evaluation,
+                "eye_focus": gaze_result,
+                "media": media
+            }
+            await run_in_threadpool(try_save_result, result, source="single", question_id=question_id, file=file.filename)
+            finished = True
+            yield sse_event("done", result)
+
+        except Cancelled:
+            yield sse_event("cancelled", {"job_id": token.id, "reason": token.reason})
+
+        except Exception as e:
+            yield sse_event("error", {"error": str(e)})
+
+        finally:
+            # Client putus (generator dibatalkan) atau error: hentikan gaze yang masih jalan
+            if not finished:
+                token.cancel("stream_closed")
+            # Jangan await di sini (task bisa sedang dibatalkan); hapus file setelah gaze berhenti
+            gaze_task.add_done_callback(finish)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        background=BackgroundTask(cleanup_if_not_started)
+    )
+
+
+# ======================================================
+# API: Live Interview (WebSocket)
+# ======================================================
+@app.websocket("/ws/interview")
+async def live_interview(websocket: WebSocket):
+    """
+    Protokol:
+      1. Client kirim JSON {"type": "start", "fps": 30, "question_id": 1, "enable_evaluator": true}
+      2. Selama interview, pesan binary:
+           b"F" + JPEG/PNG  -> satu frame webcam
+           b"A" + PCM s16le -> audio mono 16 kHz
+      3. Client kirim JSON {"type": "end"}
+
+    Server mengirim {"type": "gaze"} saat arah pandang berubah,
+    {"type": "suspicious_event"}, {"type": "transcript"} per chunk audio,
+    lalu {"type": "report"} dengan format sama seperti /process/single.
+    Pesan yang tidak bisa diproses (frame rusak, audio tidak valid) dibalas
+    {"type": "error"} dan sesi berjalan terus.
+    """
+    await websocket.accept()
+    session = None
+
+    try:
+        start = await websocket.receive_json()
+        if start.get("type") != "start":
+            await websocket.send_json({"type": "error", "error": "First message must be {\"type\": \"start\"}"})
+            await websocket.close()
+            return
+
+        question_id = start.get("question_id")
+        question_text = None
+        if question_id is not None:
+            try:
+                question_id = int(question_id)
+            except (TypeError, ValueError):
+                await websocket.send_json({"type": "error", "error": f"Invalid question_id: {question_id!r}"})
+                await websocket.close()
+                return
+
+            item = find_question(load_payload(), question_id)
+            if not item:
+                await websocket.send_json({"type": "error", "error": f"Question ID {question_id} not found in payload"})
+                await websocket.close()
+                return
+            question_text = item["question"]
+
+        session = await run_in_threadpool(
+            LiveInterviewSession,
+            fps=start.get("fps", 30),
+            question_id=question_id,
+            question=question_text,
+            enable_evaluator=start.get("enable_evaluator", True)
+        )
+        await websocket.send_json({"type": "ready"})
+
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+
+            data = message.get("bytes")
+            if data:
+                kind, body = data[:1], data[1:]
+                # Satu frame/audio rusak tidak mengakhiri sesi: kirim error, lanjut ke pesan berikutnya
+                frame = None
+                try:
+                    if kind == b"F":
+                        frame = await run_in_threadpool(session.add_frame, body)
+                    elif kind == b"A":
+                        session.add_audio(body)
+                except Exception as e:
+                    await websocket.send_json({"type": "error", "error": f"{type(e).__name__}: {e}"})
+
+                if frame is not None:
+                    if frame["changed"]:
+                        await websocket.send_json({"type": "gaze", **frame})
+                    if frame["event"]:
+                        await websocket.send_json({"type": "suspicious_event", **frame["event"]})
+
+                for segment in session.pop_transcripts():
+                    await websocket.send_json({"type": "transcript", **segment})
+                continue
+
+            text = message.get("text")
+            try:
+                end = bool(text) and json.loads(text).get("type") == "end"
+            except (ValueError, AttributeError):
+                await websocket.send_json({"type": "error", "error": "Text message must be JSON, e.g. {\"type\": \"end\"}"})
+                continue
+            if end:
+                break
+
+        report = await run_in_threadpool(session.finish)
+        await run_in_threadpool(try_save_result, report, source="live", question_id=question_id)
+        for segment in session.pop_transcripts():
+            await websocket.send_json({"type": "transcript", **segment})
+        await websocket.send_json({"type": "report", **report})
+        await websocket.close()
+
+    except WebSocketDisconnect:
+        pass
+
+    finally:
+        if session is not None:
+            session.close()
+
+
 # ======================================================
 # API: Batch Processing (folder inside container)
 # ======================================================
 @app.post("/process/batch")
 def process_batch(folder_path: str = Form(...)):
+    # Berprioritas batch: request interaktif tidak antre di belakang folder ini
+    with priority_scope("batch"):
+        return process_batch_folder(folder_path)
+
+
+def process_batch_folder(folder_path):
 
     if not os.path.exists(folder_path):
         return {"error": "Folder not found"}
@@ -136,12 +561,28 @@ def process_batch(folder_path: str = Form(...)):
         tmp.flush()
         tmp.close()
 
+        # ---- pre-flight probe ----
+        try:
+            media = prepare_media(tmp.name)
+        except MediaRejected as e:
+            results.append({"file": f, "error": f"Media rejected: {e}"})
+            os.remove(tmp.name)
+            continue
+        plan = media["plan"]
+
         # ---- main process ----
-        transcript = transcribe_video(tmp.name)
         try:
-            gaze = process_video_for_gaze(tmp.name)
-        except:
-            gaze = None
+            transcript = transcribe_video(tmp.name, audio_path=plan["audio_path"]) if plan["transcribe"] else ""
+            try:
+                gaze = run_gaze_analysis(
+                    plan["gaze_video"],
+                    fps=plan["gaze_fps"],
+                    scale=plan["gaze_scale"]
+                )
+            except:
+                gaze = None
+        finally:
+            release_media(media)
 
         items = payload["data"]["reviewChecklists"]["interviews"]
         item = next((q for q in items if q["positionId"] == qid), None)
@@ -155,13 +596,243 @@ def process_batch(folder_path: str = Form(...)):
         else:
             eval_result = None
 
-        results.append({
+        result = {
             "file": f,
             "transcript": transcript,
             "evaluation": eval_result,
-            "eye_focus": gaze
-        })
+            "eye_focus": gaze,
+            "media": media
+        }
+        results.append(result)
+        try_save_result(
+            result,
+            source="batch",
+            candidate_id=payload.get("data", {}).get("id"),
+            question_id=qid,
+            file=f
+        )
 
         os.remove(tmp.name)
 
     return {"results": results}
+
+
+# ======================================================
+# API: Distributed Batch (dibagi ke semua node lewat broker)
+# ======================================================
+@app.post("/process/batch/distributed")
+def process_batch_distributed(
+    folder_path: str = Form(...),
+    payload_path: str = Form(None)
+):
+    """
+    Masukkan video di folder ke antrean bersama. Folder dan payload harus ada
+    di volume yang sama path-nya di semua node. Pantau lewat GET /process/batch/{batch_id}.
+    """
+    if not os.path.isdir(folder_path):
+        return JSONResponse(status_code=400, content={"error": "Folder not found"})
+
+    payload_path = payload_path or PAYLOAD_PATH
+    if not os.path.exists(payload_path):
+        return JSONResponse(status_code=400, content={"error": f"Payload not found: {payload_path}"})
+
+    manifest = build_manifest(folder_path)
+    batch_id = submit_batch(
+        manifest,
+        folder_path,
+        payload_path=os.path.abspath(payload_path),
+        submitted_by=socket.gethostname()
+    )
+
+    return {
+        "batch_id": batch_id,
+        "queued": sum(1 for e in manifest if "skip_reason" not in e),
+        "skipped": [e["file"] for e in manifest if "skip_reason" in e]
+    }
+
+
+@app.get("/process/batch/{batch_id}")
+def read_batch(batch_id: str, include_results: bool = Query(False)):
+    batch = get_batch(batch_id, include_results=include_results)
+    if batch is None:
+        return JSONResponse(status_code=404, content={"error": f"Batch {batch_id} not found"})
+    return batch
+
+
+# ======================================================
+# API: Candidate Processing (semua pertanyaan sekaligus)
+# ======================================================
+@app.post("/process/candidate")
+def process_candidate_endpoint(
+    payload_file: UploadFile = File(None),
+    payload_path: str = Form(None),
+    enable_evaluator: bool = Form(True)
+):
+    # Payload bisa di-upload langsung, atau path file di dalam container
+    if payload_file is not None:
+        try:
+            payload = json.loads(payload_file.file.read())
+        except ValueError:
+            return JSONResponse(status_code=400, content={"error": "Payload file is not valid JSON"})
+        base_path = PAYLOAD_PATH
+    else:
+        base_path = payload_path or PAYLOAD_PATH
+        if not os.path.exists(base_path):
+            return JSONResponse(status_code=400, content={"error": f"Payload not found: {base_path}"})
+        payload = load_payload(base_path)
+
+    try:
+        payload["data"]["reviewChecklists"]["interviews"]
+    except (KeyError, TypeError):
+        return JSONResponse(
+            status_code=400,
+            content={"error": "Payload must contain data.reviewChecklists.interviews"}
+        )
+
+    response = process_candidate(
+        payload,
+        payload_path=base_path,
+        enable_evaluator=enable_evaluator
+    )
+
+    for result in response["results"]:
+        try_save_result(
+            result,
+            source="candidate",
+            candidate_id=response["candidate_id"],
+            question_id=result["question_id"],
+            file=result.get("video")
+        )
+
+    return response
+
+
+# ======================================================
+# API: Stored Results
+# ======================================================
+@app.get("/results")
+def list_results(
+    candidate_id: int = Query(None),
+    question_id: int = Query(None),
+    min_score: float = Query(None),
+    max_score: float = Query(None),
+    min_focus: float = Query(None),
+    max_focus: float = Query(None),
+    processed_from: str = Query(None, description="ISO time, e.g. 2025-08-01 or 2025-08-01T10:00:00Z"),
+    processed_to: str = Query(None),
+    source: str = Query(None),
+    order_by: str = Query("processed_at"),
+    descending: bool = Query(True),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0)
+):
+    try:
+        return query_results(
+            candidate_id=candidate_id,
+            question_id=question_id,
+            min_score=min_score,
+            max_score=max_score,
+            min_focus=min_focus,
+            max_focus=max_focus,
+            processed_from=processed_from,
+            processed_to=processed_to,
+            source=source,
+            order_by=order_by,
+            descending=descending,
+            limit=limit,
+            offset=offset
+        )
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+
+
+@app.get("/results/{result_id}")
+def read_result(result_id: int):
+    result = get_result(result_id)
+    if result is None:
+        return JSONResponse(status_code=404, content={"error": f"Result {result_id} not found"})
+    return result
+
+
+# ======================================================
+# API: Jobs (cancellation)
+# ======================================================
+@app.get("/jobs")
+def list_jobs():
+    """
+    Request /process/single yang sedang berjalan di worker API ini.
+    """
+    return {"jobs": active_jobs()}
+
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    """
+    Batalkan request dengan X-Job-ID `job_id`. Jika job berjalan di worker uvicorn
+    lain, pembatalan diteruskan lewat CANCEL_DIR (202, berlaku dalam CANCEL_POLL_SECONDS).
+    404 jika tidak ada job berjalan dengan ID itu.
+    """
+    try:
+        check_job_id(job_id)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+
+    try:
+        status = request_cancel(job_id)
+    except JobNotFound:
+        return JSONResponse(status_code=404, content={"error": f"Job {job_id} tidak sedang berjalan"})
+    return JSONResponse(
+        status_code=200 if status == "cancelled" else 202,
+        content={"job_id": job_id, "status": status}
+    )
+
+
+# ======================================================
+# API: Scheduler Metrics
+# ======================================================
+@app.get("/metrics/scheduler")
+def read_scheduler_metrics():
+    """
+    Per stage (whisper, gaze, llm) dan prioritas: depth (menunggu), active,
+    completed, avg_wait_ms, max_wait_ms. Angka per proses API/inference server.
+    """
+    return scheduler_stats()
+
+
+@app.get("/metrics/models")
+def read_model_metrics():
+    """
+    Per model (whisper, mpnet, llm): loaded, in_use, idle_seconds, loads,
+    last_load_seconds, unloads per alasan (idle / memory_pressure), plus memori tersedia.
+    """
+    return model_stats()
+
+
+# ======================================================
+# API: Debug Profiles
+# ======================================================
+@app.get("/debug/profiles")
+def debug_list_profiles():
+    return {"profiles": list_profiles()}
+
+
+@app.get("/debug/profiles/{profile_id}")
+def debug_profile_summary(profile_id: str, sort: str = Query("cumulative"), limit: int = Query(30, ge=1, le=500)):
+    try:
+        summary = top_functions(profile_id, limit=limit, sort=sort)
+    except KeyError:
+        return JSONResponse(status_code=400, content={"error": f"Invalid sort key: {sort}"})
+    if summary is None:
+        return JSONResponse(status_code=404, content={"error": f"Profile {profile_id} not found"})
+    return PlainTextResponse(summary)
+
+
+@app.get("/debug/profiles/{profile_id}/{kind}")
+def debug_download_profile(profile_id: str, kind: str):
+    """
+    Unduh artefak: `pstats` (snakeviz / pstats) atau `collapsed` (flamegraph.pl / speedscope).
+    """
+    path = profile_file(profile_id, kind)
+    if path is None:
+        return JSONResponse(status_code=404, content={"error": f"Profile {profile_id}/{kind} not found"})
+    return FileResponse(path, filename=os.path.basename(path), media_type="application/octet-stream")
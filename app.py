@@ -1,13 +1,15 @@
 import streamlit as st
 import requests
 import os
+import math
+import time
 
 API_URL = os.getenv("API_URL", "http://capstone_api:8000")
 
 st.set_page_config(page_title="AI Interview UI", layout="wide")
 
 st.sidebar.title("Menu")
-mode = st.sidebar.radio("Mode:", ["Single Processing", "Batch Processing"])
+mode = st.sidebar.radio("Mode:", ["Single Processing", "Batch Processing", "Stored Results"])
 
 
 # ======================================================
@@ -107,6 +109,96 @@ if mode == "Single Processing":
 
                 st.markdown("### 🔍 Reasoning")
                 st.write(eval_data["reason"])
+                if eval_data.get("tier"):
+                    st.caption(f"Scored by: {eval_data['tier']}")
+
+# ======================================================
+# Batch helpers
+# ======================================================
+PAGE_SIZES = [10, 25, 50, 100]
+SORT_COLUMNS = ["File", "Score", "Focus (%)", "Suspicious Events", "Status"]
+
+
+def item_score(item):
+    evaluation = item.get("evaluation")
+    if isinstance(evaluation, dict):
+        return evaluation.get("score")
+    return None
+
+
+def item_focus(item):
+    focus = item.get("eye_focus")
+    if isinstance(focus, dict) and focus.get("status", "success") == "success":
+        return focus
+    return None
+
+
+def item_status(item):
+    if item_focus(item) is None:
+        return "gaze failed"
+    if item.get("evaluation") is None:
+        return "no evaluation"
+    return "ok"
+
+
+@st.cache_data(show_spinner=False)
+def build_summary(batch_key, _results):
+    # `_results` tidak di-hash; cache dikunci dengan batch_key
+    rows = []
+    for idx, item in enumerate(_results):
+        focus = item_focus(item)
+        rows.append({
+            "#": idx,
+            "File": item.get("file"),
+            "Score": item_score(item),
+            "Focus (%)": focus.get("focus_percentage") if focus else None,
+            "Suspicious Events": focus.get("suspicious_event_count") if focus else None,
+            "Status": item_status(item),
+        })
+    return rows
+
+
+def sort_rows(rows, column, descending):
+    # Nilai kosong (item gagal) selalu di akhir
+    present = [r for r in rows if r[column] is not None]
+    missing = [r for r in rows if r[column] is None]
+    return sorted(present, key=lambda r: r[column], reverse=descending) + missing
+
+
+def render_batch_item(item, idx):
+    st.write("#### 🧠 Evaluation")
+    evaluation = item.get("evaluation")
+    if isinstance(evaluation, dict):
+        st.metric("Score", evaluation.get("score", "-"))
+        st.write("Reason:", evaluation.get("reason", "-"))
+        if evaluation.get("tier"):
+            st.caption(f"Scored by: {evaluation['tier']}")
+    else:
+        st.warning("Evaluation not available for this item.")
+
+    st.write("#### 👁️ Eye Focus Analysis")
+    focus = item_focus(item)
+    if focus is None:
+        error = (item.get("eye_focus") or {}).get("error") or item.get("error", "unknown error")
+        st.error(f"Eye focus analysis failed: {error}")
+    else:
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Focus %", f"{focus['focus_percentage']:.2f}%")
+        col2.metric("Left Glance %", f"{focus['left_glance_percentage']:.2f}%")
+        col3.metric("Right Glance %", f"{focus['right_glance_percentage']:.2f}%")
+
+        st.write("Suspicious Events:", focus["suspicious_event_count"])
+        if focus["suspicious_events_list"]:
+            st.write(focus["suspicious_events_list"])
+        else:
+            st.write("No suspicious events.")
+
+        st.write("Summary:", focus["summary_note_cv"])
+
+    # Transkrip hanya dirender jika diminta
+    if st.toggle("📝 Show transcript", key=f"transcript_{idx}"):
+        st.write(item.get("transcript") or "-")
+
 
 # ======================================================
 # MODE 2 — Batch Processing
@@ -130,48 +222,111 @@ if mode == "Batch Processing":
         if res.status_code != 200:
             st.error(res.text)
         else:
-            data = res.json()
-            results = data.get("results", [])
-
-            st.subheader("📊 Batch Processing Results")
-
-            # Summary Table (file, score, focus %, suspicious count)
-            st.write("### Summary Table")
+            # Simpan hasil di session supaya rerun (sort, pindah halaman) tidak memanggil API lagi
+            st.session_state["batch_results"] = res.json().get("results", [])
+            st.session_state["batch_key"] = f"{folder_path}:{time.time()}"
+            st.session_state["batch_page"] = 1
+
+    results = st.session_state.get("batch_results")
+
+    if results is not None:
+        st.subheader("📊 Batch Processing Results")
+
+        rows = build_summary(st.session_state["batch_key"], results)
+        failed = sum(1 for r in rows if r["Status"] != "ok")
+        st.caption(f"{len(rows)} items, {failed} with missing evaluation or eye focus.")
+
+        # Summary Table (paginated & sortable)
+        st.write("### Summary Table")
+
+        col1, col2, col3 = st.columns(3)
+        sort_column = col1.selectbox("Sort by", SORT_COLUMNS)
+        descending = col2.checkbox("Descending", value=sort_column != "File")
+        page_size = col3.selectbox("Rows per page", PAGE_SIZES, index=1)
+
+        total_pages = max(1, math.ceil(len(rows) / page_size))
+        if st.session_state.get("batch_page", 1) > total_pages:
+            st.session_state["batch_page"] = total_pages
+        page = st.number_input(
+            f"Page (1-{total_pages})",
+            min_value=1,
+            max_value=total_pages,
+            key="batch_page"
+        )
+
+        page_rows = sort_rows(rows, sort_column, descending)[(page - 1) * page_size:page * page_size]
+        st.dataframe(
+            [{k: v for k, v in r.items() if k != "#"} for r in page_rows],
+            use_container_width=True
+        )
+
+        # Detailed per row (hanya halaman ini)
+        st.write("### Detailed Breakdown")
+
+        for row in page_rows:
+            item = results[row["#"]]
+            icon = "📁" if row["Status"] == "ok" else "⚠️"
+            with st.expander(f"{icon} {row['File']}"):
+                render_batch_item(item, row["#"])
 
-            summary_rows = []
-            for item in results:
-                summary_rows.append({
-                    "File": item["file"],
-                    "Score": item["evaluation"]["score"],
-                    "Focus (%)": item["eye_focus"]["focus_percentage"],
-                    "Suspicious Events": item["eye_focus"]["suspicious_event_count"]
-                })
-
-            st.dataframe(summary_rows)
-
-            # Detailed per row
-            st.write("### Detailed Breakdown")
-
-            for item in results:
-                with st.expander(f"📁 {item['file']}"):
-                    st.write("#### 📝 Transcript")
-                    st.write(item["transcript"])
-
-                    st.write("#### 🧠 Evaluation")
-                    st.metric("Score", item["evaluation"]["score"])
-                    st.write("Reason:", item["evaluation"]["reason"])
-
-                    st.write("#### 👁️ Eye Focus Analysis")
-                    col1, col2, col3 = st.columns(3)
-                    col1.metric("Focus %", f"{item['eye_focus']['focus_percentage']:.2f}%")
-                    col2.metric("Left Glance %", f"{item['eye_focus']['left_glance_percentage']:.2f}%")
-                    col3.metric("Right Glance %", f"{item['eye_focus']['right_glance_percentage']:.2f}%")
-
-                    st.write("Suspicious Events:", item["eye_focus"]["suspicious_event_count"])
-                    if item["eye_focus"]["suspicious_events_list"]:
-                        st.write(item["eye_focus"]["suspicious_events_list"])
-                    else:
-                        st.write("No suspicious events.")
-
-                    st.write("Summary:", item["eye_focus"]["summary_note_cv"])
 
+# ======================================================
+# MODE 3 — Stored Results (tanpa menjalankan ulang inference)
+# ======================================================
+if mode == "Stored Results":
+    st.title("🗄️ Stored Results")
+
+    col1, col2, col3, col4 = st.columns(4)
+    candidate_id = col1.text_input("Candidate ID")
+    question_id = col2.text_input("Question ID")
+    min_score = col3.number_input("Min score", min_value=0, max_value=4, value=0)
+    min_focus = col4.number_input("Min focus %", min_value=0.0, max_value=100.0, value=0.0)
+
+    col1, col2, col3 = st.columns(3)
+    order_by = col1.selectbox("Sort by", ["processed_at", "score", "focus_percentage", "candidate_id", "question_id"])
+    descending = col2.checkbox("Descending", value=True, key="stored_desc")
+    page_size = col3.selectbox("Rows per page", PAGE_SIZES, index=1, key="stored_page_size")
+
+    page = st.number_input("Page", min_value=1, value=1, key="stored_page")
+
+    params = {
+        "order_by": order_by,
+        "descending": str(descending).lower(),
+        "limit": page_size,
+        "offset": (page - 1) * page_size,
+    }
+    if candidate_id.strip():
+        params["candidate_id"] = candidate_id.strip()
+    if question_id.strip():
+        params["question_id"] = question_id.strip()
+    if min_score > 0:
+        params["min_score"] = min_score
+    if min_focus > 0:
+        params["min_focus"] = min_focus
+
+    res = requests.get(f"{API_URL}/results", params=params)
+    if res.status_code != 200:
+        st.error(res.text)
+        st.stop()
+
+    data = res.json()
+    st.caption(f"{data['total']} results, page {page} of {max(1, math.ceil(data['total'] / page_size))}")
+    st.dataframe(data["items"], use_container_width=True)
+
+    if data["items"]:
+        result_id = st.selectbox("Result detail", [item["id"] for item in data["items"]])
+        if st.button("Load detail"):
+            detail = requests.get(f"{API_URL}/results/{result_id}")
+            if detail.status_code != 200:
+                st.error(detail.text)
+                st.session_state.pop("stored_detail", None)
+            else:
+                item = detail.json()
+                item["transcript"] = item.get("transcription")
+                st.session_state["stored_detail"] = item
+
+        # Disimpan di session_state: toggle di dalam detail memicu rerun, dan tombol
+        # "Load detail" bernilai False di rerun itu
+        item = st.session_state.get("stored_detail")
+        if item is not None and item["id"] == result_id:
+            render_batch_item(item, f"stored_{result_id}")
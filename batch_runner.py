@@ -0,0 +1,190 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from utils.config import BASE_DIR, PAYLOAD_PATH, BATCH_WORKERS
+from utils.pipeline import (
+    load_payload, find_question, copy_to_temp, cleanup_temp,
+    process_video, aggregate_results, build_manifest
+)
+from utils.scheduler import priority_scope
+
+
+# =============================
+# MANIFEST
+# =============================
+def file_key(entry):
+    # File yang diganti (ukuran/mtime berubah) dianggap file baru
+    return f"{entry['file']}:{entry['size']}:{entry['mtime']}"
+
+
+# =============================
+# CHECKPOINT (JSONL)
+# =============================
+class Checkpoint:
+    """
+    File JSONL append-only: satu baris per video yang selesai diproses.
+    Ditulis + fsync per baris supaya tetap utuh jika proses mati.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def load(self):
+        records = {}
+        if not os.path.exists(self.path):
+            return records
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Baris terakhir terpotong saat crash: abaikan
+                    continue
+                records[record["key"]] = record
+        return records
+
+    def append(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self.lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+
+# =============================
+# PROCESS
+# =============================
+def process_entry(entry, payload):
+    record = {
+        "key": file_key(entry),
+        "file": entry["file"],
+        "question_id": entry["question_id"],
+    }
+
+    item = find_question(payload, entry["question_id"])
+    if item is None:
+        record.update({"status": "failed", "error": f"Question ID {entry['question_id']} tidak ditemukan di payload"})
+        return record
+
+    started = time.time()
+    temp_video = None
+    try:
+        # File yang hilang/tidak terbaca sejak manifest dibuat = baris gagal, bukan batch berhenti
+        temp_video = copy_to_temp(entry["path"])
+        with priority_scope("batch"):
+            output = process_video(
+                temp_video,
+                question_id=entry["question_id"],
+                question=item["question"]
+            )
+        record.update({"status": "success", **output})
+    except Exception as e:
+        record.update({"status": "failed", "error": f"{type(e).__name__}: {e}"})
+    finally:
+        if temp_video is not None:
+            cleanup_temp(temp_video)
+
+    record["elapsed_seconds"] = round(time.time() - started, 2)
+    return record
+
+
+def run_batch(folder_path, output_dir, workers=BATCH_WORKERS, payload_path=PAYLOAD_PATH, retry_failed=True):
+    os.makedirs(output_dir, exist_ok=True)
+
+    manifest = build_manifest(folder_path)
+    with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump({"folder": os.path.abspath(folder_path), "files": manifest}, f, indent=2, ensure_ascii=False)
+
+    checkpoint = Checkpoint(os.path.join(output_dir, "checkpoint.jsonl"))
+    done = checkpoint.load()
+
+    def is_done(entry):
+        record = done.get(file_key(entry))
+        if record is None:
+            return False
+        return record["status"] == "success" or not retry_failed
+
+    runnable = [e for e in manifest if "skip_reason" not in e]
+    pending = [e for e in runnable if not is_done(e)]
+
+    print(f"📦 {len(manifest)} video, {len(runnable) - len(pending)} sudah selesai, {len(pending)} diproses dengan {workers} worker.")
+    for entry in manifest:
+        if "skip_reason" in entry:
+            print(f"⚠️ Dilewati: {entry['file']} ({entry['skip_reason']})")
+
+    payload = load_payload(payload_path)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {executor.submit(process_entry, entry, payload): entry for entry in pending}
+            for count, future in enumerate(as_completed(futures), start=1):
+                record = future.result()
+                checkpoint.append(record)
+                done[record["key"]] = record
+
+                status = "✅" if record["status"] == "success" else "❌"
+                print(f"{status} [{count}/{len(pending)}] {record['file']} ({record.get('elapsed_seconds', 0)} s)")
+
+    # Laporan akhir hanya untuk file di manifest saat ini
+    results = [done[file_key(e)] for e in runnable if file_key(e) in done]
+    report = {
+        "folder": os.path.abspath(folder_path),
+        "summary": {
+            **aggregate_results(results),
+            "failed": sum(1 for r in results if r["status"] != "success"),
+            "skipped": len(manifest) - len(runnable),
+        },
+        "results": results,
+    }
+
+    report_path = os.path.join(output_dir, "report.json")
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"\n📄 Laporan: {report_path}")
+    return report
+
+
+# =============================
+# ENTRYPOINT
+# =============================
+def main():
+    parser = argparse.ArgumentParser(description="Batch evaluator yang bisa dilanjutkan (resumable) dan paralel.")
+    parser.add_argument("folder", help="Folder berisi video question_<id>.*")
+    parser.add_argument("--output", help="Folder manifest/checkpoint/report (default: data/batch_runs/<nama folder>)")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="Jumlah video yang diproses bersamaan")
+    parser.add_argument("--payload", default=PAYLOAD_PATH, help="Path payload.json")
+    parser.add_argument("--no-retry-failed", action="store_true", help="Jangan ulangi file yang gagal di run sebelumnya")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.folder):
+        print(f"❌ Folder tidak ditemukan: {args.folder}")
+        sys.exit(1)
+
+    output_dir = args.output or os.path.join(
+        BASE_DIR, "data", "batch_runs", os.path.basename(os.path.normpath(args.folder))
+    )
+
+    report = run_batch(
+        args.folder,
+        output_dir,
+        workers=args.workers,
+        payload_path=args.payload,
+        retry_failed=not args.no_retry_failed
+    )
+    print(json.dumps(report["summary"], indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
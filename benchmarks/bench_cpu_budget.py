@@ -0,0 +1,66 @@
+"""
+Benchmark throughput pipeline (transkripsi + gaze + evaluasi) terhadap concurrency.
+
+Usage:
+    python -m benchmarks.bench_cpu_budget <video> [<video> ...] [--concurrency 1,2,4,8] [--no-eval]
+
+Jalankan dua kali untuk membandingkan dengan dan tanpa CPU budget:
+    CPU_BUDGET_ENABLED=0 python -m benchmarks.bench_cpu_budget assets/videos/*.webm
+    CPU_BUDGET_ENABLED=1 python -m benchmarks.bench_cpu_budget assets/videos/*.webm
+"""
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.config import CPU_BUDGET_ENABLED
+from utils.cpu_budget import stage_budgets
+from utils.pipeline import copy_to_temp, cleanup_temp, process_video
+
+
+def run_one(video_path, enable_evaluator):
+    temp_video = copy_to_temp(video_path)
+    try:
+        # question_id 1 hanya dipakai agar stage evaluator ikut berjalan
+        process_video(
+            temp_video,
+            question_id=1 if enable_evaluator else None,
+            question="Benchmark question" if enable_evaluator else None,
+            enable_evaluator=enable_evaluator
+        )
+    finally:
+        cleanup_temp(temp_video)
+
+
+def main():
+    args = sys.argv[1:]
+    levels = [1, 2, 4, 8]
+    if "--concurrency" in args:
+        i = args.index("--concurrency")
+        levels = [int(x) for x in args[i + 1].split(",")]
+        del args[i:i + 2]
+
+    enable_evaluator = "--no-eval" not in args
+    videos = [a for a in args if a != "--no-eval"]
+    if not videos:
+        print(__doc__)
+        sys.exit(1)
+
+    print(f"CPU budget: {'on' if CPU_BUDGET_ENABLED else 'off'} {stage_budgets()}")
+
+    # Warm-up: model sudah dimuat saat import, ini memanaskan pool gaze dan cache
+    run_one(videos[0], enable_evaluator)
+
+    print(f"{'concurrency':>11s} {'videos':>7s} {'wall s':>8s} {'videos/min':>11s}")
+    for level in levels:
+        # Setiap level memproses level x jumlah video supaya semua worker terisi
+        jobs = videos * level
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=level) as executor:
+            list(executor.map(lambda v: run_one(v, enable_evaluator), jobs))
+        elapsed = time.perf_counter() - start
+
+        print(f"{level:11d} {len(jobs):7d} {elapsed:8.1f} {len(jobs) * 60 / elapsed:11.2f}")
+
+
+if __name__ == "__main__":
+    main()
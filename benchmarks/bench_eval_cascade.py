@@ -0,0 +1,79 @@
+"""
+Benchmark evaluator bertingkat: bandingkan cascade dengan LLM-only pada transkrip
+dari laporan batch_runner.py (data/batch_runs/<folder>/report.json).
+
+Cascade selalu dijalankan (`cascade=True`), apa pun nilai EVAL_CASCADE, dan
+dibandingkan dengan `llm_score_answer` langsung untuk setiap jawaban.
+
+Usage:
+    python -m benchmarks.bench_eval_cascade <report.json> [--payload data/payload.json]
+"""
+import sys
+import json
+import time
+from collections import Counter
+
+from utils.config import PAYLOAD_PATH
+from utils.pipeline import load_payload, find_question
+from utils.transcript_evaluator import evaluate_transcript, llm_score_answer
+
+
+def main():
+    args = sys.argv[1:]
+    payload_path = PAYLOAD_PATH
+    if "--payload" in args:
+        i = args.index("--payload")
+        payload_path = args[i + 1]
+        del args[i:i + 2]
+
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+
+    with open(args[0], "r", encoding="utf-8") as f:
+        records = json.load(f)["results"]
+    payload = load_payload(payload_path)
+
+    tiers = Counter()
+    agree = 0
+    total = 0
+    cascade_time = 0.0
+    llm_time = 0.0
+
+    print(f"{'file':40s} {'tier':>9s} {'cascade':>8s} {'llm':>4s} {'cascade s':>10s} {'llm s':>7s}")
+    for record in records:
+        item = find_question(payload, record.get("question_id"))
+        if record.get("status") != "success" or item is None:
+            continue
+        answer = record.get("transcription") or ""
+
+        start = time.perf_counter()
+        cascade = evaluate_transcript(item["positionId"], item["question"], answer, cascade=True)
+        cascade_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        llm = llm_score_answer(item["positionId"], item["question"], answer)
+        llm_seconds = time.perf_counter() - start
+
+        tiers[cascade["tier"]] += 1
+        agree += cascade["score"] == llm["score"]
+        total += 1
+        cascade_time += cascade_seconds
+        llm_time += llm_seconds
+
+        print(
+            f"{record['file'][-40:]:40s} {cascade['tier']:>9s} {cascade['score']:8} {llm['score']:4} "
+            f"{cascade_seconds:10.2f} {llm_seconds:7.2f}"
+        )
+
+    if total == 0:
+        print("Tidak ada hasil sukses di laporan.")
+        return
+
+    print(f"\nTier: {dict(tiers)}")
+    print(f"Skor sama dengan LLM-only: {agree}/{total}")
+    print(f"Waktu total cascade {cascade_time:.1f} s vs LLM-only {llm_time:.1f} s ({cascade_time / llm_time:.0%})")
+
+
+if __name__ == "__main__":
+    main()
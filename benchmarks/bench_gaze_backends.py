@@ -0,0 +1,90 @@
+"""
+Benchmark gaze backend: latency per frame dan kesesuaian dengan FaceMesh.
+
+Usage:
+    python -m benchmarks.bench_gaze_backends <video> [<video> ...] [--backends facemesh,landmarker,opencv]
+
+Untuk setiap video dan backend dicetak: rata-rata ms/frame, focus %, selisih
+focus % terhadap FaceMesh, dan persentase frame dengan arah yang sama.
+"""
+import sys
+import time
+import contextlib
+import io
+
+import cv2
+
+from utils.eye_focus_detection import GazeAccumulator, detect_gaze_frame
+from utils.gaze_backends import GAZE_BACKENDS, create_gaze_backend
+
+
+REFERENCE = "facemesh"
+
+
+def run_backend(video_path, name):
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    with contextlib.redirect_stdout(io.StringIO()):
+        accumulator = GazeAccumulator(fps)
+
+    directions = []
+    elapsed = 0.0
+
+    with create_gaze_backend(name) as backend:
+        while True:
+            success, frame = cap.read()
+            if not success:
+                break
+            start = time.perf_counter()
+            direction = detect_gaze_frame(backend, frame)
+            elapsed += time.perf_counter() - start
+
+            directions.append(direction)
+            accumulator.update(direction)
+
+    cap.release()
+    report = accumulator.report()
+    ms_per_frame = elapsed * 1000 / max(len(directions), 1)
+    return directions, report, ms_per_frame
+
+
+def main():
+    args = sys.argv[1:]
+    backends = list(GAZE_BACKENDS)
+    if "--backends" in args:
+        i = args.index("--backends")
+        backends = args[i + 1].split(",")
+        del args[i:i + 2]
+
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+
+    if REFERENCE not in backends:
+        backends.insert(0, REFERENCE)
+    else:
+        backends.insert(0, backends.pop(backends.index(REFERENCE)))
+
+    print(f"{'video':30s} {'backend':11s} {'ms/frame':>9s} {'focus %':>8s} {'Δfocus':>7s} {'agree %':>8s}")
+
+    for video_path in args:
+        reference = None
+        for name in backends:
+            directions, report, ms_per_frame = run_backend(video_path, name)
+            focus = report.get("focus_percentage")
+
+            if reference is None:
+                reference = (directions, focus)
+                delta, agree = 0.0, 100.0
+            else:
+                ref_directions, ref_focus = reference
+                same = sum(1 for a, b in zip(directions, ref_directions) if a == b)
+                agree = same * 100 / max(len(ref_directions), 1)
+                delta = (focus - ref_focus) if focus is not None and ref_focus is not None else float("nan")
+
+            focus_text = f"{focus:8.2f}" if focus is not None else f"{'-':>8s}"
+            print(f"{video_path[-30:]:30s} {name:11s} {ms_per_frame:9.2f} {focus_text} {delta:7.2f} {agree:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
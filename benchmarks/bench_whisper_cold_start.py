@@ -0,0 +1,73 @@
+"""
+Benchmark cold start Whisper: waktu load dan memori resident per varian bobot.
+
+Setiap varian dimuat di proses baru (seperti replika yang baru start), dua kali:
+run pertama membaca dari disk, run kedua dari page cache.
+
+Usage:
+    python -m benchmarks.bench_whisper_cold_start [fp32 bf16 ...]
+
+Contoh:
+    python convert_whisper_weights.py --dtype bf16
+    python -m benchmarks.bench_whisper_cold_start fp32 bf16
+"""
+import os
+import sys
+import json
+import subprocess
+
+
+def read_status():
+    # VmRSS = resident sekarang, VmHWM = puncak, RssFile = halaman file (bisa dibagi antar proses)
+    status = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in {"VmRSS", "VmHWM", "RssAnon", "RssFile"}:
+                status[key] = int(value.split()[0]) / 1024
+    return status
+
+
+def child():
+    import time
+
+    start = time.perf_counter()
+    from utils import speech_to_text
+    speech_to_text.whisper.get()   # no-op jika sudah di-preload saat import
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        "weights_dir": os.path.basename(speech_to_text.WEIGHTS_DIR),
+        "load_seconds": elapsed,
+        **read_status()
+    }))
+
+
+def measure(weights):
+    env = {**os.environ, "WHISPER_WEIGHTS": weights, "WHISPER_BATCHING": "0", "WHISPER_DRAFT_MODEL_DIR": ""}
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_whisper_cold_start", "--child"],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    if "--child" in sys.argv:
+        child()
+        return
+
+    variants = sys.argv[1:] or ["fp32", "bf16"]
+
+    print(f"{'weights':8s} {'run':>4s} {'load s':>8s} {'RSS MB':>8s} {'peak MB':>8s} {'anon MB':>8s} {'file MB':>8s}")
+    for weights in variants:
+        for run in (1, 2):
+            r = measure(weights)
+            print(
+                f"{weights:8s} {run:4d} {r['load_seconds']:8.1f} {r.get('VmRSS', 0):8.0f} "
+                f"{r.get('VmHWM', 0):8.0f} {r.get('RssAnon', 0):8.0f} {r.get('RssFile', 0):8.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
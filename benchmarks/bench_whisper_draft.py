@@ -0,0 +1,95 @@
+"""
+Benchmark speculative decoding Whisper: tokens/s dengan dan tanpa draft model.
+
+Usage:
+    python -m benchmarks.bench_whisper_draft <draft_model_dir> <video_or_wav> [...]
+
+Contoh:
+    python -m benchmarks.bench_whisper_draft models/whisper-tiny assets/videos/interview_question_*.webm
+"""
+import sys
+import time
+import math
+
+import soundfile as sf
+import torch
+from transformers import WhisperForConditionalGeneration
+
+from utils.video_audio_utils import extract_audio
+
+
+def load_chunks(path):
+    audio_path = path if path.endswith(".wav") else extract_audio(path)
+    audio, sr = sf.read(audio_path, dtype="float32")
+    chunk_size = sr * 30
+    return [audio[i * chunk_size:(i + 1) * chunk_size] for i in range(math.ceil(len(audio) / chunk_size))]
+
+
+def run(stt, models, chunks, assistant_model=None):
+    processor, model = models
+    device, weights_dtype = stt.device, stt.WEIGHTS_DTYPE
+    texts = []
+    tokens = 0
+    start = time.perf_counter()
+
+    for chunk in chunks:
+        inputs = processor(chunk, sampling_rate=16000, return_tensors="pt").to(device)
+        kwargs = {"assistant_model": assistant_model} if assistant_model is not None else {}
+        with torch.no_grad():
+            predicted_ids = model.generate(
+                inputs["input_features"].to(weights_dtype),
+                task="transcribe",
+                language="en",
+                **kwargs
+            )
+        tokens += predicted_ids.shape[-1]
+        texts.append(processor.batch_decode(predicted_ids, skip_special_tokens=True)[0].strip())
+
+    elapsed = time.perf_counter() - start
+    return texts, tokens, elapsed
+
+
+def main():
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+
+    # Diimpor setelah cek argumen: import speech_to_text sudah memuat large-v2 jika MODEL_PRELOAD=1
+    from utils import speech_to_text as stt
+
+    models = stt.whisper.get()[:2]
+    draft_model = WhisperForConditionalGeneration.from_pretrained(
+        sys.argv[1], torch_dtype=stt.WEIGHTS_DTYPE, low_cpu_mem_usage=True
+    ).to(stt.device)
+    clips = sys.argv[2:]
+
+    print(f"{'clip':40s} {'tokens':>7s} {'base tok/s':>11s} {'draft tok/s':>12s} {'speedup':>8s} {'identical':>10s}")
+    total = {"tokens": 0, "base": 0.0, "draft": 0.0}
+
+    for clip in clips:
+        chunks = load_chunks(clip)
+
+        # Warm-up supaya waktu load/alokasi pertama tidak ikut terhitung
+        run(stt, models, chunks[:1])
+        run(stt, models, chunks[:1], draft_model)
+
+        base_texts, tokens, base_time = run(stt, models, chunks)
+        draft_texts, _, draft_time = run(stt, models, chunks, draft_model)
+
+        total["tokens"] += tokens
+        total["base"] += base_time
+        total["draft"] += draft_time
+
+        print(
+            f"{clip[-40:]:40s} {tokens:7d} {tokens / base_time:11.2f} {tokens / draft_time:12.2f} "
+            f"{base_time / draft_time:7.2f}x {str(base_texts == draft_texts):>10s}"
+        )
+
+    print(
+        f"{'TOTAL':40s} {total['tokens']:7d} {total['tokens'] / total['base']:11.2f} "
+        f"{total['tokens'] / total['draft']:12.2f} {total['base'] / total['draft']:7.2f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import time
+import argparse
+
+from utils.config import BROKER_WORKERS
+from utils.job_worker import start_workers, stop_workers
+
+
+# =============================
+# ENTRYPOINT
+# =============================
+# Node worker tanpa API: hanya mengambil job dari broker di volume bersama.
+def main():
+    parser = argparse.ArgumentParser(description="Worker broker: proses video dari antrean batch bersama.")
+    parser.add_argument("--workers", type=int, default=max(BROKER_WORKERS, 1), help="Jumlah video yang diproses bersamaan")
+    args = parser.parse_args()
+
+    start_workers(args.workers)
+    print(f"👷 {args.workers} worker broker berjalan. Ctrl+C untuk berhenti.")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("⏹️ Berhenti mengambil job baru, menunggu job yang sedang berjalan...")
+        stop_workers()
+
+
+if __name__ == "__main__":
+    main()
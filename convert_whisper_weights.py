@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+
+import torch
+from transformers import WhisperProcessor, WhisperForConditionalGeneration
+
+from utils.config import BASE_DIR
+
+
+DEFAULT_MODEL_DIR = os.path.join(BASE_DIR, "models", "whisper-large-v2-en")
+
+DTYPES = {
+    "bf16": torch.bfloat16,
+    "fp16": torch.float16,
+}
+
+
+# =============================
+# CONVERT
+# =============================
+def convert(model_dir, dtype_name, output_dir=None):
+    """
+    Tulis snapshot Whisper dalam presisi rendah (safetensors) di `<model_dir>-<dtype>`,
+    folder yang dipakai `speech_to_text` saat WHISPER_WEIGHTS=bf16/fp16 (atau auto).
+
+    Returns:
+        str: Folder output.
+    """
+    output_dir = output_dir or f"{os.path.normpath(model_dir)}-{dtype_name}"
+
+    started = time.time()
+    processor = WhisperProcessor.from_pretrained(model_dir)
+    model = WhisperForConditionalGeneration.from_pretrained(
+        model_dir,
+        torch_dtype=DTYPES[dtype_name],
+        low_cpu_mem_usage=True
+    )
+
+    # Tulis ke folder sementara dulu supaya `auto` tidak memakai snapshot setengah jadi
+    tmp_dir = output_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    model.save_pretrained(tmp_dir, safe_serialization=True)
+    processor.save_pretrained(tmp_dir)
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.replace(tmp_dir, output_dir)
+
+    size = sum(
+        os.path.getsize(os.path.join(output_dir, f))
+        for f in os.listdir(output_dir) if f.endswith(".safetensors")
+    )
+    print(f"✅ {output_dir} ({size / 1024 ** 3:.2f} GB, {time.time() - started:.1f} s)")
+    return output_dir
+
+
+# =============================
+# ENTRYPOINT
+# =============================
+def main():
+    parser = argparse.ArgumentParser(description="Konversi bobot Whisper ke snapshot bf16/fp16 untuk cold start cepat.")
+    parser.add_argument("--model-dir", default=DEFAULT_MODEL_DIR, help="Folder model fp32")
+    parser.add_argument("--dtype", choices=sorted(DTYPES), default="bf16")
+    parser.add_argument("--output", help="Folder output (default: <model-dir>-<dtype>)")
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join(args.model_dir, "config.json")):
+        print(f"❌ Model tidak ditemukan: {args.model_dir}")
+        sys.exit(1)
+
+    convert(args.model_dir, args.dtype, args.output)
+
+
+if __name__ == "__main__":
+    main()
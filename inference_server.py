@@ -0,0 +1,135 @@
+import os
+import threading
+import traceback
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import Listener
+
+import numpy as np
+
+from utils.config import INFERENCE_SOCKET, INFERENCE_AUTHKEY
+from utils.speech_to_text import transcribe_audio, iter_transcribe_audio
+from utils.transcript_evaluator import evaluate_transcript
+from utils.scheduler import priority_scope, scheduler_stats
+from utils.model_manager import model_stats
+
+
+# ======================================================
+# Inference server
+# ------------------------------------------------------
+# Satu proses yang memegang Whisper + model evaluator. Worker API
+# (uvicorn --workers N) mengirim request lewat Unix socket, sehingga
+# model hanya dimuat sekali per node.
+# ======================================================
+
+def release_audio(shm):
+    try:
+        shm.close()
+    except BufferError:
+        # Masih ada view numpy yang hidup; mapping dilepas saat objek di-GC
+        pass
+
+
+def attach_audio(request):
+    """
+    Membuka shared memory dari client sebagai numpy array (zero-copy).
+    Segment tetap milik client: server hanya close, tidak unlink.
+    """
+    shm = shared_memory.SharedMemory(name=request["shm"])
+    # Jangan biarkan resource tracker proses ini menghapus segment milik client
+    resource_tracker.unregister(shm._name, "shared_memory")
+    audio = np.ndarray(tuple(request["shape"]), dtype=request["dtype"], buffer=shm.buf)
+    return shm, audio
+
+
+def handle_request(request):
+    op = request.get("op")
+
+    if op == "ping":
+        return "pong"
+
+    if op == "scheduler_stats":
+        return scheduler_stats()
+
+    if op == "model_stats":
+        return model_stats()
+
+    if op == "transcribe":
+        shm, audio = attach_audio(request)
+        try:
+            return transcribe_audio(audio, request["sr"], prompt=request.get("prompt", ""))
+        finally:
+            del audio
+            release_audio(shm)
+
+    if op == "evaluate":
+        return evaluate_transcript(
+            question_id=request["question_id"],
+            question=request["question"],
+            answer=request["answer"]
+        )
+
+    raise ValueError(f"Operasi tidak dikenal: {op}")
+
+
+def stream_transcription(conn, request):
+    """
+    Kirim setiap segmen transkrip sebagai pesan terpisah, lalu pesan penutup
+    {"ok": True, "result": None}.
+    """
+    shm, audio = attach_audio(request)
+    try:
+        for segment in iter_transcribe_audio(audio, request["sr"], prompt=request.get("prompt", "")):
+            conn.send({"ok": True, "segment": segment})
+    finally:
+        del audio
+        release_audio(shm)
+    return None
+
+
+def serve_connection(conn):
+    with conn:
+        while True:
+            try:
+                request = conn.recv()
+            except (EOFError, OSError):
+                return
+
+            try:
+                # Antrean Whisper/LLM di server memakai prioritas request asal
+                with priority_scope(request.get("priority", "interactive")):
+                    if request.get("op") == "transcribe_stream":
+                        response = {"ok": True, "result": stream_transcription(conn, request)}
+                    else:
+                        response = {"ok": True, "result": handle_request(request)}
+            except Exception as e:
+                traceback.print_exc()
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+            try:
+                conn.send(response)
+            except OSError:
+                return
+
+
+def serve(socket_path=INFERENCE_SOCKET):
+    if not socket_path:
+        raise SystemExit("INFERENCE_SOCKET belum di-set")
+
+    os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    with Listener(socket_path, family="AF_UNIX", authkey=INFERENCE_AUTHKEY) as listener:
+        print(f"[INFERENCE] Listening on {socket_path}")
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                # Handshake authkey gagal, dsb. — jangan matikan server
+                print(f"[INFERENCE] Koneksi ditolak: {e}")
+                continue
+            threading.Thread(target=serve_connection, args=(conn,), daemon=True).start()
+
+
+if __name__ == "__main__":
+    serve()
@@ -62,7 +62,7 @@ def process_single_video(temp_video_path, question_id, payload, video_id):
     # === TRANSCRIPT EVALUATION ===
     eval_result = evaluate_transcript(
         question_id=question_id,
-        question=question_text,
+        question=question,
         answer=transcript_text
     )
 
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+# batch_runner mengimpor pipeline (numpy, torch, ...); dilewati jika dependency belum terpasang
+batch_runner = pytest.importorskip("batch_runner")
+
+from batch_runner import Checkpoint, file_key, process_entry, run_batch
+
+
+PAYLOAD = {
+    "data": {
+        "id": 10,
+        "reviewChecklists": {
+            "interviews": [
+                {"positionId": 1, "question": "Question one?"},
+                {"positionId": 2, "question": "Question two?"},
+            ]
+        }
+    }
+}
+
+
+@pytest.fixture
+def folder(tmp_path):
+    videos = tmp_path / "videos"
+    videos.mkdir()
+    for name in ("question_1.webm", "question_2.webm", "intro.webm"):
+        (videos / name).write_bytes(b"video")
+    return videos
+
+
+def test_checkpoint_ignores_truncated_line(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.jsonl"))
+    assert checkpoint.load() == {}
+
+    checkpoint.append({"key": "a", "status": "failed"})
+    checkpoint.append({"key": "b", "status": "success"})
+    checkpoint.append({"key": "a", "status": "success"})
+    with open(checkpoint.path, "a", encoding="utf-8") as f:
+        f.write('{"key": "c", "sta')
+
+    records = checkpoint.load()
+    assert set(records) == {"a", "b"}
+    # Baris terakhir untuk key yang sama menang
+    assert records["a"]["status"] == "success"
+
+
+def test_resume_retries_only_failed(folder, tmp_path, monkeypatch):
+    calls = []
+    failing = {2}
+
+    def fake_process_video(video_path, question_id=None, question=None):
+        calls.append(question_id)
+        if question_id in failing:
+            raise RuntimeError("decode error")
+        return {"transcription": question, "evaluation": {"id": question_id, "score": 3}}
+
+    monkeypatch.setattr(batch_runner, "process_video", fake_process_video)
+    monkeypatch.setattr(batch_runner, "load_payload", lambda path: PAYLOAD)
+    output = str(tmp_path / "run")
+
+    report = run_batch(str(folder), output, workers=2)
+    assert sorted(calls) == [1, 2]
+    assert report["summary"]["failed"] == 1
+    assert report["summary"]["skipped"] == 1
+
+    # Run ulang: yang sukses dilewati, yang gagal diulang
+    calls.clear()
+    failing.clear()
+    report = run_batch(str(folder), output, workers=2)
+    assert calls == [2]
+    assert report["summary"]["failed"] == 0
+    assert report["summary"]["processed"] == 2
+
+    # File yang diganti (ukuran berubah) dianggap file baru
+    calls.clear()
+    (folder / "question_1.webm").write_bytes(b"new video")
+    run_batch(str(folder), output, workers=2)
+    assert calls == [1]
+
+    with open(f"{output}/report.json", encoding="utf-8") as f:
+        assert len(json.load(f)["results"]) == 2
+
+
+def test_resume_without_retry(folder, tmp_path, monkeypatch):
+    calls = []
+
+    def failing_process_video(video_path, question_id=None, question=None):
+        calls.append(question_id)
+        raise RuntimeError("decode error")
+
+    monkeypatch.setattr(batch_runner, "process_video", failing_process_video)
+    monkeypatch.setattr(batch_runner, "load_payload", lambda path: PAYLOAD)
+    output = str(tmp_path / "run")
+
+    run_batch(str(folder), output)
+    calls.clear()
+    report = run_batch(str(folder), output, retry_failed=False)
+    assert calls == []
+    assert report["summary"]["failed"] == 2
+
+
+def test_missing_file_is_a_failed_record(tmp_path):
+    entry = {"file": "question_1.webm", "path": str(tmp_path / "gone.webm"),
+             "question_id": 1, "size": 5, "mtime": 0}
+
+    record = process_entry(entry, PAYLOAD)
+    assert record["status"] == "failed"
+    assert record["key"] == file_key(entry)
+
+
+def test_unknown_question_is_a_failed_record(tmp_path):
+    entry = {"file": "question_9.webm", "path": str(tmp_path / "question_9.webm"),
+             "question_id": 9, "size": 5, "mtime": 0}
+
+    record = process_entry(entry, PAYLOAD)
+    assert record["status"] == "failed"
+    assert "9" in record["error"]
@@ -0,0 +1,134 @@
+import os
+import time
+
+import pytest
+
+from utils import cancellation
+from utils.cancellation import (
+    CancelToken, Cancelled, JobConflict, JobNotFound,
+    check_jobs, register_job, request_cancel, unregister_job
+)
+
+
+@pytest.fixture(autouse=True)
+def cancel_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cancellation, "CANCEL_DIR", str(tmp_path))
+    # Monitor tidak dijalankan: putaran monitor dipanggil langsung lewat check_jobs
+    monkeypatch.setattr(cancellation, "_ensure_monitor", lambda: None)
+    monkeypatch.setattr(cancellation, "_jobs", {})
+    os.makedirs(tmp_path / "active")
+    return tmp_path
+
+
+def running_elsewhere(cancel_dir, job_id, age=0):
+    # File active milik worker lain; `age` detik sejak terakhir disentuh monitornya
+    path = cancel_dir / "active" / job_id
+    path.write_text("99999")
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_register_and_unregister(cancel_dir):
+    token = register_job(CancelToken("job-1"))
+    assert (cancel_dir / "active" / "job-1").exists()
+    assert [job["id"] for job in cancellation.active_jobs()] == ["job-1"]
+
+    unregister_job(token)
+    assert not (cancel_dir / "active" / "job-1").exists()
+    assert cancellation.active_jobs() == []
+
+
+def test_duplicate_id_conflicts(cancel_dir):
+    token = register_job(CancelToken("job-1"))
+    with pytest.raises(JobConflict):
+        register_job(CancelToken("job-1"))
+    unregister_job(token)
+
+    running_elsewhere(cancel_dir, "job-2")
+    with pytest.raises(JobConflict):
+        register_job(CancelToken("job-2"))
+
+
+def test_stale_active_file_is_reclaimed(cancel_dir):
+    running_elsewhere(cancel_dir, "job-1", age=cancellation.ACTIVE_STALE_SECONDS + 5)
+
+    token = register_job(CancelToken("job-1"))
+    assert (cancel_dir / "active" / "job-1").read_text() == str(os.getpid())
+    unregister_job(token)
+
+
+def test_unregister_ignores_other_token(cancel_dir):
+    token = register_job(CancelToken("job-1"))
+    unregister_job(CancelToken("job-1"))
+    assert (cancel_dir / "active" / "job-1").exists()
+    unregister_job(token)
+
+
+def test_leftover_marker_does_not_cancel_new_job(cancel_dir):
+    (cancel_dir / "job-1").write_text("old")
+
+    token = register_job(CancelToken("job-1"))
+    check_jobs()
+    assert not token.cancelled
+    unregister_job(token)
+
+
+def test_cancel_local_job():
+    token = register_job(CancelToken("job-1"))
+    assert request_cancel("job-1", "user") == "cancelled"
+    assert token.reason == "user"
+    with pytest.raises(Cancelled):
+        token.check()
+    unregister_job(token)
+
+
+def test_cancel_job_in_other_worker_writes_marker(cancel_dir):
+    running_elsewhere(cancel_dir, "job-1")
+    assert request_cancel("job-1", "user") == "cancel_requested"
+    assert (cancel_dir / "job-1").read_text() == "user"
+
+
+def test_marker_cancels_owner(cancel_dir):
+    token = register_job(CancelToken("job-1"))
+    # Penanda dari worker lain (request_cancel di proses yang bukan pemilik)
+    (cancel_dir / "job-1").write_text("user")
+
+    check_jobs()
+    assert token.cancelled and token.reason == "user"
+    assert not (cancel_dir / "job-1").exists()
+    unregister_job(token)
+
+
+def test_cancel_unknown_job(cancel_dir):
+    with pytest.raises(JobNotFound):
+        request_cancel("job-1")
+
+    running_elsewhere(cancel_dir, "job-2", age=cancellation.ACTIVE_STALE_SECONDS + 5)
+    with pytest.raises(JobNotFound):
+        request_cancel("job-2")
+    assert not (cancel_dir / "job-2").exists()
+
+    with pytest.raises(ValueError):
+        request_cancel("../job")
+
+
+def test_deadline_expires():
+    token = register_job(CancelToken("job-1", deadline_seconds=0.01))
+    assert not token.cancelled
+
+    time.sleep(0.02)
+    check_jobs()
+    assert token.cancelled and token.reason == "deadline"
+    unregister_job(token)
+
+
+def test_old_marker_removed(cancel_dir):
+    marker = cancel_dir / "job-1"
+    marker.write_text("user")
+    mtime = time.time() - cancellation.MARKER_MAX_AGE_SECONDS - 5
+    os.utime(marker, (mtime, mtime))
+
+    check_jobs()
+    assert not marker.exists()
+    assert (cancel_dir / "active").is_dir()
@@ -0,0 +1,119 @@
+import random
+
+import pytest
+
+# eye_focus_detection mengimpor OpenCV dan MediaPipe; dilewati jika belum terpasang
+eye_focus_detection = pytest.importorskip("utils.eye_focus_detection")
+
+from utils.eye_focus_detection import (
+    NO_FACE, GazeAccumulator, analyze_gaze_log, read_gaze_full, read_gaze_adaptive
+)
+
+
+DIRECTIONS = ["Tengah"] * 4 + ["Kiri", "Kanan", NO_FACE]
+
+
+def random_log(seed, frames=3000, run_lengths=(1, 2, 5, 20, 61, 90, 300)):
+    rng = random.Random(seed)
+    log = []
+    while len(log) < frames:
+        log += [rng.choice(DIRECTIONS)] * rng.choice(run_lengths)
+    return log
+
+
+class FakeCapture:
+    """
+    `cv2.VideoCapture` palsu: setiap "frame" adalah arah pandangnya sendiri.
+    """
+
+    def __init__(self, frames):
+        self.frames = iter(frames)
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        frame = next(self.frames, None)
+        return frame is not None, frame
+
+
+class FakeBackend:
+
+    def __init__(self):
+        self.calls = 0
+
+    def measure(self, frame):
+        self.calls += 1
+        return None if frame == NO_FACE else frame
+
+
+@pytest.fixture(autouse=True)
+def direction_is_measurement(monkeypatch):
+    monkeypatch.setattr(eye_focus_detection, "direction_from_measurement", lambda measurement: measurement)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_accumulator_matches_log(seed):
+    log = random_log(seed)
+
+    accumulator = GazeAccumulator(30)
+    closed = [event for event in map(accumulator.update, log) if event is not None]
+
+    report = accumulator.report()
+    assert report == analyze_gaze_log(log, 30)
+    # Event yang dikembalikan `update` + run terakhir = daftar di laporan
+    assert closed == report["suspicious_events_list"][:len(closed)]
+
+
+def test_empty_and_no_face():
+    assert analyze_gaze_log([], 30)["status"] == "failed"
+    assert GazeAccumulator(30).report()["status"] == "failed"
+    assert analyze_gaze_log([NO_FACE] * 10, 30)["error"].startswith("Wajah tidak terdeteksi")
+
+
+def test_invalid_fps_falls_back_to_30():
+    assert GazeAccumulator(0).fps == 30.0
+    assert GazeAccumulator(240).fps == 30.0
+
+
+def test_read_gaze_full_matches_log():
+    log = random_log(0)
+    accumulator = GazeAccumulator(30)
+    backend = FakeBackend()
+
+    assert read_gaze_full(FakeCapture(log), backend, accumulator) is None
+    assert accumulator.report() == analyze_gaze_log(log, 30)
+    assert backend.calls == len(log)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_adaptive_keeps_events_for_runs_of_four_frames(seed):
+    # Lirikan >= 4 frame tidak pernah terlewat dengan max_step 6 (cek frame tengah)
+    log = random_log(seed, run_lengths=(4, 5, 20, 61, 90, 300))
+    accumulator = GazeAccumulator(30)
+    backend = FakeBackend()
+
+    assert read_gaze_adaptive(FakeCapture(log), backend, accumulator, max_step=6, bail_seconds=0) is None
+
+    report = accumulator.report()
+    expected = analyze_gaze_log(log, 30)
+    assert accumulator.total_frames == len(log)
+    assert report["suspicious_events_list"] == expected["suspicious_events_list"]
+    assert report["focus_percentage"] == expected["focus_percentage"]
+    assert backend.calls < len(log)
+
+
+def test_adaptive_step_stays_below_event_threshold():
+    # fps rendah: threshold 2 detik = 4 frame, jadi step maksimal 3
+    log = ["Tengah"] * 40 + ["Kiri"] * 4 + ["Tengah"] * 40
+    accumulator = GazeAccumulator(2)
+
+    read_gaze_adaptive(FakeCapture(log), FakeBackend(), accumulator, max_step=6, bail_seconds=0)
+    assert accumulator.report()["suspicious_events_list"] == analyze_gaze_log(log, 2)["suspicious_events_list"]
+
+
+def test_adaptive_bails_without_face():
+    accumulator = GazeAccumulator(30)
+    failed = read_gaze_adaptive(FakeCapture([NO_FACE] * 600), FakeBackend(), accumulator, bail_seconds=1)
+    assert failed["status"] == "failed"
+    assert accumulator.total_frames < 600
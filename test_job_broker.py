@@ -0,0 +1,95 @@
+import pytest
+
+from utils.job_broker import submit_batch, claim_job, heartbeat, complete_job, fail_job, get_batch
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / "jobs.db")
+
+
+def submit(db, tmp_path, count=2):
+    entries = [
+        {"file": f"question_{i}.webm", "path": str(tmp_path / f"question_{i}.webm"), "question_id": i}
+        for i in range(1, count + 1)
+    ]
+    entries.append({"file": "notes.txt", "path": str(tmp_path / "notes.txt"), "question_id": None,
+                    "skip_reason": "bukan video"})
+    return submit_batch(entries, str(tmp_path), payload_path="payload.json", db_path=db)
+
+
+def test_claim_in_order_and_complete(db, tmp_path):
+    batch_id = submit(db, tmp_path)
+
+    first = claim_job("node-a", db_path=db)
+    second = claim_job("node-b", db_path=db)
+    assert (first["question_id"], second["question_id"]) == (1, 2)
+    assert first["attempts"] == 1 and first["payload_path"] == "payload.json"
+    assert claim_job("node-c", db_path=db) is None
+
+    assert heartbeat(first["id"], "node-a", db_path=db)
+    assert not heartbeat(first["id"], "node-b", db_path=db)
+
+    assert complete_job(first["id"], "node-a", {"score": 3}, result_id=7, db_path=db)
+    batch = get_batch(batch_id, include_results=True, db_path=db)
+    assert batch["total"] == 2
+    assert batch["counts"] == {"queued": 0, "running": 1, "done": 1, "failed": 0}
+    assert batch["workers"] == ["node-b"]
+    assert not batch["finished"]
+    assert batch["results"][0]["score"] == 3 and batch["results"][0]["result_id"] == 7
+
+
+def test_expired_lease_is_reclaimed(db, tmp_path):
+    submit(db, tmp_path, count=1)
+
+    # Lease langsung habis: node-a dianggap mati
+    job = claim_job("node-a", lease_seconds=-1, db_path=db)
+    retried = claim_job("node-b", db_path=db)
+    assert retried["id"] == job["id"]
+    assert retried["attempts"] == 2
+
+    # Worker lama tidak bisa lagi memperpanjang atau menulis hasil
+    assert not heartbeat(job["id"], "node-a", db_path=db)
+    assert not complete_job(job["id"], "node-a", {"score": 1}, db_path=db)
+    assert complete_job(job["id"], "node-b", {"score": 2}, db_path=db)
+
+
+def test_expired_lease_fails_after_max_attempts(db, tmp_path):
+    batch_id = submit(db, tmp_path, count=1)
+
+    claim_job("node-a", lease_seconds=-1, max_attempts=2, db_path=db)
+    claim_job("node-b", lease_seconds=-1, max_attempts=2, db_path=db)
+    assert claim_job("node-c", max_attempts=2, db_path=db) is None
+
+    result = get_batch(batch_id, include_results=True, db_path=db)["results"][0]
+    assert result["status"] == "failed"
+    assert result["error"] == "Lease expired too many times"
+
+
+def test_fail_job_retries_until_max_attempts(db, tmp_path):
+    batch_id = submit(db, tmp_path, count=1)
+
+    job = claim_job("node-a", db_path=db)
+    assert fail_job(job["id"], "node-a", "RuntimeError: boom", max_attempts=2, db_path=db)
+    assert get_batch(batch_id, db_path=db)["counts"]["queued"] == 1
+
+    job = claim_job("node-a", db_path=db)
+    assert job["attempts"] == 2
+    assert fail_job(job["id"], "node-a", "RuntimeError: boom", max_attempts=2, db_path=db)
+
+    batch = get_batch(batch_id, include_results=True, db_path=db)
+    assert batch["counts"]["failed"] == 1 and batch["finished"]
+    assert batch["results"][0]["error"] == "RuntimeError: boom"
+
+
+def test_fail_job_without_retry(db, tmp_path):
+    batch_id = submit(db, tmp_path, count=1)
+
+    job = claim_job("node-a", db_path=db)
+    assert fail_job(job["id"], "node-a", "Media ditolak", max_attempts=0, db_path=db)
+    assert get_batch(batch_id, db_path=db)["counts"]["failed"] == 1
+    assert claim_job("node-a", db_path=db) is None
+
+
+def test_unknown_batch(db):
+    assert get_batch("missing", db_path=db) is None
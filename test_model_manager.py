@@ -0,0 +1,129 @@
+import pytest
+
+from utils import model_manager
+from utils.model_manager import ManagedModel, check_models, register_model
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    monkeypatch.setattr(model_manager, "_models", {})
+    # Monitor tidak dijalankan: putaran pengecekan dipanggil langsung lewat check_models
+    monkeypatch.setattr(model_manager, "_ensure_monitor", lambda: None)
+
+
+class Loader:
+
+    def __init__(self):
+        self.loads = 0
+        self.unloaded = []
+
+    def load(self):
+        self.loads += 1
+        return f"model-{self.loads}"
+
+    def unload(self, value):
+        self.unloaded.append(value)
+
+
+def model(name, idle_ttl=60):
+    loader = Loader()
+    return register_model(name, loader.load, loader.unload, idle_ttl=idle_ttl), loader
+
+
+def memory(monkeypatch, available_mb):
+    # Memori naik setiap kali model dilepas
+    state = {"available": available_mb}
+    real_unload = ManagedModel.unload
+
+    def unload(self, reason="manual"):
+        released = real_unload(self, reason)
+        if released:
+            state["available"] += 1000
+        return released
+
+    monkeypatch.setattr(ManagedModel, "unload", unload)
+    monkeypatch.setattr(model_manager, "available_memory_mb", lambda: state["available"])
+
+
+def test_loaded_on_first_use_and_reused():
+    managed, loader = model("whisper")
+    assert not managed.loaded
+
+    assert managed.get() == "model-1"
+    with managed.use() as value:
+        assert value == "model-1"
+    assert loader.loads == 1
+    assert managed.stats()["in_use"] == 0
+
+
+def test_idle_ttl_unloads():
+    managed, loader = model("whisper", idle_ttl=10)
+    managed.get()
+    now = managed._last_used
+
+    check_models(now=now + 5, min_available_mb=0)
+    assert managed.loaded
+
+    check_models(now=now + 10, min_available_mb=0)
+    assert not managed.loaded
+    assert loader.unloaded == ["model-1"]
+    assert managed.stats()["unloads"] == {"idle": 1}
+
+    # Dimuat ulang saat dipakai lagi
+    assert managed.get() == "model-2"
+
+
+def test_idle_ttl_zero_never_unloads():
+    managed, _ = model("whisper", idle_ttl=0)
+    managed.get()
+
+    check_models(now=managed._last_used + 10 ** 6, min_available_mb=0)
+    assert managed.loaded
+
+
+def test_idle_ttl_skips_model_in_use():
+    managed, loader = model("whisper", idle_ttl=10)
+
+    with managed.use():
+        check_models(now=managed._last_used + 60, min_available_mb=0)
+        assert managed.loaded
+        assert not managed.unload()
+    assert loader.unloaded == []
+
+    assert managed.unload()
+
+
+def test_memory_pressure_unloads_least_recently_used(monkeypatch):
+    old, _ = model("old")
+    new, _ = model("new")
+    old.get()
+    new.get()
+    old._last_used = new._last_used - 30
+    memory(monkeypatch, available_mb=500)
+
+    check_models(now=new._last_used + 1, min_available_mb=1000)
+    assert not old.loaded
+    assert new.loaded
+    assert old.stats()["unloads"] == {"memory_pressure": 1}
+
+
+def test_memory_pressure_skips_model_in_use(monkeypatch):
+    old, _ = model("old")
+    new, _ = model("new")
+    new.get()
+    memory(monkeypatch, available_mb=500)
+
+    with old.use():
+        old._last_used = new._last_used - 30
+        check_models(now=new._last_used + 1, min_available_mb=1000)
+        assert old.loaded
+    assert not new.loaded
+
+
+def test_enough_memory_unloads_nothing(monkeypatch):
+    managed, _ = model("whisper")
+    managed.get()
+    memory(monkeypatch, available_mb=5000)
+
+    check_models(now=managed._last_used + 1, min_available_mb=1000)
+    assert managed.loaded
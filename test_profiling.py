@@ -0,0 +1,90 @@
+import re
+import json
+import threading
+import time
+
+import pytest
+
+from utils.profiling import (
+    StackSampler, list_profiles, profile_file, profile_request, profile_requested, top_functions
+)
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_profile_requested():
+    assert profile_requested("1") and profile_requested(" Yes ")
+    assert profile_requested(None, flag=True)
+    assert not profile_requested(None) and not profile_requested("0")
+
+
+def test_disabled_profile_writes_nothing(tmp_path):
+    with profile_request("single", False, profile_dir=str(tmp_path)) as profile_id:
+        assert profile_id is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_profile_artifacts(tmp_path):
+    profile_dir = str(tmp_path)
+    with profile_request("single:q1.webm", True, profile_dir=profile_dir) as profile_id:
+        busy(0.1)
+
+    assert [meta["id"] for meta in list_profiles(profile_dir)] == [profile_id]
+    with open(tmp_path / f"{profile_id}.json", encoding="utf-8") as f:
+        meta = json.load(f)
+    assert meta["label"] == "single:q1.webm"
+    assert meta["sampled_threads"][0] == threading.current_thread().name
+    assert "busy" in top_functions(profile_id, profile_dir=profile_dir)
+
+
+@pytest.mark.parametrize("profile_id", ["../secret", "a/b", "/etc/passwd", "..", ""])
+def test_profile_file_rejects_traversal(tmp_path, profile_id):
+    (tmp_path / "secret.pstats").write_text("x")
+    assert profile_file(profile_id, "pstats", profile_dir=str(tmp_path / "profiles")) is None
+
+
+def test_profile_file_kinds(tmp_path):
+    (tmp_path / "abc.pstats").write_text("x")
+    (tmp_path / "abc.json").write_text("{}")
+
+    assert profile_file("abc", "pstats", profile_dir=str(tmp_path)) == str(tmp_path / "abc.pstats")
+    assert profile_file("abc", "collapsed", profile_dir=str(tmp_path)) is None
+    # Hanya jenis artefak yang dikenal (bukan sembarang suffix)
+    assert profile_file("abc", "json", profile_dir=str(tmp_path)) is None
+    assert top_functions("missing", profile_dir=str(tmp_path)) is None
+
+
+def test_collapsed_format_samples_only_selected_threads(tmp_path):
+    stop = threading.Event()
+    other = threading.Thread(target=stop.wait, name="unrelated", daemon=True)
+    shared = threading.Thread(target=stop.wait, name="shared-worker", daemon=True)
+    other.start()
+    shared.start()
+
+    sampler = StackSampler(0.005, thread_ids=[threading.get_ident()], thread_names=["shared-worker"])
+    sampler.start()
+    busy(0.1)
+    sampler.stop()
+    stop.set()
+
+    path = tmp_path / "out.collapsed"
+    sampler.write_collapsed(str(path))
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert lines and sampler.samples > 0
+
+    roots, leaves = set(), set()
+    for line in lines:
+        # "<thread>;<frame luar>;...;<frame dalam> <jumlah>"
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+        frames = stack.split(";")
+        roots.add(frames[0])
+        leaves.add(frames[-1].split(" (")[0])
+        assert all(re.fullmatch(r".+ \(.+:\d+\)", frame) for frame in frames[1:])
+
+    assert roots == {threading.current_thread().name, "shared-worker"}
+    assert "busy" in leaves
@@ -0,0 +1,136 @@
+import os
+
+import pytest
+
+from utils import proxy_media
+from utils.proxy_media import (
+    content_hash, get_proxy, proxy_fps, proxy_key, prune_cache, release_media, release_proxy
+)
+
+
+MB = 1024 ** 2
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "proxy"
+    monkeypatch.setattr(proxy_media, "PROXY_DIR", str(cache_dir))
+    monkeypatch.setattr(proxy_media, "_holds", {})
+    return cache_dir
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    # ffmpeg palsu: proxy 1 MB per video
+    calls = []
+
+    def fake_build_proxy(video_path, output_dir, fps, has_audio=True):
+        calls.append(video_path)
+        with open(os.path.join(output_dir, proxy_media.VIDEO_FILE), "wb") as f:
+            f.write(b"\0" * MB)
+
+    monkeypatch.setattr(proxy_media, "build_proxy", fake_build_proxy)
+    return calls
+
+
+def video(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+
+def touch(path, mtime):
+    os.utime(path, (mtime, mtime))
+
+
+def test_proxy_key_depends_on_content_and_parameters(tmp_path):
+    a = video(tmp_path, "a.webm", b"same")
+    b = video(tmp_path, "b.mp4", b"same")
+    c = video(tmp_path, "c.webm", b"other")
+
+    # Nama file tidak berpengaruh, isi file berpengaruh
+    assert content_hash(a) == content_hash(b)
+    assert content_hash(a) != content_hash(c)
+    assert content_hash(a, block_size=1) == content_hash(a)
+
+    digest = content_hash(a)
+    assert proxy_key(digest, 15) == proxy_key(digest, 15.0)
+    assert proxy_key(digest, 15) != proxy_key(digest, 12.5)
+    assert proxy_key(digest, 12.5).endswith(f"_{proxy_media.PROXY_MAX_WIDTH}w_12.5fps")
+
+
+def test_proxy_fps_never_raises_source_fps():
+    assert proxy_fps(None) == proxy_media.PROXY_FPS
+    assert proxy_fps(proxy_media.PROXY_FPS * 4) == proxy_media.PROXY_FPS
+    assert proxy_fps(proxy_media.PROXY_FPS / 2) == proxy_media.PROXY_FPS / 2
+
+
+def test_proxy_is_cached(tmp_path, builds):
+    path = video(tmp_path, "a.webm", b"a")
+
+    first = get_proxy(path, {"fps": 30, "has_audio": False})
+    second = get_proxy(path, {"fps": 30, "has_audio": False})
+    assert builds == [path]
+    assert not first["cached"] and second["cached"]
+    assert first["key"] == second["key"]
+    assert first["audio_path"] is None
+    assert os.path.exists(second["video_path"])
+
+    # Proxy yang sama dipegang dua kali di proses ini
+    assert proxy_media._holds[first["key"]][0] == 2
+    release_proxy(first["key"])
+    release_proxy(first["key"])
+    assert proxy_media._holds == {}
+
+
+def test_prune_removes_least_recently_used(tmp_path, cache, builds):
+    proxies = [get_proxy(video(tmp_path, f"{i}.webm", b"%d" % i), {"fps": 30}) for i in range(3)]
+    for age, proxy in zip((300, 100, 200), proxies):
+        release_media({"proxy": proxy})
+        touch(proxy["dir"], 1000 - age)
+
+    prune_cache(max_mb=1.5)
+    assert [os.path.isdir(proxy["dir"]) for proxy in proxies] == [False, True, False]
+
+    prune_cache(max_mb=0)
+    assert os.path.isdir(proxies[1]["dir"])
+
+
+def test_prune_skips_proxy_in_use(tmp_path, builds):
+    in_use = get_proxy(video(tmp_path, "a.webm", b"a"), {"fps": 30})
+    idle = get_proxy(video(tmp_path, "b.webm", b"b"), {"fps": 30})
+    release_proxy(idle["key"])
+    touch(in_use["dir"], 100)
+    touch(idle["dir"], 200)
+
+    prune_cache(max_mb=0.5)
+    assert os.path.isdir(in_use["dir"])
+    assert not os.path.isdir(idle["dir"])
+
+    release_media({"proxy": in_use})
+    prune_cache(max_mb=0.5)
+    assert not os.path.isdir(in_use["dir"])
+
+
+def test_pruned_proxy_is_rebuilt(tmp_path, builds):
+    path = video(tmp_path, "a.webm", b"a")
+    proxy = get_proxy(path, {"fps": 30})
+    release_proxy(proxy["key"])
+    prune_cache(max_mb=0.5)
+
+    assert not get_proxy(path, {"fps": 30})["cached"]
+    assert builds == [path, path]
+
+
+def test_prune_ignores_unfinished_builds(cache):
+    work_dir = cache / ".key.tmp"
+    work_dir.mkdir(parents=True)
+    (work_dir / proxy_media.VIDEO_FILE).write_bytes(b"\0" * MB)
+
+    prune_cache(max_mb=0.5)
+    assert work_dir.is_dir()
+
+
+def test_release_media_without_proxy():
+    release_media(None)
+    release_media({"plan": {}})
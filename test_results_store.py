@@ -0,0 +1,77 @@
+import pytest
+
+from utils.config import RESULTS_JOURNAL_MODE
+from utils.results_store import get_connection, save_result, get_result, query_results
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / "results.db")
+
+
+def make_result(score, focus, events=0):
+    return {
+        "transcription": f"answer with score {score}",
+        "evaluation": {"id": 2, "score": score, "reason": "ok"},
+        "eye_focus": {
+            "status": "success",
+            "focus_percentage": focus,
+            "suspicious_event_count": events,
+            "suspicious_events_list": [{"direction": "Kiri"}] * events,
+        },
+    }
+
+
+def test_round_trip(db):
+    result = make_result(3, 91.5, events=1)
+    result_id = save_result(result, source="single", candidate_id=10, file="question_2.webm", db_path=db)
+
+    stored = get_result(result_id, db_path=db)
+    assert stored["status"] == "success"
+    assert stored["candidate_id"] == 10
+    # question_id diambil dari evaluasi jika tidak diberikan
+    assert stored["question_id"] == 2
+    assert stored["score"] == 3
+    assert stored["focus_percentage"] == 91.5
+    assert stored["suspicious_event_count"] == 1
+    assert stored["transcription"] == result["transcription"]
+    assert stored["evaluation"] == result["evaluation"]
+    assert stored["eye_focus"] == result["eye_focus"]
+
+    assert get_result(result_id + 1, db_path=db) is None
+
+
+def test_status_partial_and_failed(db):
+    partial = save_result({"transcription": "x", "evaluation": {"score": 1},
+                           "eye_focus": {"status": "failed", "error": "no face"}}, source="batch", db_path=db)
+    failed = save_result({"status": "failed", "error": "boom"}, source="batch", db_path=db)
+
+    assert get_result(partial, db_path=db)["status"] == "partial"
+    assert get_result(partial, db_path=db)["focus_percentage"] is None
+    assert get_result(failed, db_path=db)["status"] == "failed"
+
+
+def test_query_filters_order_and_paging(db):
+    for score, focus in [(1, 40.0), (3, 90.0), (4, 75.0)]:
+        save_result(make_result(score, focus), source="batch", candidate_id=10, db_path=db)
+    save_result(make_result(2, 99.0), source="live", candidate_id=11, db_path=db)
+
+    page = query_results(candidate_id=10, order_by="score", descending=False, limit=2, db_path=db)
+    assert page["total"] == 3
+    assert [item["score"] for item in page["items"]] == [1, 3]
+    assert "transcript" not in page["items"][0]
+
+    page = query_results(candidate_id=10, order_by="score", descending=False, limit=2, offset=2, db_path=db)
+    assert [item["score"] for item in page["items"]] == [4]
+
+    assert query_results(min_focus=80, db_path=db)["total"] == 2
+    assert query_results(min_score=2, max_score=3, db_path=db)["total"] == 2
+    assert query_results(source="live", db_path=db)["items"][0]["candidate_id"] == 11
+
+    with pytest.raises(ValueError):
+        query_results(order_by="transcript", db_path=db)
+
+
+def test_journal_mode(db):
+    mode = get_connection(db).execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode.upper() == RESULTS_JOURNAL_MODE
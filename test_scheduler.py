@@ -0,0 +1,92 @@
+import time
+import threading
+
+from utils.scheduler import PriorityGate, PriorityQueue, priority_scope, current_priority
+
+
+def wait_for_depth(gate, priority, depth):
+    deadline = time.monotonic() + 2
+    while gate.stats()[priority]["depth"] < depth:
+        assert time.monotonic() < deadline, f"{priority} waiter tidak masuk antrean"
+        time.sleep(0.005)
+
+
+def start_waiter(gate, priority, order):
+    def run():
+        with gate.slot(priority):
+            order.append(priority)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def run_contended(gate, first, second, delay=0.0):
+    """
+    Slot tunggal dipegang, `first` lalu `second` antre, lalu slot dilepas.
+    """
+    order = []
+    held = gate.acquire("interactive")
+
+    threads = [start_waiter(gate, first, order)]
+    wait_for_depth(gate, first, 1)
+    threads.append(start_waiter(gate, second, order))
+    wait_for_depth(gate, second, 1)
+
+    time.sleep(delay)
+    gate.release(held)
+    for thread in threads:
+        thread.join(2)
+    return order
+
+
+def test_gate_interactive_before_batch():
+    gate = PriorityGate(1, aging_seconds=60)
+    assert run_contended(gate, "batch", "interactive") == ["interactive", "batch"]
+
+
+def test_gate_aged_batch_goes_first():
+    gate = PriorityGate(1, aging_seconds=0.05)
+    assert run_contended(gate, "batch", "interactive", delay=0.1) == ["batch", "interactive"]
+
+
+def test_gate_stats():
+    gate = PriorityGate(1, aging_seconds=60)
+    run_contended(gate, "batch", "interactive")
+
+    stats = gate.stats()
+    assert stats["interactive"]["completed"] == 2
+    assert stats["batch"]["completed"] == 1
+    assert stats["interactive"]["active"] == 0 and stats["batch"]["active"] == 0
+
+
+def test_gate_without_limit_does_not_block():
+    gate = PriorityGate(0)
+    priorities = [gate.acquire("batch") for _ in range(5)]
+    assert gate.stats()["batch"]["active"] == 5
+    for priority in priorities:
+        gate.release(priority)
+
+
+def test_queue_order_and_aging():
+    q = PriorityQueue(aging_seconds=60)
+    q.put("b1", "batch")
+    q.put("i1", "interactive")
+    q.put("i2", "interactive")
+    assert [q.get_nowait() for _ in range(3)] == ["i1", "i2", "b1"]
+
+    q = PriorityQueue(aging_seconds=0.05)
+    q.put("b1", "batch")
+    time.sleep(0.1)
+    q.put("i1", "interactive")
+    assert [q.get_nowait() for _ in range(2)] == ["b1", "i1"]
+
+
+def test_priority_scope():
+    assert current_priority() == "interactive"
+    with priority_scope("batch"):
+        assert current_priority() == "batch"
+        q = PriorityQueue()
+        q.put("item")
+        assert q.stats()["batch"]["depth"] == 1
+    assert current_priority() == "interactive"
@@ -0,0 +1,95 @@
+import threading
+
+import pytest
+
+from utils.whisper_batcher import WhisperBatcher
+
+
+class FakeModel:
+    """
+    `run_batch` palsu: mencatat isi setiap batch. Batch pertama ditahan sampai
+    `release` di-set, supaya chunk berikutnya sempat antre.
+    """
+
+    def __init__(self, hold_first=False):
+        self.batches = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        if not hold_first:
+            self.release.set()
+
+    def __call__(self, chunks):
+        self.batches.append(list(chunks))
+        self.started.set()
+        assert self.release.wait(2)
+        return [f"text:{chunk}" for chunk in chunks]
+
+
+def hold_loop(batcher, model):
+    # Chunk pertama menahan thread batcher di dalam `run_batch`
+    first = batcher.submit_async(["first"], "interactive")
+    assert model.started.wait(2)
+    return first
+
+
+def test_results_keep_input_order():
+    batcher = WhisperBatcher(FakeModel(), window_ms=10)
+    assert batcher.submit(["a", "b", "c"]) == ["text:a", "text:b", "text:c"]
+    assert batcher.submit([]) == []
+
+
+def test_interactive_chunks_before_batch():
+    model = FakeModel(hold_first=True)
+    batcher = WhisperBatcher(model, window_ms=10, max_batch_size=2)
+    first = hold_loop(batcher, model)
+
+    batch = batcher.submit_async(["b1", "b2"], "batch")
+    interactive = batcher.submit_async(["i1", "i2"], "interactive")
+    model.release.set()
+
+    for future in first + batch + interactive:
+        future.result(2)
+    assert model.batches == [["first"], ["i1", "i2"], ["b1", "b2"]]
+
+
+def test_window_collects_chunks_up_to_max_batch_size():
+    model = FakeModel(hold_first=True)
+    batcher = WhisperBatcher(model, window_ms=50, max_batch_size=3)
+    first = hold_loop(batcher, model)
+
+    # Lima chunk dari dua request antre selama batch pertama berjalan
+    futures = batcher.submit_async(["a1", "a2"]) + batcher.submit_async(["b1", "b2", "b3"])
+    model.release.set()
+
+    assert [f.result(2) for f in first + futures] == [
+        "text:first", "text:a1", "text:a2", "text:b1", "text:b2", "text:b3"
+    ]
+    assert model.batches == [["first"], ["a1", "a2", "b1"], ["b2", "b3"]]
+
+
+def test_cancelled_chunks_are_not_decoded():
+    model = FakeModel(hold_first=True)
+    batcher = WhisperBatcher(model, window_ms=10)
+    first = hold_loop(batcher, model)
+
+    kept, dropped = batcher.submit_async(["kept", "dropped"])
+    assert dropped.cancel()
+    model.release.set()
+
+    first[0].result(2)
+    assert kept.result(2) == "text:kept"
+    assert dropped.cancelled()
+    assert model.batches == [["first"], ["kept"]]
+
+
+def test_error_fails_every_future_in_batch():
+    def broken(chunks):
+        raise RuntimeError("generate failed")
+
+    batcher = WhisperBatcher(broken, window_ms=10)
+    with pytest.raises(RuntimeError, match="generate failed"):
+        batcher.submit(["a", "b"])
+
+    # Thread batcher tetap hidup setelah error
+    batcher.run_batch = FakeModel()
+    assert batcher.submit(["c"]) == ["text:c"]
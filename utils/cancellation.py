@@ -0,0 +1,318 @@
+import os
+import re
+import time
+import uuid
+import threading
+import contextvars
+from contextlib import contextmanager
+
+from utils.config import CANCEL_DIR, CANCEL_POLL_SECONDS
+
+
+# =======================
+# CANCELLATION
+# =======================
+# Pembatalan kooperatif: stage berat mengecek token di titik aman (antar chunk
+# Whisper, tiap GAZE_CANCEL_CHECK_FRAMES frame gaze, sebelum panggilan LLM) lalu
+# berhenti dengan `Cancelled`. Token dibawa lewat contextvar seperti prioritas
+# (utils/scheduler.py), jadi kode pipeline tidak perlu meneruskannya sebagai argumen.
+#
+# Pemicu: client putus, deadline per request, atau DELETE /jobs/{id}. Karena API
+# berjalan dengan beberapa worker uvicorn, DELETE yang mendarat di proses lain
+# menulis penanda di CANCEL_DIR yang dibaca monitor di proses pemilik job.
+
+# Penanda hanya ditulis untuk job yang sedang berjalan, jadi cukup beberapa putaran monitor
+MARKER_MAX_AGE_SECONDS = max(30, 10 * CANCEL_POLL_SECONDS)
+ACTIVE_STALE_SECONDS = max(30, 10 * CANCEL_POLL_SECONDS)
+
+_JOB_ID = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+
+class Cancelled(Exception):
+    """
+    Pekerjaan dibatalkan sebelum selesai. `args[0]` = alasan.
+    """
+
+
+def check_job_id(job_id):
+    if not _JOB_ID.match(job_id or "") or job_id.startswith(".") or job_id == "active":
+        raise ValueError("Job ID hanya boleh berisi huruf, angka, '_', '-', '.' (maks. 64 karakter)")
+    return job_id
+
+
+class CancelToken:
+
+    def __init__(self, job_id=None, deadline_seconds=None, label=None):
+        self.id = check_job_id(job_id) if job_id else uuid.uuid4().hex
+        self.label = label
+        self.started_at = time.time()
+        self.deadline = time.monotonic() + deadline_seconds if deadline_seconds and deadline_seconds > 0 else None
+        self.reason = None
+
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        if not self._event.is_set() and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("deadline")
+        return self._event.is_set()
+
+    def cancel(self, reason="cancelled"):
+        """
+        Returns False jika sudah dibatalkan sebelumnya.
+        """
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"[CANCEL] Callback gagal untuk job {self.id}: {e}")
+        return True
+
+    def on_cancel(self, callback):
+        """
+        Panggil `callback` saat token dibatalkan (langsung jika sudah).
+        Dipakai untuk meneruskan pembatalan ke proses lain (worker gaze).
+
+        Returns:
+            callable: Melepas callback.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove_callback(callback)
+        callback()
+        return lambda: None
+
+    def _remove_callback(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def check(self):
+        if self.cancelled:
+            raise Cancelled(self.reason)
+
+    def info(self):
+        return {
+            "id": self.id,
+            "label": self.label,
+            "started_at": self.started_at,
+            "deadline_in_seconds": round(self.deadline - time.monotonic(), 1) if self.deadline is not None else None,
+            "cancelled": self._event.is_set(),
+            "reason": self.reason,
+        }
+
+
+# =======================
+# CONTEXT
+# =======================
+_current_token = contextvars.ContextVar("cancel_token", default=None)
+
+
+def current_token():
+    return _current_token.get()
+
+
+def check_cancelled():
+    """
+    Raise `Cancelled` jika pekerjaan saat ini sudah dibatalkan (no-op tanpa token).
+    """
+    token = _current_token.get()
+    if token is not None:
+        token.check()
+
+
+@contextmanager
+def cancel_scope(token):
+    context_token = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(context_token)
+
+
+def run_in_scope(token, fn, *args, **kwargs):
+    """
+    `fn(*args, **kwargs)` dengan `token` aktif; untuk `run_in_threadpool`.
+    """
+    with cancel_scope(token):
+        return fn(*args, **kwargs)
+
+
+# =======================
+# REGISTRY (DELETE /jobs/{id})
+# =======================
+# Setiap job yang berjalan punya file di CANCEL_DIR/active/<id> (disentuh monitor
+# tiap CANCEL_POLL_SECONDS), jadi semua worker tahu ID mana yang sedang dipakai:
+# ID duplikat ditolak, dan DELETE untuk ID yang tidak berjalan tidak meninggalkan penanda.
+_jobs = {}
+_jobs_lock = threading.Lock()
+_monitor = None
+
+
+class JobConflict(ValueError):
+    """
+    Job ID sedang dipakai request lain.
+    """
+
+
+class JobNotFound(KeyError):
+    """
+    Tidak ada job berjalan dengan ID ini.
+    """
+
+
+def _active_path(job_id):
+    return os.path.join(CANCEL_DIR, "active", job_id)
+
+
+def _marker_path(job_id):
+    return os.path.join(CANCEL_DIR, job_id)
+
+
+def _active_elsewhere(job_id):
+    # File active yang tidak disentuh lagi = proses pemiliknya mati
+    try:
+        return time.time() - os.path.getmtime(_active_path(job_id)) <= ACTIVE_STALE_SECONDS
+    except OSError:
+        return False
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _create_active(job_id):
+    # O_EXCL: dua worker yang mendaftarkan ID sama bersamaan, hanya satu yang menang
+    for _ in range(2):
+        try:
+            fd = os.open(_active_path(job_id), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            if _active_elsewhere(job_id):
+                return False
+            _remove(_active_path(job_id))
+            continue
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(str(os.getpid()))
+        return True
+    return False
+
+
+def register_job(token):
+    """
+    Raises:
+        JobConflict: ID sedang dipakai di proses ini atau worker lain.
+    """
+    os.makedirs(os.path.dirname(_active_path(token.id)), exist_ok=True)
+    with _jobs_lock:
+        if token.id in _jobs or not _create_active(token.id):
+            raise JobConflict(f"Job ID {token.id} sedang berjalan")
+        _jobs[token.id] = token
+        # Penanda sisa dari job lama dengan ID yang sama tidak berlaku untuk job ini
+        _remove(_marker_path(token.id))
+    _ensure_monitor()
+    return token
+
+
+def unregister_job(token):
+    with _jobs_lock:
+        if _jobs.get(token.id) is token:
+            del _jobs[token.id]
+            _remove(_active_path(token.id))
+            _remove(_marker_path(token.id))
+
+
+def active_jobs():
+    with _jobs_lock:
+        tokens = list(_jobs.values())
+    return [token.info() for token in tokens]
+
+
+def request_cancel(job_id, reason="cancelled"):
+    """
+    Batalkan job. Jika job berjalan di worker lain, tulis penanda untuk worker itu.
+
+    Returns:
+        str: "cancelled" (job ada di proses ini) atau "cancel_requested".
+
+    Raises:
+        JobNotFound: Tidak ada job berjalan dengan ID ini.
+    """
+    check_job_id(job_id)
+    with _jobs_lock:
+        token = _jobs.get(job_id)
+    if token is not None:
+        token.cancel(reason)
+        return "cancelled"
+
+    if not _active_elsewhere(job_id):
+        raise JobNotFound(job_id)
+
+    with open(_marker_path(job_id), "w", encoding="utf-8") as f:
+        f.write(reason)
+    return "cancel_requested"
+
+
+def check_jobs():
+    """
+    Satu putaran monitor: deadline, perpanjang file active, dan penanda dari proses lain.
+    """
+    with _jobs_lock:
+        tokens = list(_jobs.values())
+
+    for token in tokens:
+        try:
+            os.utime(_active_path(token.id))
+        except OSError:
+            pass
+        if token.cancelled:
+            continue
+        marker = _marker_path(token.id)
+        if os.path.exists(marker):
+            try:
+                with open(marker, encoding="utf-8") as f:
+                    reason = f.read().strip() or "cancelled"
+                os.remove(marker)
+            except OSError:
+                reason = "cancelled"
+            token.cancel(reason)
+
+    # Penanda untuk job yang sudah selesai sebelum sempat membacanya
+    if os.path.isdir(CANCEL_DIR):
+        now = time.time()
+        for name in os.listdir(CANCEL_DIR):
+            path = _marker_path(name)
+            try:
+                if os.path.isfile(path) and now - os.path.getmtime(path) > MARKER_MAX_AGE_SECONDS:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+def _monitor_loop():
+    while True:
+        time.sleep(CANCEL_POLL_SECONDS)
+        try:
+            check_jobs()
+        except Exception as e:
+            print(f"[CANCEL] Pengecekan job gagal: {e}")
+
+
+def _ensure_monitor():
+    global _monitor
+    with _jobs_lock:
+        if _monitor is None:
+            _monitor = threading.Thread(target=_monitor_loop, name="cancel-monitor", daemon=True)
+            _monitor.start()
@@ -0,0 +1,267 @@
+import os
+
+
+# =======================
+# HELPER ENV
+# =======================
+
+def env_int(name, default):
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Environment variable {name} harus integer, dapat {value!r}")
+
+
+def env_float(name, default):
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"Environment variable {name} harus angka, dapat {value!r}")
+
+
+def env_bool(name, default):
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+# =======================
+# PATH
+# =======================
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAYLOAD_PATH = os.getenv("PAYLOAD_PATH", os.path.join(BASE_DIR, "data", "payload.json"))
+
+
+# =======================
+# CANDIDATE PROCESSING
+# =======================
+
+# Jumlah jawaban kandidat yang diproses bersamaan (0 = semua sekaligus)
+CANDIDATE_MAX_WORKERS = env_int("CANDIDATE_MAX_WORKERS", 0)
+
+
+# =======================
+# INFERENCE SERVER
+# =======================
+
+# Path Unix socket inference_server.py. Kosong = model dimuat di proses API sendiri.
+INFERENCE_SOCKET = os.getenv("INFERENCE_SOCKET", "")
+INFERENCE_AUTHKEY = os.getenv("INFERENCE_AUTHKEY", "ai-interview").encode()
+
+
+# =======================
+# WHISPER
+# =======================
+
+# Dynamic batching: chunk dari semua request digabung dalam satu `generate`
+WHISPER_BATCHING = env_bool("WHISPER_BATCHING", True)
+WHISPER_BATCH_WINDOW_MS = env_float("WHISPER_BATCH_WINDOW_MS", 50)
+WHISPER_MAX_BATCH_SIZE = env_int("WHISPER_MAX_BATCH_SIZE", 8)
+# Maksimal chunk 30 detik per request yang antre/di-decode bersamaan (membatasi memori audio)
+WHISPER_MAX_INFLIGHT_CHUNKS = env_int("WHISPER_MAX_INFLIGHT_CHUNKS", 8)
+
+# Bobot Whisper: "fp32" (default), "bf16"/"fp16" = snapshot hasil convert_whisper_weights.py,
+# "auto" = snapshot presisi rendah jika ada. Presisi rendah harus dipilih eksplisit: di CPU tanpa
+# bf16 native lebih lambat, dan transkrip bisa sedikit berbeda.
+WHISPER_WEIGHTS = os.getenv("WHISPER_WEIGHTS", "fp32")
+
+# Speculative decoding: path draft model (relatif terhadap root project), kosong = nonaktif
+WHISPER_DRAFT_MODEL_DIR = os.getenv("WHISPER_DRAFT_MODEL_DIR", "")
+
+
+# =======================
+# LIVE INTERVIEW (WebSocket)
+# =======================
+
+# Panjang chunk audio live yang ditranskripsi di background. Lebih pendek =
+# laporan akhir lebih cepat (chunk terakhir kecil), tapi encoder Whisper dipanggil lebih sering.
+LIVE_CHUNK_SECONDS = env_float("LIVE_CHUNK_SECONDS", 10)
+
+
+# =======================
+# GAZE
+# =======================
+
+# "full" = gaze backend di setiap frame, "adaptive" = jarang saat arah stabil, rapat di sekitar transisi.
+# Adaptive bersifat lossy (lirikan sangat singkat di antara sampel bisa terlewat), jadi opt-in saja.
+GAZE_SAMPLING = os.getenv("GAZE_SAMPLING", "full")
+GAZE_SAMPLE_MAX_STEP = env_int("GAZE_SAMPLE_MAX_STEP", 6)
+# Mode adaptive: hentikan analisis jika wajah tidak ditemukan di N detik pertama (0 = nonaktif)
+GAZE_NO_FACE_BAIL_SECONDS = env_float("GAZE_NO_FACE_BAIL_SECONDS", 10)
+
+# Backend deteksi mata: "facemesh", "landmarker" (MediaPipe Tasks), atau "opencv"
+GAZE_BACKEND = os.getenv("GAZE_BACKEND", "facemesh")
+FACE_LANDMARKER_MODEL = os.getenv("FACE_LANDMARKER_MODEL", os.path.join("models", "face_landmarker.task"))
+
+# Jumlah worker process gaze (backend tetap hidup antar request). 0 = jalankan di proses API.
+GAZE_POOL_SIZE = env_int("GAZE_POOL_SIZE", 2)
+
+
+# =======================
+# RESULTS STORE
+# =======================
+
+RESULTS_DB = os.getenv("RESULTS_DB", os.path.join(BASE_DIR, "data", "results.db"))
+# DELETE: aman untuk volume bersama (broker worker di host lain ikut menulis).
+# WAL butuh shared memory di satu host; pakai hanya jika semua penulis ada di host yang sama.
+RESULTS_JOURNAL_MODE = os.getenv("RESULTS_JOURNAL_MODE", "DELETE").upper()
+
+
+# =======================
+# BATCH RUNNER
+# =======================
+
+# Jumlah video yang diproses bersamaan oleh batch_runner.py
+BATCH_WORKERS = env_int("BATCH_WORKERS", 4)
+
+# watch_folder.py: rescan folder tiap N detik (inotify membangunkan lebih cepat jika tersedia)
+WATCH_POLL_SECONDS = env_float("WATCH_POLL_SECONDS", 5)
+# File baru diproses setelah ukuran + mtime tidak berubah selama N detik (recorder selesai menulis)
+WATCH_STABLE_SECONDS = env_float("WATCH_STABLE_SECONDS", 10)
+
+
+# =======================
+# CPU BUDGET
+# =======================
+
+# Bagi core antar stage supaya thread pool torch/OpenCV/tokenizers tidak saling berebut
+CPU_BUDGET_ENABLED = env_bool("CPU_BUDGET_ENABLED", True)
+# Jumlah core per stage (0 = otomatis, lihat utils/cpu_budget.py)
+CPU_BUDGET_ASR = env_int("CPU_BUDGET_ASR", 0)
+CPU_BUDGET_GAZE = env_int("CPU_BUDGET_GAZE", 0)
+# Pin proses model dan worker gaze ke core masing-masing (Linux)
+CPU_PIN_AFFINITY = env_bool("CPU_PIN_AFFINITY", False)
+# Jumlah proses pemegang model di host ini (mis. uvicorn --workers) yang berbagi core.
+# Setiap proses mengklaim satu bagian core; proses di luar jumlah ini tidak di-pin.
+CPU_PIN_PROCESSES = env_int("CPU_PIN_PROCESSES", 1)
+
+
+# =======================
+# EVALUATOR (CASCADE)
+# =======================
+
+# Tier 1 = kemiripan embedding jawaban dengan level RUBRIC; LLM (Ollama) hanya
+# dipanggil jika tier 1 ragu. False = semua jawaban langsung dinilai LLM.
+# Default off sampai benchmarks/bench_eval_cascade.py menunjukkan kesesuaian skor dengan LLM.
+EVAL_CASCADE = env_bool("EVAL_CASCADE", False)
+# Cascade: jawaban dengan jumlah kata di bawah ini dianggap tidak dijawab (skor 0, tanpa model)
+EVAL_MIN_WORDS = env_int("EVAL_MIN_WORDS", 3)
+# Eskalasi jika selisih cosine similarity level terbaik dan kedua di bawah margin ini
+EVAL_MIN_MARGIN = env_float("EVAL_MIN_MARGIN", 0.05)
+# Eskalasi jika similarity level terbaik di bawah nilai ini (jawaban tidak mirip level mana pun)
+EVAL_MIN_SIMILARITY = env_float("EVAL_MIN_SIMILARITY", 0.3)
+# Eskalasi jika dua level teratas adalah 2 dan 3 (batas lulus/tidak)
+EVAL_ESCALATE_BOUNDARY = env_bool("EVAL_ESCALATE_BOUNDARY", True)
+
+
+# =======================
+# JOB BROKER (multi-node)
+# =======================
+
+# Antrean job batch bersama di volume yang di-mount semua node (SQLite, tanpa service lain)
+JOBS_DB = os.getenv("JOBS_DB", os.path.join(BASE_DIR, "data", "jobs.db"))
+# Jumlah thread worker broker per proses API (0 = node ini tidak mengambil job)
+BROKER_WORKERS = env_int("BROKER_WORKERS", 1)
+# Lease job; worker memperpanjangnya (heartbeat) tiap sepertiga lease selama memproses
+BROKER_LEASE_SECONDS = env_float("BROKER_LEASE_SECONDS", 120)
+# Jeda polling saat antrean kosong
+BROKER_POLL_SECONDS = env_float("BROKER_POLL_SECONDS", 2)
+# Job gagal/lease habis diulang sampai N kali sebelum ditandai failed
+BROKER_MAX_ATTEMPTS = env_int("BROKER_MAX_ATTEMPTS", 3)
+
+
+# =======================
+# PROFILING
+# =======================
+
+# Artefak profil per request (header X-Profile: 1 / form profile=true)
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(BASE_DIR, "data", "profiles"))
+PROFILE_SAMPLE_INTERVAL_MS = env_float("PROFILE_SAMPLE_INTERVAL_MS", 5)
+
+
+# =======================
+# MEDIA PROBE
+# =======================
+
+# ffprobe sebelum stage berat: tolak file rusak/terlalu panjang, pilih parameter dari metadata
+MEDIA_PROBE_ENABLED = env_bool("MEDIA_PROBE_ENABLED", True)
+MEDIA_PROBE_TIMEOUT_SECONDS = env_float("MEDIA_PROBE_TIMEOUT_SECONDS", 10)
+MEDIA_MIN_DURATION_SECONDS = env_float("MEDIA_MIN_DURATION_SECONDS", 1)
+# 0 = tanpa batas atas: gaze (GazeAccumulator) dan audio (dibaca per blok) memorinya datar untuk rekaman multi-jam
+MEDIA_MAX_DURATION_SECONDS = env_float("MEDIA_MAX_DURATION_SECONDS", 0)
+# Frame lebih lebar dari ini diperkecil sebelum gaze backend (landmark ternormalisasi, rasio tetap)
+MEDIA_GAZE_MAX_WIDTH = env_int("MEDIA_GAZE_MAX_WIDTH", 1280)
+# Video lebih panjang dari ini diperkecil lagi ke MEDIA_LONG_GAZE_MAX_WIDTH (0 = nonaktif).
+# Sampling gaze tidak diubah otomatis: setiap frame tetap dianalisis.
+MEDIA_LONG_VIDEO_SECONDS = env_float("MEDIA_LONG_VIDEO_SECONDS", 600)
+MEDIA_LONG_GAZE_MAX_WIDTH = env_int("MEDIA_LONG_GAZE_MAX_WIDTH", 640)
+
+
+# =======================
+# PRIORITY SCHEDULER
+# =======================
+
+# Request interaktif (/process/single, stream, live) didahulukan dari batch di
+# antrean Whisper, gaze, dan LLM. Item batch yang menunggu lebih lama dari ini
+# dilayani lebih dulu (anti-starvation).
+SCHED_AGING_SECONDS = env_float("SCHED_AGING_SECONDS", 30)
+# Slot analisis gaze bersamaan (0 = sama dengan GAZE_POOL_SIZE; keduanya 0 = tanpa batas)
+SCHED_GAZE_SLOTS = env_int("SCHED_GAZE_SLOTS", 0)
+# Panggilan LLM (Ollama) bersamaan
+SCHED_LLM_SLOTS = env_int("SCHED_LLM_SLOTS", 1)
+
+
+# =======================
+# MODEL LIFECYCLE
+# =======================
+
+# Model (Whisper, mpnet, model Ollama) dilepas setelah tidak dipakai selama N detik
+# dan dimuat ulang otomatis saat dipakai lagi (0 = tidak pernah dilepas)
+MODEL_IDLE_TTL_SECONDS = env_float("MODEL_IDLE_TTL_SECONDS", 1800)
+# Jika memori tersedia (cgroup/host) di bawah N MB, lepas model idle paling lama (LRU). 0 = nonaktif.
+MODEL_MIN_AVAILABLE_MB = env_int("MODEL_MIN_AVAILABLE_MB", 0)
+MODEL_CHECK_INTERVAL_SECONDS = env_float("MODEL_CHECK_INTERVAL_SECONDS", 30)
+# Muat model saat proses start (seperti sebelumnya); False = saat pertama dipakai
+MODEL_PRELOAD = env_bool("MODEL_PRELOAD", True)
+
+
+# =======================
+# PROXY MEDIA
+# =======================
+
+# Saat ingest, video didecode sekali menjadi proxy murah (audio 16 kHz float32 +
+# video kecil ber-fps rendah) yang di-cache per hash isi file. Transkripsi, gaze,
+# dan re-run membaca proxy, bukan file asli.
+PROXY_ENABLED = env_bool("PROXY_ENABLED", True)
+# Request interaktif tidak menunggu proxy (satu decode penuh sebelum ASR mulai);
+# proxy hanya dipakai pekerjaan berprioritas batch (batch runner, watch folder,
+# broker, /process/batch) yang sering me-re-run file yang sama.
+PROXY_INTERACTIVE = env_bool("PROXY_INTERACTIVE", False)
+PROXY_DIR = os.getenv("PROXY_DIR", os.path.join(BASE_DIR, "data", "proxies"))
+# FPS dan lebar maksimum video proxy untuk gaze (tidak pernah menaikkan fps/resolusi asli)
+PROXY_FPS = env_float("PROXY_FPS", 15)
+PROXY_MAX_WIDTH = env_int("PROXY_MAX_WIDTH", 640)
+# Batas ukuran cache; proxy paling lama tidak dipakai dihapus lebih dulu (0 = tanpa batas)
+PROXY_MAX_CACHE_MB = env_int("PROXY_MAX_CACHE_MB", 20000)
+
+
+# =======================
+# CANCELLATION
+# =======================
+
+# Batas waktu default per request /process/single (0 = tanpa batas; bisa di-override header X-Deadline-Seconds)
+REQUEST_DEADLINE_SECONDS = env_float("REQUEST_DEADLINE_SECONDS", 0)
+# DELETE /jobs/{id} yang mengenai worker uvicorn lain ditandai lewat file di folder ini (volume bersama)
+CANCEL_DIR = os.getenv("CANCEL_DIR", os.path.join(BASE_DIR, "data", "cancel"))
+# Interval pengecekan deadline + penanda cancel dari proses lain
+CANCEL_POLL_SECONDS = env_float("CANCEL_POLL_SECONDS", 1)
+# Analisis gaze mengecek pembatalan tiap N frame
+GAZE_CANCEL_CHECK_FRAMES = env_int("GAZE_CANCEL_CHECK_FRAMES", 30)
@@ -0,0 +1,189 @@
+import os
+import tempfile
+
+from utils.config import (
+    CPU_BUDGET_ENABLED, CPU_BUDGET_ASR, CPU_BUDGET_GAZE, CPU_PIN_AFFINITY, CPU_PIN_PROCESSES, GAZE_POOL_SIZE
+)
+
+
+# =======================
+# CPU BUDGET
+# =======================
+# torch (Whisper + sentence-transformers), OpenCV/MediaPipe, dan tokenizers
+# masing-masing membuat thread pool seukuran semua core. Jika jalan bersamaan
+# CPU jadi oversubscribed. Modul ini membagi core per stage:
+#   - ASR  : thread intra-op torch di proses yang memegang model
+#   - GAZE : total core untuk worker pool gaze (dibagi rata per worker)
+
+
+def available_cores():
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        return list(range(os.cpu_count() or 1))
+
+
+# Snapshot sebelum proses ini di-pin, supaya pembagian core tetap memakai semua core
+ALL_CORES = available_cores()
+
+PIN_LOCK_DIR = os.path.join(tempfile.gettempdir(), "ai-interview-cpu-pin")
+
+# Slot pin milik proses ini: None = belum diklaim, -1 = tidak dapat slot (tidak di-pin)
+_pin_slot = None
+_pin_lock_file = None
+
+
+def pin_slot():
+    """
+    Klaim satu dari CPU_PIN_PROCESSES slot pin (flock, dilepas otomatis saat proses mati).
+    Tanpa ini semua worker uvicorn menghitung core yang sama dan di-pin ke core yang sama.
+
+    Returns:
+        int | None: Index slot, atau None jika pin nonaktif / semua slot terpakai.
+    """
+    global _pin_slot, _pin_lock_file
+    if not CPU_PIN_AFFINITY:
+        return None
+    if _pin_slot is None:
+        _pin_slot = -1
+        try:
+            import fcntl
+            os.makedirs(PIN_LOCK_DIR, exist_ok=True)
+            for index in range(max(CPU_PIN_PROCESSES, 1)):
+                lock_file = open(os.path.join(PIN_LOCK_DIR, f"slot-{index}.lock"), "w")
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    lock_file.close()
+                    continue
+                _pin_slot, _pin_lock_file = index, lock_file
+                break
+        except (ImportError, OSError) as e:
+            print(f"[CPU] Gagal mengklaim slot CPU affinity: {e}")
+
+        if _pin_slot < 0:
+            print(f"[CPU] Semua {CPU_PIN_PROCESSES} slot CPU affinity terpakai, proses {os.getpid()} tidak di-pin "
+                  f"(set CPU_PIN_PROCESSES sesuai jumlah worker)")
+    return _pin_slot if _pin_slot >= 0 else None
+
+
+def process_cores():
+    """
+    Core milik proses ini. Dengan CPU_PIN_AFFINITY, ALL_CORES dibagi rata ke
+    CPU_PIN_PROCESSES proses sesuai slot-nya; selain itu semua core.
+    """
+    slot = pin_slot()
+    if slot is None:
+        return ALL_CORES
+
+    per_process = max(len(ALL_CORES) // max(CPU_PIN_PROCESSES, 1), 1)
+    start = (slot * per_process) % len(ALL_CORES)
+    return [ALL_CORES[(start + i) % len(ALL_CORES)] for i in range(per_process)]
+
+
+def stage_budgets(cores=None):
+    """
+    Jumlah core per stage. Nilai 0 di config = otomatis:
+    gaze mendapat satu core per worker pool (maks. separuh core), sisanya ASR.
+
+    Returns:
+        dict: {"asr": int, "gaze": int, "total": int}
+    """
+    total = len(cores if cores is not None else process_cores())
+
+    gaze = CPU_BUDGET_GAZE or min(max(GAZE_POOL_SIZE, 1), max(total // 2, 1))
+    asr = CPU_BUDGET_ASR or max(total - gaze, 1)
+
+    return {"asr": asr, "gaze": gaze, "total": total}
+
+
+def stage_cores(stage):
+    """
+    Core yang dialokasikan untuk stage saat CPU_PIN_AFFINITY aktif:
+    ASR di core pertama bagian proses ini, gaze di core setelahnya (berputar jika kurang).
+    """
+    cores = process_cores()
+    budgets = stage_budgets(cores)
+
+    if stage == "asr":
+        return cores[:budgets["asr"]]
+
+    start = budgets["asr"] % len(cores)
+    return [cores[(start + i) % len(cores)] for i in range(budgets["gaze"])]
+
+
+def pin_current_process(cores, pin=None):
+    """
+    `pin`: None = sesuai slot proses ini (`pin_slot`); worker gaze menerima
+    keputusan proses induknya.
+    """
+    if pin is None:
+        pin = pin_slot() is not None
+    if not CPU_PIN_AFFINITY or not pin or not cores:
+        return
+    try:
+        os.sched_setaffinity(0, set(cores))
+    except (AttributeError, OSError) as e:
+        print(f"[CPU] Gagal mengatur CPU affinity: {e}")
+
+
+def configure_tokenizers():
+    """
+    Matikan thread pool HuggingFace tokenizers; dipanggil sebelum tokenizer dipakai.
+    """
+    if CPU_BUDGET_ENABLED:
+        os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+
+def configure_torch():
+    """
+    Batasi thread torch ke budget ASR. Dipanggil di proses yang memuat model.
+    """
+    if not CPU_BUDGET_ENABLED:
+        return
+
+    import torch
+
+    budgets = stage_budgets()
+    torch.set_num_threads(budgets["asr"])
+    try:
+        # Hanya bisa di-set sebelum ada pekerjaan inter-op pertama
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+
+    pin_current_process(stage_cores("asr"))
+
+
+def configure_gaze_worker(cores, worker_index=0, workers=1, pin=False):
+    """
+    Untuk worker gaze: OpenCV memakai bagian budget gaze milik worker ini,
+    dan (opsional) worker di-pin ke core gaze miliknya.
+
+    Args:
+        cores (list[int]): Hasil `stage_cores("gaze")` dari proses induk
+            (worker mewarisi affinity induk, jadi tidak bisa menghitung sendiri).
+        pin (bool): Proses induk mendapat slot pin (`pin_slot`).
+    """
+    if not CPU_BUDGET_ENABLED or not cores:
+        return
+
+    import cv2
+
+    per_worker = max(len(cores) // max(workers, 1), 1)
+    cv2.setNumThreads(per_worker)
+
+    start = (worker_index * per_worker) % len(cores)
+    pin_current_process([cores[(start + i) % len(cores)] for i in range(per_worker)], pin=pin)
+
+
+def configure_inprocess_gaze():
+    """
+    Gaze berjalan di proses API (GAZE_POOL_SIZE=0): batasi thread OpenCV saja.
+    """
+    if not CPU_BUDGET_ENABLED:
+        return
+
+    import cv2
+
+    cv2.setNumThreads(stage_budgets()["gaze"])
@@ -1,9 +1,12 @@
 import cv2
-import mediapipe as mp
 import numpy as np
 import os
 import time
 
+from utils.config import GAZE_SAMPLING, GAZE_SAMPLE_MAX_STEP, GAZE_NO_FACE_BAIL_SECONDS, GAZE_CANCEL_CHECK_FRAMES
+from utils.cancellation import Cancelled
+from utils.gaze_backends import measurement_from_points, create_gaze_backend
+
 def get_gaze_direction(face_landmarks):
     """
     Menganalisis landmark wajah untuk menentukan arah pandang horizontal.
@@ -12,21 +15,35 @@ def get_gaze_direction(face_landmarks):
     Args:
         face_landmarks: Objek landmark wajah dari MediaPipe.
         
+    Returns:
+        str: "Kiri", "Kanan", "Tengah", atau "Tidak Terdeteksi".
+    """
+    try:
+        return direction_from_measurement(measurement_from_points(face_landmarks.landmark))
+    except Exception:
+        return "Tidak Terdeteksi"
+
+
+def direction_from_measurement(measurement):
+    """
+    Arah pandang dari posisi sudut mata dan iris (GazeMeasurement),
+    dipakai oleh semua gaze backend.
+
     Returns:
         str: "Kiri", "Kanan", "Tengah", atau "Tidak Terdeteksi".
     """
     try:
         # Landmark Mata Kiri (Indeks Landmark MediaPipe)
         # Sudut kiri: 33, Sudut kanan: 133, Iris: 473
-        left_corner_x = face_landmarks.landmark[33].x
-        right_corner_x = face_landmarks.landmark[133].x
-        iris_center_x = face_landmarks.landmark[473].x 
+        left_corner_x = measurement.left_corner_x
+        right_corner_x = measurement.right_corner_x
+        iris_center_x = measurement.iris_center_x
 
         #Landmark Mata Kanan
         # Sudut kiri: 362, Sudut kanan: 263, Iris: 468
-        left_corner_x_right_eye = face_landmarks.landmark[362].x
-        right_corner_x_right_eye = face_landmarks.landmark[263].x
-        iris_center_x_right_eye = face_landmarks.landmark[468].x 
+        left_corner_x_right_eye = measurement.left_corner_x_right_eye
+        right_corner_x_right_eye = measurement.right_corner_x_right_eye
+        iris_center_x_right_eye = measurement.iris_center_x_right_eye
         
         # Mata Kiri
         left_eye_width = right_corner_x - left_corner_x
@@ -69,153 +86,322 @@ def analyze_gaze_log(log, fps):
     Returns:
         dict: Laporan analisis lengkap.
     """
-    total_frames = len(log)
-    if total_frames == 0:
+    if len(log) == 0:
         return {"status": "failed", "error": "Tidak ada frame yang berhasil diproses."}
-    
-    # Gunakan default FPS jika gagal dideteksi
-    if fps is None or fps <= 0 or fps > 100:
-        print(f"Peringatan: FPS terdeteksi {fps} (tidak wajar). Menggunakan default 30 FPS.")
-        fps = 30.0 
-
-    # Filter frame yang valid (wajah terdeteksi)
-    valid_frames = [x for x in log if x != "Wajah Tidak Terdeteksi"]
-    total_detected = len(valid_frames)
-    
-    if total_detected == 0:
-         return {"status": "failed", "error": "Wajah tidak terdeteksi sama sekali dalam video."}
 
-    # Hitung Statistik Dasar
-    tengah_count = valid_frames.count("Tengah")
-    kiri_count = valid_frames.count("Kiri")
-    kanan_count = valid_frames.count("Kanan")
-    
-    focus_percentage = (tengah_count / total_detected) * 100
-    left_percentage = (kiri_count / total_detected) * 100
-    right_percentage = (kanan_count / total_detected) * 100
-
-    # Deteksi Indikator Kecurangan (Suspicious Events)
-    # Logika: Melirik ke samping secara terus-menerus selama > 2 detik
-    suspicious_events = []
-    consecutive_threshold_frames = int(fps * 2)
-    
-    i = 0
-    while i < total_frames:
-        direction = log[i]
-        # Jika sedang melihat ke samping (Kiri atau Kanan)
-        if direction == "Kiri" or direction == "Kanan":
-            start_frame = i
-            # Hitung berapa lama (frame) dia bertahan melihat ke sana
-            while i + 1 < total_frames and log[i+1] == direction:
-                i += 1
-            
-            consecutive_frames = (i - start_frame) + 1
-            duration_seconds = consecutive_frames / fps
-            
-            # Jika durasinya melebihi threshold (2 detik), catat sebagai mencurigakan
-            if consecutive_frames >= consecutive_threshold_frames:
-                suspicious_events.append({
-                    "start_time_seconds": round(start_frame / fps, 2),
-                    "end_time_seconds": round(i / fps, 2),
-                    "duration_seconds": round(duration_seconds, 2),
-                    "direction": direction
-                })
-        i += 1
-
-    # Buat Kesimpulan Otomatis (Summary Note)
-    summary_note_cv = ""
-    suspicious_count = len(suspicious_events)
-
-    if focus_percentage > 85:
-        summary_note_cv = "Kandidat sangat fokus ke kamera (fokus > 85%). Perilaku tidak mencurigakan."
-    elif focus_percentage < 50:
-        summary_note_cv = "PERINGATAN: Tingkat fokus kandidat sangat rendah (< 50%). Indikasi kuat ketidakwajaran."
-    elif suspicious_count > 0:
-        summary_note_cv = f"Kandidat cukup fokus, namun terdeteksi {suspicious_count} kali mengalihkan pandangan cukup lama (>2 detik)."
-    else:
-        summary_note_cv = f"Kandidat cukup fokus ke kamera ({focus_percentage:.0f}%). Tidak ada indikasi mencurigakan yang signifikan."
-
-    # Susun Laporan Akhir (Kontrak Data)
-    return {
-        "status": "success",
-        "video_duration_seconds": round(total_frames / fps, 2),
-        "analysis_fps": round(fps, 2),
-        "focus_percentage": round(focus_percentage, 2),
-        "left_glance_percentage": round(left_percentage, 2),
-        "right_glance_percentage": round(right_percentage, 2),
-        "suspicious_event_count": suspicious_count,
-        "suspicious_events_list": suspicious_events,
-        "summary_note_cv": summary_note_cv
-    }
-
-def process_video_for_gaze(video_path):
+    accumulator = GazeAccumulator(fps)
+    for direction in log:
+        accumulator.update(direction)
+
+    return accumulator.report()
+
+
+NO_FACE = "Wajah Tidak Terdeteksi"
+SIDE_DIRECTIONS = ("Kiri", "Kanan")
+
+
+class GazeAccumulator:
+    """
+    Versi online (stateful) dari `analyze_gaze_log`: arah pandang dimasukkan
+    satu per satu lewat `update`, statistik dan run yang sedang berjalan
+    diperbarui O(1) per frame, dan suspicious event dicatat saat run ditutup.
+    Laporan dari `report()` identik dengan `analyze_gaze_log` untuk log yang sama.
+    """
+
+    def __init__(self, fps):
+        # Gunakan default FPS jika gagal dideteksi
+        if fps is None or fps <= 0 or fps > 100:
+            print(f"Peringatan: FPS terdeteksi {fps} (tidak wajar). Menggunakan default 30 FPS.")
+            fps = 30.0
+
+        self.fps = fps
+        self.consecutive_threshold_frames = int(fps * 2)
+
+        self.total_frames = 0
+        self.total_detected = 0
+        self.direction_counts = {"Tengah": 0, "Kiri": 0, "Kanan": 0}
+        self.suspicious_events = []
+
+        # Run yang sedang berjalan: arah dan frame awal
+        self.run_direction = None
+        self.run_start = 0
+
+    def _run_event(self):
+        """Suspicious event untuk run saat ini (jika memenuhi threshold), atau None."""
+        if self.run_direction not in SIDE_DIRECTIONS:
+            return None
+
+        end_frame = self.total_frames - 1
+        consecutive_frames = (end_frame - self.run_start) + 1
+        if consecutive_frames < self.consecutive_threshold_frames:
+            return None
+
+        return {
+            "start_time_seconds": round(self.run_start / self.fps, 2),
+            "end_time_seconds": round(end_frame / self.fps, 2),
+            "duration_seconds": round(consecutive_frames / self.fps, 2),
+            "direction": self.run_direction
+        }
+
+    def update(self, direction):
+        """
+        Tambahkan arah pandang satu frame.
+
+        Returns:
+            dict | None: Suspicious event jika frame ini menutup run yang mencurigakan.
+        """
+        closed_event = None
+        if direction != self.run_direction:
+            closed_event = self._run_event()
+            if closed_event is not None:
+                self.suspicious_events.append(closed_event)
+            self.run_direction = direction
+            self.run_start = self.total_frames
+
+        self.total_frames += 1
+        if direction != NO_FACE:
+            self.total_detected += 1
+            if direction in self.direction_counts:
+                self.direction_counts[direction] += 1
+
+        return closed_event
+
+    def report(self):
+        """
+        Laporan analisis lengkap (format sama dengan `analyze_gaze_log`).
+        Run yang belum ditutup ikut dihitung tanpa mengubah state.
+        """
+        if self.total_frames == 0:
+            return {"status": "failed", "error": "Tidak ada frame yang berhasil diproses."}
+
+        if self.total_detected == 0:
+            return {"status": "failed", "error": "Wajah tidak terdeteksi sama sekali dalam video."}
+
+        fps = self.fps
+        total_detected = self.total_detected
+
+        focus_percentage = (self.direction_counts["Tengah"] / total_detected) * 100
+        left_percentage = (self.direction_counts["Kiri"] / total_detected) * 100
+        right_percentage = (self.direction_counts["Kanan"] / total_detected) * 100
+
+        suspicious_events = list(self.suspicious_events)
+        pending_event = self._run_event()
+        if pending_event is not None:
+            suspicious_events.append(pending_event)
+
+        suspicious_count = len(suspicious_events)
+
+        if focus_percentage > 85:
+            summary_note_cv = "Kandidat sangat fokus ke kamera (fokus > 85%). Perilaku tidak mencurigakan."
+        elif focus_percentage < 50:
+            summary_note_cv = "PERINGATAN: Tingkat fokus kandidat sangat rendah (< 50%). Indikasi kuat ketidakwajaran."
+        elif suspicious_count > 0:
+            summary_note_cv = f"Kandidat cukup fokus, namun terdeteksi {suspicious_count} kali mengalihkan pandangan cukup lama (>2 detik)."
+        else:
+            summary_note_cv = f"Kandidat cukup fokus ke kamera ({focus_percentage:.0f}%). Tidak ada indikasi mencurigakan yang signifikan."
+
+        return {
+            "status": "success",
+            "video_duration_seconds": round(self.total_frames / fps, 2),
+            "analysis_fps": round(fps, 2),
+            "focus_percentage": round(focus_percentage, 2),
+            "left_glance_percentage": round(left_percentage, 2),
+            "right_glance_percentage": round(right_percentage, 2),
+            "suspicious_event_count": suspicious_count,
+            "suspicious_events_list": suspicious_events,
+            "summary_note_cv": summary_note_cv
+        }
+
+
+def detect_gaze_frame(backend, frame):
+    """
+    Arah pandang untuk satu frame BGR (OpenCV) memakai gaze backend.
+    """
+    measurement = backend.measure(frame)
+    if measurement is None:
+        return NO_FACE
+    return direction_from_measurement(measurement)
+
+
+def read_frame(cap, scale=1.0):
+    """
+    `cap.read()`, dengan frame diperkecil jika `scale` < 1 (lihat MEDIA_GAZE_MAX_WIDTH).
+    """
+    success, frame = cap.read()
+    if success and scale < 1.0:
+        frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return success, frame
+
+
+def read_frames(cap, scale=1.0, cancel_check=None, check_every=GAZE_CANCEL_CHECK_FRAMES):
+    """
+    Generator frame sampai video habis. `cancel_check()` dipanggil tiap
+    `check_every` frame dan menghentikan analisis dengan `Cancelled`.
+    """
+    count = 0
+    while cap.isOpened():
+        success, frame = read_frame(cap, scale)
+        if not success:
+            return
+
+        count += 1
+        if cancel_check is not None and count % check_every == 0:
+            cancel_check()
+        yield frame
+
+
+def read_gaze_full(cap, backend, accumulator, scale=1.0, cancel_check=None):
+    """
+    Analisis setiap frame (full-rate).
+    """
+    for frame in read_frames(cap, scale, cancel_check):
+        accumulator.update(detect_gaze_frame(backend, frame))
+
+    return None
+
+
+def read_gaze_adaptive(cap, backend, accumulator,
+                       max_step=GAZE_SAMPLE_MAX_STEP, bail_seconds=GAZE_NO_FACE_BAIL_SECONDS, scale=1.0,
+                       cancel_check=None):
+    """
+    Sampling adaptif: gaze backend hanya dijalankan tiap `step` frame. Jika arah
+    pandang di kedua ujung dan di tengah frame yang dilewati sama, frame di
+    antaranya dianggap searah dan `step` diperbesar (maks. `max_step`). Jika ada
+    yang berbeda atau wajah hilang, frame yang dilewati dianalisis satu per satu
+    supaya batas run tetap tepat, lalu `step` kembali ke 1.
+
+    Lossy: lirikan yang lebih pendek dari sekitar setengah `step` dan jatuh di
+    antara sampel bisa terlewat (persentase sedikit bergeser). `step` dibatasi
+    di bawah threshold suspicious event (2 detik), jadi run yang cukup panjang
+    untuk menjadi event selalu terkena sampel dan dianalisis penuh.
+
+    Returns:
+        dict | None: Laporan gagal jika wajah tidak ditemukan di
+        `bail_seconds` detik pertama, selain itu None.
+    """
+    bail_frames = int(bail_seconds * accumulator.fps) if bail_seconds > 0 else 0
+    face_found = False
+    max_step = max(1, min(max_step, accumulator.consecutive_threshold_frames - 1))
+
+    step = 1
+    last_direction = None
+    pending = []   # frame yang sudah dibaca tapi belum dianalisis (maks. max_step)
+
+    def flush(direction):
+        nonlocal step, last_direction
+        middle = len(pending) // 2
+        middle_direction = None
+        if last_direction is not None and direction == last_direction and len(pending) > 2:
+            middle_direction = detect_gaze_frame(backend, pending[middle])
+
+        if last_direction is None or (direction == last_direction and middle_direction in (None, direction)):
+            # Kedua ujung (dan tengah) sama: frame di antaranya dianggap searah
+            for _ in pending:
+                accumulator.update(direction)
+            if last_direction is not None:
+                step = min(step * 2, max_step)
+        else:
+            # Transisi: cari batas run secara tepat di frame yang dilewati
+            for index, frame in enumerate(pending[:-1]):
+                if index == middle and middle_direction is not None:
+                    accumulator.update(middle_direction)
+                else:
+                    accumulator.update(detect_gaze_frame(backend, frame))
+            accumulator.update(direction)
+            step = 1
+        last_direction = direction
+        pending.clear()
+
+    for frame in read_frames(cap, scale, cancel_check):
+        pending.append(frame)
+        if len(pending) < step:
+            continue
+
+        direction = detect_gaze_frame(backend, pending[-1])
+        face_found = face_found or direction != NO_FACE
+        flush(direction)
+
+        if bail_frames and not face_found and accumulator.total_frames >= bail_frames:
+            return {
+                "status": "failed",
+                "error": f"Wajah tidak terdeteksi dalam {bail_seconds:g} detik pertama video."
+            }
+
+    if pending:
+        flush(detect_gaze_frame(backend, pending[-1]))
+
+    return None
+
+
+def process_video_for_gaze(video_path, sampling=GAZE_SAMPLING, backend=None, fps=None, scale=1.0,
+                           cancel_check=None):
     """
     Fungsi utama untuk memproses video dari awal sampai akhir.
     
     Args:
         video_path (str): Path file video input.
+        sampling (str): "full" (setiap frame) atau "adaptive" (lihat `read_gaze_adaptive`).
+        backend (GazeBackend, optional): Backend yang sudah dibuat. Jika None,
+            backend baru dibuat sesuai GAZE_BACKEND dan ditutup setelah selesai.
+        fps (float, optional): FPS dari media probe; None = baca dari OpenCV.
+        scale (float): Faktor perkecil frame sebelum gaze backend (1.0 = ukuran asli).
+        cancel_check (callable, optional): Dipanggil tiap GAZE_CANCEL_CHECK_FRAMES frame;
+            raise `Cancelled` untuk berhenti.
         
     Returns:
         dict: Laporan hasil analisis (JSON compatible).
+
+    Raises:
+        Cancelled: Jika `cancel_check` membatalkan analisis.
     """
     # Validasi Input
     if not os.path.exists(video_path):
         return {"status": "failed", "error": f"File tidak ditemukan: {video_path}"}
 
-    # Inisialisasi MediaPipe Face Mesh
-    mp_face_mesh = mp.solutions.face_mesh
-    
     try:
-        # Gunakan 'with' statement untuk manajemen memori yang aman
-        with mp_face_mesh.FaceMesh(
-            static_image_mode=False,       
-            max_num_faces=1,               
-            refine_landmarks=True,         
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        ) as face_mesh:
-
-            cap = cv2.VideoCapture(video_path)
-            if not cap.isOpened():
-                return {"status": "failed", "error": "Gagal membuka file video dengan OpenCV"}
-
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            gaze_log = []
-
-            # Loop per frame
-            while cap.isOpened():
-                success, frame = cap.read()
-                if not success:
-                    break
-
-                # Konversi warna BGR (OpenCV) ke RGB (MediaPipe)
-                image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # Agar performa lebih cepat, tandai image sebagai tidak bisa diubah (not writeable)
-                image_rgb.flags.writeable = False
-                
-                # Deteksi Wajah
-                results = face_mesh.process(image_rgb)
-
-                # Analisis Hasil Deteksi
-                if results.multi_face_landmarks:
-                    face_landmarks = results.multi_face_landmarks[0]
-                    direction = get_gaze_direction(face_landmarks)
-                    gaze_log.append(direction)
-                else:
-                    gaze_log.append("Wajah Tidak Terdeteksi")
+        if backend is not None:
+            return analyze_video(video_path, backend, sampling, fps, scale, cancel_check)
 
-            # Bersihkan resource video
-            cap.release()
-            
-            # Lakukan analisis statistik pada data yang terkumpul
-            final_report = analyze_gaze_log(gaze_log, fps)
-            
-            return final_report
+        # Gunakan 'with' statement untuk manajemen memori yang aman
+        with create_gaze_backend() as new_backend:
+            return analyze_video(video_path, new_backend, sampling, fps, scale, cancel_check)
 
+    except Cancelled:
+        raise
     except Exception as e:
         return {"status": "failed", "error": f"Terjadi kesalahan sistem: {str(e)}"}
 
+
+def analyze_video(video_path, backend, sampling=GAZE_SAMPLING, fps=None, scale=1.0, cancel_check=None):
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return {"status": "failed", "error": "Gagal membuka file video dengan OpenCV"}
+
+    fps = fps or cap.get(cv2.CAP_PROP_FPS)
+
+    # Statistik dihitung langsung per frame, log per frame tidak disimpan
+    # sehingga memori tetap konstan untuk rekaman yang panjang
+    accumulator = GazeAccumulator(fps)
+
+    try:
+        if sampling == "adaptive":
+            failed = read_gaze_adaptive(cap, backend, accumulator, scale=scale, cancel_check=cancel_check)
+        else:
+            failed = read_gaze_full(cap, backend, accumulator, scale=scale, cancel_check=cancel_check)
+    finally:
+        # Bersihkan resource video
+        cap.release()
+
+    if failed:
+        return failed
+
+    # Laporan statistik dari data yang terkumpul, dengan mode sampling yang dipakai
+    report = accumulator.report()
+    if report["status"] == "success":
+        report["sampling"] = "adaptive" if sampling == "adaptive" else "full"
+    return report
+
+
 if __name__ == "__main__":
     # Ganti dengan path video lokal untuk tes
     test_video = os.path.join(os.path.dirname(__file__), "..", "assets", "videos", "interview_question_1.webm")
@@ -0,0 +1,225 @@
+import os
+from collections import namedtuple
+
+import cv2
+import mediapipe as mp
+
+from utils.config import BASE_DIR, GAZE_BACKEND, FACE_LANDMARKER_MODEL
+
+
+# =======================
+# MEASUREMENT
+# =======================
+# Posisi x (ternormalisasi 0..1) sudut mata dan iris yang dipakai
+# `get_gaze_direction`. Urutan indeks mengikuti landmark MediaPipe:
+#   mata kiri : sudut 33, sudut 133, iris 473
+#   mata kanan: sudut 362, sudut 263, iris 468
+
+GazeMeasurement = namedtuple("GazeMeasurement", [
+    "left_corner_x", "right_corner_x", "iris_center_x",
+    "left_corner_x_right_eye", "right_corner_x_right_eye", "iris_center_x_right_eye",
+])
+
+# Wajah ada tapi mata tidak bisa diukur -> "Tidak Terdeteksi"
+UNDETECTED = GazeMeasurement(None, None, None, None, None, None)
+
+
+def measurement_from_points(points):
+    """
+    Ambil measurement dari list landmark MediaPipe (478 titik, dengan iris).
+    """
+    return GazeMeasurement(
+        points[33].x, points[133].x, points[473].x,
+        points[362].x, points[263].x, points[468].x,
+    )
+
+
+# =======================
+# BACKENDS
+# =======================
+
+class GazeBackend:
+    """
+    Interface backend deteksi mata. `measure` menerima satu frame BGR dan
+    mengembalikan GazeMeasurement, UNDETECTED, atau None jika tidak ada wajah.
+    """
+
+    name = "base"
+
+    def measure(self, frame):
+        raise NotImplementedError
+
+    def reset(self):
+        """Dipanggil di antara video supaya state tracking tidak terbawa."""
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def create_face_mesh():
+    """
+    FaceMesh dengan konfigurasi yang sama untuk video file maupun stream live.
+    """
+    return mp.solutions.face_mesh.FaceMesh(
+        static_image_mode=False,
+        max_num_faces=1,
+        refine_landmarks=True,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+
+
+class FaceMeshBackend(GazeBackend):
+    """MediaPipe Solutions FaceMesh (refine_landmarks=True), perilaku asli."""
+
+    name = "facemesh"
+
+    def __init__(self):
+        self.face_mesh = create_face_mesh()
+
+    def measure(self, frame):
+        # Konversi warna BGR (OpenCV) ke RGB (MediaPipe)
+        image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        image_rgb.flags.writeable = False
+
+        results = self.face_mesh.process(image_rgb)
+        if not results.multi_face_landmarks:
+            return None
+        try:
+            return measurement_from_points(results.multi_face_landmarks[0].landmark)
+        except Exception:
+            return UNDETECTED
+
+    def reset(self):
+        self.face_mesh.reset()
+
+    def close(self):
+        self.face_mesh.close()
+
+
+class FaceLandmarkerBackend(GazeBackend):
+    """
+    MediaPipe Tasks Face Landmarker, running mode VIDEO.
+    Butuh model `face_landmarker.task` (lihat FACE_LANDMARKER_MODEL).
+    """
+
+    name = "landmarker"
+
+    # Jarak timestamp antar frame; Tasks VIDEO mode hanya butuh timestamp naik monoton
+    FRAME_INTERVAL_MS = 33
+
+    def __init__(self, model_path=FACE_LANDMARKER_MODEL):
+        from mediapipe.tasks import python as mp_tasks
+        from mediapipe.tasks.python import vision
+
+        if not os.path.isabs(model_path):
+            model_path = os.path.join(BASE_DIR, model_path)
+
+        options = vision.FaceLandmarkerOptions(
+            base_options=mp_tasks.BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.VIDEO,
+            num_faces=1,
+            min_face_detection_confidence=0.5,
+            min_face_presence_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+        self.landmarker = vision.FaceLandmarker.create_from_options(options)
+        self.timestamp_ms = 0
+
+    def measure(self, frame):
+        image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=image_rgb)
+
+        self.timestamp_ms += self.FRAME_INTERVAL_MS
+        result = self.landmarker.detect_for_video(image, self.timestamp_ms)
+        if not result.face_landmarks:
+            return None
+        try:
+            return measurement_from_points(result.face_landmarks[0])
+        except Exception:
+            return UNDETECTED
+
+    def reset(self):
+        # Tidak ada reset di Tasks API: lompatkan timestamp agar tracking mulai ulang
+        self.timestamp_ms += 1000
+
+    def close(self):
+        self.landmarker.close()
+
+
+class OpenCVEyeBackend(GazeBackend):
+    """
+    Heuristik ringan tanpa MediaPipe: Haar cascade untuk wajah dan mata,
+    iris = titik paling gelap di area mata, sudut mata = tepi kotak mata.
+    """
+
+    name = "opencv"
+
+    # Frame diperkecil ke lebar ini sebelum deteksi wajah
+    DETECT_WIDTH = 320
+
+    def __init__(self):
+        self.face_cascade = cv2.CascadeClassifier(
+            os.path.join(cv2.data.haarcascades, "haarcascade_frontalface_default.xml")
+        )
+        self.eye_cascade = cv2.CascadeClassifier(
+            os.path.join(cv2.data.haarcascades, "haarcascade_eye.xml")
+        )
+
+    def measure(self, frame):
+        height, width = frame.shape[:2]
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+        scale = min(1.0, self.DETECT_WIDTH / width)
+        small = cv2.resize(gray, None, fx=scale, fy=scale) if scale < 1.0 else gray
+        faces = self.face_cascade.detectMultiScale(small, scaleFactor=1.2, minNeighbors=5)
+        if len(faces) == 0:
+            return None
+
+        # Wajah terbesar, dikembalikan ke resolusi asli
+        fx, fy, fw, fh = [int(v / scale) for v in max(faces, key=lambda f: f[2] * f[3])]
+        upper_face = gray[fy:fy + fh // 2, fx:fx + fw]
+
+        eyes = self.eye_cascade.detectMultiScale(upper_face, scaleFactor=1.1, minNeighbors=5)
+        if len(eyes) < 2:
+            return UNDETECTED
+
+        # Dua mata terbesar, diurutkan dari kiri gambar ke kanan
+        eyes = sorted(sorted(eyes, key=lambda e: e[2] * e[3], reverse=True)[:2], key=lambda e: e[0])
+
+        values = []
+        for ex, ey, ew, eh in eyes:
+            # Buang sepertiga atas (alis), cari titik tergelap sebagai pusat iris
+            roi = upper_face[ey + eh // 3:ey + eh, ex:ex + ew]
+            roi = cv2.GaussianBlur(roi, (7, 7), 0)
+            _, _, min_loc, _ = cv2.minMaxLoc(roi)
+
+            left = fx + ex
+            values.extend([
+                left / width,
+                (left + ew) / width,
+                (left + min_loc[0]) / width,
+            ])
+
+        return GazeMeasurement(*values)
+
+
+GAZE_BACKENDS = {
+    FaceMeshBackend.name: FaceMeshBackend,
+    FaceLandmarkerBackend.name: FaceLandmarkerBackend,
+    OpenCVEyeBackend.name: OpenCVEyeBackend,
+}
+
+
+def create_gaze_backend(name=GAZE_BACKEND):
+    try:
+        backend_class = GAZE_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Gaze backend tidak dikenal: {name} (pilihan: {', '.join(GAZE_BACKENDS)})")
+    return backend_class()
@@ -0,0 +1,165 @@
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.config import GAZE_POOL_SIZE, GAZE_BACKEND, GAZE_SAMPLING, SCHED_GAZE_SLOTS
+from utils.eye_focus_detection import process_video_for_gaze
+from utils.gaze_backends import create_gaze_backend
+from utils.cpu_budget import stage_cores, pin_slot, configure_gaze_worker, configure_inprocess_gaze
+from utils.scheduler import PriorityGate, register_scheduler
+from utils.cancellation import Cancelled, current_token, check_cancelled
+
+
+# =======================
+# WORKER POOL GAZE
+# =======================
+# Setiap worker process memegang satu gaze backend (graph FaceMesh) yang
+# dibuat sekali saat worker start dan hanya di-reset di antara video.
+# Analisis gaze beberapa interview berjalan di core yang berbeda, di luar
+# GIL proses API.
+
+_worker_backend = None
+_worker_cancel_flags = None
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Pembatalan ke worker process: satu flag shared memory per job yang sedang jalan.
+# Worker mengecek flag-nya tiap GAZE_CANCEL_CHECK_FRAMES frame.
+CANCEL_SLOTS = 256
+_cancel_flags = None
+_free_slots = list(range(CANCEL_SLOTS))
+_slots_lock = threading.Lock()
+
+# Video interaktif mendapat slot worker lebih dulu; batch mengalah di antara file
+_gate = register_scheduler("gaze", PriorityGate(SCHED_GAZE_SLOTS or GAZE_POOL_SIZE))
+
+
+def _init_worker(backend_name, cores, pin, counter, cancel_flags):
+    global _worker_backend, _worker_cancel_flags
+    with counter.get_lock():
+        worker_index = counter.value
+        counter.value += 1
+    configure_gaze_worker(cores, worker_index, GAZE_POOL_SIZE, pin=pin)
+
+    _worker_backend = create_gaze_backend(backend_name)
+    _worker_cancel_flags = cancel_flags
+
+
+def _run_job(video_path, sampling, fps, scale, slot=-1):
+    def cancel_check():
+        if slot >= 0 and _worker_cancel_flags[slot]:
+            raise Cancelled("cancelled")
+
+    _worker_backend.reset()
+    return process_video_for_gaze(
+        video_path, sampling=sampling, backend=_worker_backend, fps=fps, scale=scale, cancel_check=cancel_check
+    )
+
+
+def get_gaze_pool():
+    global _pool, _cancel_flags
+    with _pool_lock:
+        if _pool is None:
+            # spawn: worker tidak ikut mewarisi model/thread dari proses API
+            context = multiprocessing.get_context("spawn")
+            if _cancel_flags is None:
+                _cancel_flags = context.Array("b", CANCEL_SLOTS, lock=False)
+            _pool = ProcessPoolExecutor(
+                max_workers=GAZE_POOL_SIZE,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(GAZE_BACKEND, stage_cores("gaze"), pin_slot() is not None, context.Value("i", 0), _cancel_flags)
+            )
+        return _pool
+
+
+def _claim_cancel_slot(token):
+    """
+    Slot flag untuk job dengan token; -1 jika tanpa token atau slot habis
+    (job tetap jalan, hanya tidak bisa dibatalkan di tengah).
+
+    Returns:
+        (int, callable): Slot dan fungsi untuk melepasnya.
+    """
+    if token is None:
+        return -1, lambda: None
+    with _slots_lock:
+        if not _free_slots:
+            return -1, lambda: None
+        slot = _free_slots.pop()
+    _cancel_flags[slot] = 0
+
+    def set_flag():
+        _cancel_flags[slot] = 1
+
+    remove_callback = token.on_cancel(set_flag)
+
+    def release():
+        remove_callback()
+        with _slots_lock:
+            _free_slots.append(slot)
+
+    return slot, release
+
+
+def _reset_pool(broken_pool):
+    global _pool
+    with _pool_lock:
+        if _pool is broken_pool:
+            _pool = None
+    broken_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_gaze_analysis(video_path, sampling=GAZE_SAMPLING, in_process=False, fps=None, scale=1.0):
+    """
+    Analisis fokus mata lewat worker pool (GAZE_POOL_SIZE > 0),
+    atau langsung di proses ini jika pool dinonaktifkan atau `in_process`
+    (mis. saat request diprofil, supaya gaze ikut terlihat di profil).
+    `fps`/`scale` biasanya dari plan media probe.
+
+    Returns:
+        dict: Laporan dari `process_video_for_gaze`.
+
+    Raises:
+        Cancelled: Token pembatalan request saat ini dibatalkan.
+    """
+    check_cancelled()
+    with _gate.slot():
+        # Bisa dibatalkan selama menunggu slot
+        check_cancelled()
+        return _run_gaze_analysis(video_path, sampling, in_process, fps, scale)
+
+
+def _run_gaze_analysis(video_path, sampling, in_process, fps, scale):
+    if GAZE_POOL_SIZE <= 0 or in_process:
+        configure_inprocess_gaze()
+        return process_video_for_gaze(video_path, sampling=sampling, fps=fps, scale=scale, cancel_check=check_cancelled)
+
+    for attempt in range(2):
+        pool = get_gaze_pool()
+        token = current_token()
+        slot, release_slot = _claim_cancel_slot(token)
+        try:
+            return pool.submit(_run_job, video_path, sampling, fps, scale, slot).result()
+        except Cancelled:
+            # Alasan asli (deadline, client putus, ...) ada di token proses ini
+            if token is not None:
+                token.check()
+            raise
+        except BrokenProcessPool:
+            # Worker mati (mis. crash di MediaPipe): buat pool baru, coba sekali lagi
+            _reset_pool(pool)
+            if attempt == 1:
+                return {"status": "failed", "error": "Gaze worker pool crashed"}
+        finally:
+            release_slot()
+
+
+def shutdown_gaze_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
@@ -0,0 +1,227 @@
+import threading
+from multiprocessing import shared_memory
+from multiprocessing.connection import Client
+
+import numpy as np
+import soundfile as sf
+
+from utils.config import INFERENCE_SOCKET, INFERENCE_AUTHKEY
+from utils.video_audio_utils import extract_audio
+from utils.scheduler import current_priority, scheduler_stats as local_scheduler_stats
+from utils.model_manager import model_stats as local_model_stats
+from utils.cancellation import check_cancelled
+
+
+# =======================
+# KONEKSI KE INFERENCE SERVER
+# =======================
+# Jika INFERENCE_SOCKET di-set, model (Whisper + evaluator) tidak dimuat di
+# proses ini. Semua inference dikirim ke inference_server.py lewat Unix socket,
+# dan audio dikirim lewat shared memory (tanpa copy ke socket).
+
+_local = threading.local()
+
+
+class InferenceServerError(RuntimeError):
+    pass
+
+
+def _get_connection():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = Client(INFERENCE_SOCKET, family="AF_UNIX", authkey=INFERENCE_AUTHKEY)
+        _local.conn = conn
+    return conn
+
+
+def _drop_connection():
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        try:
+            conn.close()
+        except OSError:
+            pass
+    _local.conn = None
+
+
+def _call(request):
+    """
+    Kirim satu request ke inference server dan tunggu balasannya.
+    Koneksi per-thread, dibuat ulang satu kali jika terputus.
+    Prioritas request saat ini ikut dikirim ke server.
+    """
+    request = {"priority": current_priority(), **request}
+    for attempt in range(2):
+        try:
+            conn = _get_connection()
+            conn.send(request)
+            response = conn.recv()
+            break
+        except (OSError, EOFError):
+            _drop_connection()
+            if attempt == 1:
+                raise
+
+    if not response.get("ok"):
+        raise InferenceServerError(response.get("error", "unknown inference server error"))
+    return response["result"]
+
+
+def _call_stream(request):
+    """
+    Seperti `_call`, tapi server membalas beberapa pesan {"segment": ...}
+    diakhiri pesan {"result": None}.
+
+    Memakai koneksi sendiri (bukan per-thread) karena generator bisa
+    dilanjutkan dari thread yang berbeda-beda. Jika request dibatalkan,
+    koneksi ditutup sehingga server berhenti mengirim chunk ke Whisper.
+    """
+    request = {"priority": current_priority(), **request}
+    conn = Client(INFERENCE_SOCKET, family="AF_UNIX", authkey=INFERENCE_AUTHKEY)
+    try:
+        conn.send(request)
+        while True:
+            response = conn.recv()
+            if not response.get("ok"):
+                raise InferenceServerError(response.get("error", "unknown inference server error"))
+            if "segment" not in response:
+                return
+            check_cancelled()
+            yield response["segment"]
+    finally:
+        conn.close()
+
+
+def _read_audio_to_shm(audio_path):
+    """
+    Baca audio langsung ke shared memory (float32), server memakai buffer yang sama.
+
+    Returns:
+        (SharedMemory, dict): Segment shm dan field request untuk server.
+    """
+    with sf.SoundFile(audio_path) as f:
+        frames = f.frames
+        shm = shared_memory.SharedMemory(create=True, size=max(frames, 1) * 4)
+        audio = np.ndarray((frames,), dtype=np.float32, buffer=shm.buf)
+        f.read(out=audio)
+        del audio
+
+        return shm, {
+            "shm": shm.name,
+            "shape": (frames,),
+            "dtype": "float32",
+            "sr": f.samplerate,
+        }
+
+
+def remote_transcribe_video(video_path, prompt="", audio_path=None):
+    # Lewat stream supaya bisa berhenti di antara chunk saat request dibatalkan
+    texts = [
+        segment["text"]
+        for segment in remote_iter_transcribe_video(video_path, prompt=prompt, audio_path=audio_path)
+    ]
+    return " ".join(texts)
+
+
+def remote_transcribe_audio(audio, sr=16000, prompt=""):
+    audio = np.asarray(audio, dtype=np.float32)
+    shm = shared_memory.SharedMemory(create=True, size=max(audio.nbytes, 1))
+    try:
+        shared = np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)
+        shared[:] = audio
+        del shared
+
+        return _call({
+            "op": "transcribe",
+            "prompt": prompt,
+            "shm": shm.name,
+            "shape": audio.shape,
+            "dtype": "float32",
+            "sr": sr,
+        })
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def remote_iter_transcribe_video(video_path, prompt="", audio_path=None):
+    shm, audio_ref = _read_audio_to_shm(audio_path or extract_audio(video_path))
+    try:
+        yield from _call_stream({"op": "transcribe_stream", "prompt": prompt, **audio_ref})
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def remote_evaluate_transcript(question_id, question, answer):
+    return _call({
+        "op": "evaluate",
+        "question_id": question_id,
+        "question": question,
+        "answer": answer,
+    })
+
+
+# =======================
+# API PUBLIK (lokal / remote)
+# =======================
+
+def transcribe_video(video_path, prompt="", audio_path=None):
+    """
+    `audio_path`: audio 16 kHz yang sudah ada (mis. proxy media); None = ekstrak dari video.
+    """
+    if INFERENCE_SOCKET:
+        return remote_transcribe_video(video_path, prompt=prompt, audio_path=audio_path)
+
+    from utils.speech_to_text import transcribe_video as local_transcribe_video
+    return local_transcribe_video(video_path, prompt=prompt, audio_path=audio_path)
+
+
+def transcribe_audio(audio, sr=16000, prompt=""):
+    if INFERENCE_SOCKET:
+        return remote_transcribe_audio(audio, sr, prompt=prompt)
+
+    from utils.speech_to_text import transcribe_audio as local_transcribe_audio
+    return local_transcribe_audio(audio, sr, prompt=prompt)
+
+
+def iter_transcribe_video(video_path, prompt="", audio_path=None):
+    """
+    Generator segmen transkrip: {"index", "start_time_seconds", "end_time_seconds", "text"}.
+    """
+    if INFERENCE_SOCKET:
+        yield from remote_iter_transcribe_video(video_path, prompt=prompt, audio_path=audio_path)
+        return
+
+    from utils.speech_to_text import iter_transcribe_video as local_iter_transcribe_video
+    yield from local_iter_transcribe_video(video_path, prompt=prompt, audio_path=audio_path)
+
+
+def evaluate_transcript(question_id, question, answer):
+    check_cancelled()
+    if INFERENCE_SOCKET:
+        return remote_evaluate_transcript(question_id, question, answer)
+
+    from utils.transcript_evaluator import evaluate_transcript as local_evaluate_transcript
+    return local_evaluate_transcript(question_id=question_id, question=question, answer=answer)
+
+
+def scheduler_stats():
+    """
+    Statistik antrean per prioritas: gaze dari proses ini, Whisper/LLM dari
+    inference server jika aktif.
+    """
+    stats = local_scheduler_stats()
+    if INFERENCE_SOCKET:
+        stats.update(_call({"op": "scheduler_stats"}))
+    return stats
+
+
+def model_stats():
+    """
+    Status model (dimuat/idle/jumlah load-unload). Jika inference server aktif,
+    model ada di sana, jadi status dan memorinya diambil dari server.
+    """
+    if INFERENCE_SOCKET:
+        return _call({"op": "model_stats"})
+    return local_model_stats()
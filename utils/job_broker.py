@@ -0,0 +1,290 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+from utils.config import JOBS_DB, BROKER_LEASE_SECONDS, BROKER_MAX_ATTEMPTS
+
+
+# =======================
+# JOB BROKER (SQLite)
+# =======================
+# Antrean batch yang dibagi beberapa node API lewat satu file SQLite di volume
+# bersama. Worker mengklaim satu video dengan lease; selama memproses, lease
+# diperpanjang (heartbeat). Lease yang habis (node mati/hang) dikembalikan ke
+# antrean oleh worker mana pun yang mengklaim berikutnya.
+#
+# Journal mode DELETE (bukan WAL): WAL butuh shared memory di host yang sama,
+# sedangkan file ini bisa dibuka dari beberapa host lewat volume bersama.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    id TEXT PRIMARY KEY,
+    folder TEXT NOT NULL,
+    payload_path TEXT,
+    submitted_by TEXT,
+    created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch_id TEXT NOT NULL REFERENCES batches(id),
+    file TEXT NOT NULL,
+    path TEXT NOT NULL,
+    question_id INTEGER,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result_id INTEGER,
+    result_json TEXT,
+    error TEXT,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_batch ON jobs(batch_id);
+"""
+
+# queued -> running -> done | failed (running kembali ke queued jika lease habis)
+JOB_STATUSES = ("queued", "running", "done", "failed")
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = set()
+
+
+def get_connection(db_path=JOBS_DB):
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(db_path)
+    if conn is None:
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        # isolation_level=None: transaksi diatur manual dengan BEGIN IMMEDIATE
+        conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.execute("PRAGMA busy_timeout=30000")
+        with _init_lock:
+            if db_path not in _initialized:
+                conn.executescript(SCHEMA)
+                _initialized.add(db_path)
+        connections[db_path] = conn
+    return conn
+
+
+class _transaction:
+    """
+    BEGIN IMMEDIATE ... COMMIT: kunci tulis diambil di awal, jadi dua worker
+    tidak bisa mengklaim job yang sama.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+# =======================
+# SUBMIT
+# =======================
+def submit_batch(entries, folder, payload_path=None, submitted_by=None, db_path=JOBS_DB):
+    """
+    Masukkan satu batch ke antrean. `entries` dari `build_manifest`;
+    entry dengan `skip_reason` tidak dijadikan job.
+
+    Returns:
+        str: batch_id
+    """
+    batch_id = uuid.uuid4().hex
+    now = _now()
+
+    conn = get_connection(db_path)
+    with _transaction(conn):
+        conn.execute(
+            "INSERT INTO batches (id, folder, payload_path, submitted_by, created_at) VALUES (?, ?, ?, ?, ?)",
+            (batch_id, os.path.abspath(folder), payload_path, submitted_by, now)
+        )
+        conn.executemany(
+            "INSERT INTO jobs (batch_id, file, path, question_id, status, updated_at) VALUES (?, ?, ?, ?, 'queued', ?)",
+            [
+                (batch_id, e["file"], os.path.abspath(e["path"]), e["question_id"], now)
+                for e in entries if "skip_reason" not in e
+            ]
+        )
+    return batch_id
+
+
+# =======================
+# CLAIM / LEASE
+# =======================
+def _requeue_expired(conn, now, max_attempts):
+    # Lease habis: ulangi, atau gagal permanen jika sudah terlalu sering
+    conn.execute(
+        """
+        UPDATE jobs SET status = 'failed', lease_owner = NULL, lease_expires = NULL,
+                        error = 'Lease expired too many times', updated_at = ?
+        WHERE status = 'running' AND lease_expires < ? AND attempts >= ?
+        """,
+        (_now(), now, max_attempts)
+    )
+    conn.execute(
+        """
+        UPDATE jobs SET status = 'queued', lease_owner = NULL, lease_expires = NULL, updated_at = ?
+        WHERE status = 'running' AND lease_expires < ?
+        """,
+        (_now(), now)
+    )
+
+
+def claim_job(worker_id, lease_seconds=BROKER_LEASE_SECONDS, max_attempts=BROKER_MAX_ATTEMPTS, db_path=JOBS_DB):
+    """
+    Ambil job tertua yang masih antre dan pasang lease atas nama `worker_id`.
+
+    Returns:
+        dict | None: Baris job (id, batch_id, file, path, question_id, attempts, payload_path).
+    """
+    now = time.time()
+    conn = get_connection(db_path)
+    with _transaction(conn):
+        _requeue_expired(conn, now, max_attempts)
+
+        row = conn.execute(
+            """
+            SELECT j.id, j.batch_id, j.file, j.path, j.question_id, j.attempts, b.payload_path
+            FROM jobs j JOIN batches b ON b.id = j.batch_id
+            WHERE j.status = 'queued' ORDER BY j.id LIMIT 1
+            """
+        ).fetchone()
+        if row is None:
+            return None
+
+        conn.execute(
+            """
+            UPDATE jobs SET status = 'running', lease_owner = ?, lease_expires = ?,
+                            attempts = attempts + 1, updated_at = ?
+            WHERE id = ?
+            """,
+            (worker_id, now + lease_seconds, _now(), row["id"])
+        )
+
+    job = dict(row)
+    job["attempts"] += 1
+    return job
+
+
+def heartbeat(job_id, worker_id, lease_seconds=BROKER_LEASE_SECONDS, db_path=JOBS_DB):
+    """
+    Perpanjang lease. False jika lease sudah hilang (habis dan diambil worker lain).
+    """
+    conn = get_connection(db_path)
+    with _transaction(conn):
+        cursor = conn.execute(
+            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND status = 'running' AND lease_owner = ?",
+            (time.time() + lease_seconds, job_id, worker_id)
+        )
+    return cursor.rowcount == 1
+
+
+def complete_job(job_id, worker_id, result, result_id=None, db_path=JOBS_DB):
+    """
+    Tulis hasil job. Diabaikan (False) jika worker ini sudah tidak memegang lease.
+    """
+    conn = get_connection(db_path)
+    with _transaction(conn):
+        cursor = conn.execute(
+            """
+            UPDATE jobs SET status = 'done', lease_owner = NULL, lease_expires = NULL,
+                            result_id = ?, result_json = ?, error = NULL, updated_at = ?
+            WHERE id = ? AND status = 'running' AND lease_owner = ?
+            """,
+            (result_id, json.dumps(result, ensure_ascii=False), _now(), job_id, worker_id)
+        )
+    return cursor.rowcount == 1
+
+
+def fail_job(job_id, worker_id, error, max_attempts=BROKER_MAX_ATTEMPTS, db_path=JOBS_DB):
+    """
+    Catat kegagalan: job kembali antre sampai `max_attempts`, lalu failed.
+    """
+    conn = get_connection(db_path)
+    with _transaction(conn):
+        cursor = conn.execute(
+            """
+            UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,
+                            lease_owner = NULL, lease_expires = NULL, error = ?, updated_at = ?
+            WHERE id = ? AND status = 'running' AND lease_owner = ?
+            """,
+            (max_attempts, error, _now(), job_id, worker_id)
+        )
+    return cursor.rowcount == 1
+
+
+# =======================
+# STATUS
+# =======================
+def get_batch(batch_id, include_results=False, db_path=JOBS_DB):
+    """
+    Progres batch: jumlah job per status, worker yang sedang memproses,
+    dan (opsional) hasil tiap video.
+
+    Returns:
+        dict | None
+    """
+    conn = get_connection(db_path)
+    batch = conn.execute("SELECT * FROM batches WHERE id = ?", (batch_id,)).fetchone()
+    if batch is None:
+        return None
+
+    rows = conn.execute(
+        """
+        SELECT id, file, question_id, status, attempts, lease_owner, result_id, error,
+               result_json, updated_at
+        FROM jobs WHERE batch_id = ? ORDER BY id
+        """,
+        (batch_id,)
+    ).fetchall()
+
+    counts = {status: 0 for status in JOB_STATUSES}
+    for row in rows:
+        counts[row["status"]] += 1
+
+    response = {
+        "batch_id": batch_id,
+        "folder": batch["folder"],
+        "created_at": batch["created_at"],
+        "total": len(rows),
+        "counts": counts,
+        "finished": counts["queued"] == 0 and counts["running"] == 0,
+        "workers": sorted({row["lease_owner"] for row in rows if row["lease_owner"]}),
+    }
+
+    if include_results:
+        response["results"] = [
+            {
+                "job_id": row["id"],
+                "file": row["file"],
+                "question_id": row["question_id"],
+                "status": row["status"],
+                "attempts": row["attempts"],
+                "result_id": row["result_id"],
+                "error": row["error"],
+                **(json.loads(row["result_json"]) if row["result_json"] else {}),
+            }
+            for row in rows
+        ]
+    return response
@@ -0,0 +1,135 @@
+import os
+import socket
+import threading
+
+from utils.config import (
+    PAYLOAD_PATH, BROKER_WORKERS, BROKER_LEASE_SECONDS, BROKER_POLL_SECONDS
+)
+from utils.cancellation import Cancelled, CancelToken, cancel_scope
+from utils.job_broker import claim_job, heartbeat, complete_job, fail_job
+from utils.media_probe import MediaRejected
+from utils.pipeline import load_payload, find_question, copy_to_temp, cleanup_temp, process_video
+from utils.results_store import try_save_result
+from utils.scheduler import priority_scope
+
+
+# =======================
+# BROKER WORKER
+# =======================
+# Thread yang mengambil video dari antrean broker (utils/job_broker.py) dan
+# memprosesnya di node ini. Setiap proses API menjalankan BROKER_WORKERS thread.
+
+def worker_name(index):
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+def _heartbeat_loop(job_id, worker_id, done, token):
+    interval = BROKER_LEASE_SECONDS / 3
+    while not done.wait(interval):
+        try:
+            alive = heartbeat(job_id, worker_id)
+        except Exception as e:
+            # Error sementara (mis. DB terkunci): coba lagi di putaran berikutnya,
+            # lease masih berlaku sampai BROKER_LEASE_SECONDS
+            print(f"[BROKER] Heartbeat job {job_id} gagal: {e}")
+            continue
+        if not alive:
+            # Job sudah diambil worker lain: hentikan pekerjaan di sini
+            print(f"[BROKER] Lease job {job_id} hilang dari {worker_id}")
+            token.cancel("lease_lost")
+            return
+
+
+def run_job(job, worker_id):
+    """
+    Proses satu job hasil `claim_job`, lalu tulis hasilnya ke broker dan results store.
+    """
+    payload = load_payload(job["payload_path"] or PAYLOAD_PATH)
+    item = find_question(payload, job["question_id"])
+    if item is None:
+        fail_job(job["id"], worker_id, f"Question ID {job['question_id']} tidak ditemukan di payload", max_attempts=0)
+        return
+
+    done = threading.Event()
+    token = CancelToken(label=f"broker:{job['file']}")
+    beat = threading.Thread(target=_heartbeat_loop, args=(job["id"], worker_id, done, token), daemon=True)
+    beat.start()
+
+    temp_video = None
+    try:
+        temp_video = copy_to_temp(job["path"])
+        with priority_scope("batch"), cancel_scope(token):
+            output = process_video(
+                temp_video,
+                question_id=job["question_id"],
+                question=item["question"]
+            )
+    except Cancelled:
+        print(f"[BROKER] Job {job['id']} dihentikan di {worker_id} (lease hilang)")
+        return
+    except MediaRejected as e:
+        # File tidak valid: diulang pun hasilnya sama
+        fail_job(job["id"], worker_id, f"Media ditolak: {e}", max_attempts=0)
+        return
+    except Exception as e:
+        fail_job(job["id"], worker_id, f"{type(e).__name__}: {e}")
+        return
+    finally:
+        done.set()
+        if temp_video is not None:
+            cleanup_temp(temp_video)
+
+    result_id = try_save_result(
+        output,
+        source="batch",
+        candidate_id=payload.get("data", {}).get("id"),
+        question_id=job["question_id"],
+        file=job["file"]
+    )
+    if not complete_job(job["id"], worker_id, output, result_id=result_id):
+        print(f"[BROKER] Hasil job {job['id']} dari {worker_id} diabaikan (lease sudah diambil worker lain)")
+
+
+def worker_loop(index, stop):
+    worker_id = worker_name(index)
+    while not stop.is_set():
+        try:
+            job = claim_job(worker_id)
+        except Exception as e:
+            print(f"[BROKER] Gagal mengklaim job: {e}")
+            job = None
+
+        if job is None:
+            stop.wait(BROKER_POLL_SECONDS)
+            continue
+
+        try:
+            run_job(job, worker_id)
+        except Exception as e:
+            # Error broker (mis. DB terkunci terlalu lama): lease akan habis dan job diulang
+            print(f"[BROKER] Job {job['id']} error: {e}")
+
+
+_stop = threading.Event()
+_threads = []
+
+
+def start_workers(count=BROKER_WORKERS):
+    if count <= 0 or _threads:
+        return
+    _stop.clear()
+    for index in range(count):
+        thread = threading.Thread(target=worker_loop, args=(index, _stop), daemon=True, name=f"broker-worker-{index}")
+        thread.start()
+        _threads.append(thread)
+
+
+def stop_workers(timeout=None):
+    """
+    Berhenti mengklaim job baru. Job yang sedang berjalan dibiarkan selesai
+    (sampai `timeout`); jika proses keburu mati, lease-nya habis dan job diulang node lain.
+    """
+    _stop.set()
+    for thread in _threads:
+        thread.join(timeout)
+    _threads.clear()
@@ -0,0 +1,167 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from utils.eye_focus_detection import GazeAccumulator, detect_gaze_frame
+from utils.gaze_backends import create_gaze_backend
+from utils.inference_client import transcribe_audio, evaluate_transcript
+from utils.config import LIVE_CHUNK_SECONDS
+
+
+SAMPLE_RATE = 16000
+
+# Satu pool kecil untuk transkripsi chunk live; chunk tetap masuk batcher Whisper
+_transcribe_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="live-asr")
+
+
+def _chunk_text(future):
+    """
+    Teks satu chunk live; "" jika transkripsinya gagal (error dicatat, sesi jalan terus).
+    """
+    try:
+        return future.result()
+    except Exception as e:
+        print(f"[LIVE] Transkripsi chunk gagal: {e}")
+        return ""
+
+
+class LiveInterviewSession:
+    """
+    State satu sesi interview live: frame webcam dianalisis begitu datang
+    (gaze backend + GazeAccumulator), audio ditranskripsi di background per
+    `LIVE_CHUNK_SECONDS`, sehingga laporan akhir hanya menunggu chunk terakhir.
+    """
+
+    def __init__(self, fps=30, question_id=None, question=None, enable_evaluator=True):
+        self.question_id = question_id
+        self.question = question
+        self.enable_evaluator = enable_evaluator and question is not None
+
+        self.backend = create_gaze_backend()
+        self.gaze = GazeAccumulator(fps)
+        self.last_direction = None
+
+        self.audio_buffer = []
+        self.audio_buffered = 0
+        self.audio_offset = 0
+        self.transcript_futures = []
+        self.transcripts_sent = 0
+        self.lock = threading.Lock()
+
+    # -----------------------------
+    # Video
+    # -----------------------------
+    def add_frame(self, image_bytes):
+        """
+        Analisis satu frame (JPEG/PNG).
+
+        Returns:
+            dict: {"frame_index", "direction", "changed", "event"}
+        """
+        frame = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            raise ValueError("Frame tidak bisa di-decode")
+
+        direction = detect_gaze_frame(self.backend, frame)
+        event = self.gaze.update(direction)
+
+        changed = direction != self.last_direction
+        self.last_direction = direction
+
+        return {
+            "frame_index": self.gaze.total_frames - 1,
+            "direction": direction,
+            "changed": changed,
+            "event": event
+        }
+
+    # -----------------------------
+    # Audio
+    # -----------------------------
+    def add_audio(self, pcm_bytes):
+        """
+        Tambah audio PCM signed 16-bit little-endian, mono, 16 kHz.
+        Setiap `LIVE_CHUNK_SECONDS` audio langsung dikirim untuk ditranskripsi.
+        """
+        samples = np.frombuffer(pcm_bytes, dtype="<i2").astype(np.float32) / 32768.0
+        self.audio_buffer.append(samples)
+        self.audio_buffered += len(samples)
+
+        chunk_size = int(SAMPLE_RATE * LIVE_CHUNK_SECONDS)
+        while self.audio_buffered >= chunk_size:
+            audio = np.concatenate(self.audio_buffer)
+            self._submit_chunk(audio[:chunk_size])
+            rest = audio[chunk_size:]
+            self.audio_buffer = [rest] if len(rest) else []
+            self.audio_buffered = len(rest)
+
+    def _submit_chunk(self, chunk):
+        start = self.audio_offset
+        self.audio_offset += len(chunk)
+        future = _transcribe_executor.submit(transcribe_audio, chunk, SAMPLE_RATE)
+        self.transcript_futures.append((start, self.audio_offset, future))
+
+    def pop_transcripts(self):
+        """
+        Segmen transkrip yang sudah selesai dan belum dikirim, sesuai urutan.
+        """
+        segments = []
+        with self.lock:
+            while self.transcripts_sent < len(self.transcript_futures):
+                start, end, future = self.transcript_futures[self.transcripts_sent]
+                if not future.done():
+                    break
+                segment = {
+                    "index": self.transcripts_sent,
+                    "start_time_seconds": round(start / SAMPLE_RATE, 2),
+                    "end_time_seconds": round(end / SAMPLE_RATE, 2),
+                    "text": _chunk_text(future)
+                }
+                if future.exception() is not None:
+                    segment["error"] = str(future.exception())
+                segments.append(segment)
+                self.transcripts_sent += 1
+        return segments
+
+    # -----------------------------
+    # Final report
+    # -----------------------------
+    def finish(self):
+        """
+        Tutup sesi dan buat laporan akhir (format sama dengan /process/single).
+        """
+        if self.audio_buffered > 0:
+            self._submit_chunk(np.concatenate(self.audio_buffer))
+            self.audio_buffer = []
+            self.audio_buffered = 0
+
+        # Chunk yang gagal ditranskripsi dilewati, laporan tetap dibuat
+        texts = [_chunk_text(future) for _, _, future in self.transcript_futures]
+        transcript_text = " ".join(text for text in texts if text)
+
+        gaze_result = self.gaze.report()
+        self.close()
+
+        evaluation = None
+        if self.enable_evaluator:
+            try:
+                evaluation = evaluate_transcript(
+                    question_id=self.question_id,
+                    question=self.question,
+                    answer=transcript_text
+                )
+            except Exception as e:
+                evaluation = {"status": "failed", "error": str(e)}
+
+        return {
+            "transcription": transcript_text,
+            "evaluation": evaluation,
+            "eye_focus": gaze_result
+        }
+
+    def close(self):
+        if self.backend is not None:
+            self.backend.close()
+            self.backend = None
@@ -0,0 +1,170 @@
+import json
+import subprocess
+
+from utils.config import (
+    MEDIA_PROBE_ENABLED, MEDIA_PROBE_TIMEOUT_SECONDS,
+    MEDIA_MIN_DURATION_SECONDS, MEDIA_MAX_DURATION_SECONDS,
+    MEDIA_GAZE_MAX_WIDTH, MEDIA_LONG_VIDEO_SECONDS, MEDIA_LONG_GAZE_MAX_WIDTH
+)
+
+
+# =======================
+# MEDIA PROBE (ffprobe)
+# =======================
+# Dijalankan sebelum transkripsi/gaze: hanya membaca header container (milidetik),
+# jadi file rusak, tanpa video, atau terlalu panjang ditolak sebelum memakai slot worker.
+
+
+class MediaRejected(ValueError):
+    """
+    File ditolak oleh pre-flight probe (tidak perlu diulang).
+    """
+
+
+def _parse_rate(rate):
+    # "30000/1001" -> 29.97; "0/0" -> None
+    try:
+        num, _, den = (rate or "").partition("/")
+        value = float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return None
+    return value if value > 0 else None
+
+
+def _parse_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def probe_media(path, timeout=MEDIA_PROBE_TIMEOUT_SECONDS):
+    """
+    Metadata media dari ffprobe.
+
+    Returns:
+        dict: {"format", "duration_seconds", "has_video", "video_codec", "width", "height",
+               "fps", "has_audio", "audio_codec", "audio_sample_rate"}.
+        `duration_seconds`/`fps` bisa None (mis. webm dari MediaRecorder tanpa durasi).
+
+    Raises:
+        MediaRejected: ffprobe tidak bisa membaca file (rusak/bukan media).
+    """
+    command = [
+        "ffprobe", "-v", "error",
+        "-print_format", "json",
+        "-show_format", "-show_streams",
+        path
+    ]
+    try:
+        completed = subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
+    except subprocess.CalledProcessError as e:
+        raise MediaRejected(f"File media tidak bisa dibaca: {e.stderr.decode(errors='replace').strip()}")
+    except subprocess.TimeoutExpired:
+        raise MediaRejected(f"ffprobe timeout setelah {timeout:g} detik")
+
+    data = json.loads(completed.stdout or b"{}")
+    streams = data.get("streams", [])
+    fmt = data.get("format", {})
+
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+
+    duration = _parse_float(fmt.get("duration"))
+    if duration is None:
+        duration = max(
+            (d for d in (_parse_float(s.get("duration")) for s in streams) if d is not None),
+            default=None
+        )
+
+    fps = None
+    if video is not None:
+        fps = _parse_rate(video.get("avg_frame_rate")) or _parse_rate(video.get("r_frame_rate"))
+        if fps is not None and fps > 100:
+            # webm sering melaporkan timebase 1000/1 sebagai frame rate
+            fps = None
+
+    return {
+        "format": fmt.get("format_name"),
+        "duration_seconds": round(duration, 2) if duration is not None else None,
+        "has_video": video is not None,
+        "video_codec": video.get("codec_name") if video else None,
+        "width": video.get("width") if video else None,
+        "height": video.get("height") if video else None,
+        "fps": round(fps, 3) if fps is not None else None,
+        "has_audio": audio is not None,
+        "audio_codec": audio.get("codec_name") if audio else None,
+        "audio_sample_rate": int(audio["sample_rate"]) if audio and audio.get("sample_rate") else None,
+    }
+
+
+def plan_processing(info):
+    """
+    Tolak atau arahkan file berdasarkan metadata, lalu pilih parameter stage.
+
+    Returns:
+        dict: {"transcribe", "gaze_fps", "gaze_scale"}
+
+    Raises:
+        MediaRejected: Tidak ada stream video, atau durasi di luar batas.
+    """
+    if not info["has_video"]:
+        raise MediaRejected("File tidak memiliki stream video")
+    if not info["width"] or not info["height"]:
+        raise MediaRejected("Resolusi video tidak terbaca (file kemungkinan rusak)")
+
+    duration = info["duration_seconds"]
+    if duration is not None:
+        if duration < MEDIA_MIN_DURATION_SECONDS:
+            raise MediaRejected(f"Video terlalu pendek ({duration:g} detik)")
+        if MEDIA_MAX_DURATION_SECONDS > 0 and duration > MEDIA_MAX_DURATION_SECONDS:
+            raise MediaRejected(
+                f"Video terlalu panjang ({duration:g} detik, maks. {MEDIA_MAX_DURATION_SECONDS:g} detik)"
+            )
+
+    max_width = MEDIA_GAZE_MAX_WIDTH
+    long_video = MEDIA_LONG_VIDEO_SECONDS > 0 and duration is not None and duration > MEDIA_LONG_VIDEO_SECONDS
+    if long_video and MEDIA_LONG_GAZE_MAX_WIDTH > 0:
+        # Video panjang: frame lebih kecil (lebih murah per frame), tanpa melewati frame
+        max_width = min(max_width, MEDIA_LONG_GAZE_MAX_WIDTH) if max_width > 0 else MEDIA_LONG_GAZE_MAX_WIDTH
+
+    scale = 1.0
+    if max_width > 0 and info["width"] > max_width:
+        scale = max_width / info["width"]
+
+    return {
+        # Tanpa audio: transkripsi dilewati (jawaban kosong), gaze tetap jalan
+        "transcribe": info["has_audio"],
+        "gaze_fps": info["fps"],
+        "gaze_scale": round(scale, 4),
+    }
+
+
+DEFAULT_PLAN = {
+    "transcribe": True,
+    "gaze_fps": None,
+    "gaze_scale": 1.0,
+}
+
+
+def preflight_media(path):
+    """
+    Probe + plan. Jika probe dinonaktifkan atau ffprobe tidak tersedia,
+    kembalikan plan default (perilaku lama).
+
+    Returns:
+        dict: Metadata dari `probe_media` plus key "plan".
+
+    Raises:
+        MediaRejected
+    """
+    if not MEDIA_PROBE_ENABLED:
+        return {"plan": dict(DEFAULT_PLAN)}
+
+    try:
+        info = probe_media(path)
+    except FileNotFoundError:
+        print("[MEDIA] ffprobe tidak ditemukan, pre-flight probe dilewati")
+        return {"plan": dict(DEFAULT_PLAN)}
+
+    return {**info, "plan": plan_processing(info)}
@@ -0,0 +1,212 @@
+import gc
+import time
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from utils.config import MODEL_IDLE_TTL_SECONDS, MODEL_MIN_AVAILABLE_MB, MODEL_CHECK_INTERVAL_SECONDS
+
+
+# =======================
+# MODEL LIFECYCLE
+# =======================
+# Model dimuat saat pertama dipakai, dilepas setelah idle MODEL_IDLE_TTL_SECONDS,
+# atau lebih awal (LRU) jika memori tersedia di bawah MODEL_MIN_AVAILABLE_MB.
+# Model yang sedang dipakai (`with managed.use()`) tidak pernah dilepas.
+
+def available_memory_mb():
+    """
+    Memori tersedia: batas cgroup v2 container jika ada, selain itu MemAvailable host.
+    """
+    try:
+        with open("/sys/fs/cgroup/memory.max") as f:
+            limit = f.read().strip()
+        if limit != "max":
+            with open("/sys/fs/cgroup/memory.current") as f:
+                current = int(f.read().strip())
+            return (int(limit) - current) / 1024 ** 2
+    except (OSError, ValueError):
+        pass
+
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+class ManagedModel:
+
+    def __init__(self, name, loader, unloader=None, idle_ttl=MODEL_IDLE_TTL_SECONDS):
+        """
+        Args:
+            name (str): Nama di metrics.
+            loader (callable): () -> objek model.
+            unloader (callable, optional): (objek) -> None, untuk model di luar proses
+                (mis. Ollama). Model lokal cukup dilepas referensinya.
+            idle_ttl (float): Detik idle sebelum dilepas (0 = tidak pernah).
+        """
+        self.name = name
+        self.loader = loader
+        self.unloader = unloader
+        self.idle_ttl = idle_ttl
+
+        self._value = None
+        self._in_use = 0
+        self._last_used = None
+        self._lock = threading.RLock()
+
+        self.loads = 0
+        self.unloads = Counter()
+        self.last_load_seconds = None
+
+    @property
+    def loaded(self):
+        return self._value is not None
+
+    def _ensure_loaded(self):
+        if self._value is None:
+            start = time.perf_counter()
+            self._value = self.loader()
+            self.last_load_seconds = round(time.perf_counter() - start, 2)
+            self.loads += 1
+            self._last_used = time.monotonic()
+            print(f"[MODEL] {self.name} dimuat ({self.last_load_seconds} s)")
+
+    def get(self):
+        """
+        Objek model (dimuat jika perlu). Untuk pemakaian yang lama, pakai `use()`
+        supaya model tidak dilepas di tengah jalan.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            self._last_used = time.monotonic()
+            return self._value
+
+    @contextmanager
+    def use(self):
+        with self._lock:
+            self._ensure_loaded()
+            self._in_use += 1
+            value = self._value
+        try:
+            yield value
+        finally:
+            with self._lock:
+                self._in_use -= 1
+                self._last_used = time.monotonic()
+
+    def idle_seconds(self, now=None):
+        if self._last_used is None:
+            return 0.0
+        return (now or time.monotonic()) - self._last_used
+
+    def unload(self, reason="manual"):
+        """
+        Lepas model jika sedang tidak dipakai. Returns True jika dilepas.
+        """
+        with self._lock:
+            if self._value is None or self._in_use > 0:
+                return False
+            value, self._value = self._value, None
+            self.unloads[reason] += 1
+
+        if self.unloader is not None:
+            try:
+                self.unloader(value)
+            except Exception as e:
+                print(f"[MODEL] Gagal melepas {self.name}: {e}")
+        del value
+        _release_memory()
+        print(f"[MODEL] {self.name} dilepas ({reason})")
+        return True
+
+    def stats(self):
+        # Tanpa lock: jangan tertahan oleh load model yang sedang berjalan
+        return {
+            "loaded": self.loaded,
+            "in_use": self._in_use,
+            "idle_seconds": round(self.idle_seconds(), 1) if self.loaded else None,
+            "idle_ttl_seconds": self.idle_ttl,
+            "loads": self.loads,
+            "last_load_seconds": self.last_load_seconds,
+            "unloads": dict(self.unloads),
+        }
+
+
+def _release_memory():
+    gc.collect()
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+
+
+# =======================
+# REGISTRY + MONITOR
+# =======================
+_models = {}
+_monitor = None
+_monitor_lock = threading.Lock()
+
+
+def register_model(name, loader, unloader=None, idle_ttl=MODEL_IDLE_TTL_SECONDS):
+    managed = ManagedModel(name, loader, unloader, idle_ttl)
+    _models[name] = managed
+    _ensure_monitor()
+    return managed
+
+
+def check_models(now=None, min_available_mb=MODEL_MIN_AVAILABLE_MB):
+    """
+    Satu putaran pengecekan: lepas model yang idle melewati TTL, lalu
+    (jika memori kurang) lepas model idle lain mulai dari yang paling lama tidak dipakai.
+    """
+    now = now or time.monotonic()
+    for managed in list(_models.values()):
+        if managed.loaded and managed.idle_ttl > 0 and managed.idle_seconds(now) >= managed.idle_ttl:
+            managed.unload("idle")
+
+    if min_available_mb <= 0:
+        return
+
+    lru = sorted(
+        (m for m in _models.values() if m.loaded),
+        key=lambda m: m.idle_seconds(now),
+        reverse=True
+    )
+    for managed in lru:
+        available = available_memory_mb()
+        if available is None or available >= min_available_mb:
+            break
+        managed.unload("memory_pressure")
+
+
+def _monitor_loop():
+    while True:
+        time.sleep(MODEL_CHECK_INTERVAL_SECONDS)
+        try:
+            check_models()
+        except Exception as e:
+            print(f"[MODEL] Pengecekan model gagal: {e}")
+
+
+def _ensure_monitor():
+    global _monitor
+    with _monitor_lock:
+        if _monitor is None:
+            _monitor = threading.Thread(target=_monitor_loop, name="model-monitor", daemon=True)
+            _monitor.start()
+
+
+def model_stats():
+    available = available_memory_mb()
+    return {
+        "available_memory_mb": round(available) if available is not None else None,
+        "models": {name: managed.stats() for name, managed in _models.items()},
+    }
@@ -0,0 +1,284 @@
+import os
+import json
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.config import PAYLOAD_PATH, CANDIDATE_MAX_WORKERS
+from utils.inference_client import transcribe_video, evaluate_transcript
+from utils.gaze_pool import run_gaze_analysis
+from utils.proxy_media import prepare_media, release_media
+from utils.scheduler import priority_scope, submit_with_context
+from utils.cancellation import Cancelled
+
+
+TRANSCRIBE_PROMPT = "This audio is an English HR interview. Transcribe clearly."
+
+
+# ======================================================
+# Payload helpers
+# ======================================================
+def load_payload(path=PAYLOAD_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def get_interview_items(payload):
+    return payload["data"]["reviewChecklists"]["interviews"]
+
+
+def find_question(payload, question_id):
+    items = get_interview_items(payload)
+    return next((q for q in items if q["positionId"] == question_id), None)
+
+
+def resolve_video_path(video_url, payload_path=PAYLOAD_PATH):
+    """
+    Mengubah `recordedVideoUrl` di payload menjadi path lokal.
+
+    Path relatif dicoba berurutan: relatif terhadap folder payload,
+    relatif terhadap working directory, lalu nama file di assets/videos.
+
+    Returns:
+        str | None: Path file yang ada, atau None jika tidak ditemukan.
+    """
+    if not video_url:
+        return None
+
+    if os.path.isabs(video_url):
+        return video_url if os.path.exists(video_url) else None
+
+    payload_dir = os.path.dirname(os.path.abspath(payload_path))
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    candidates = [
+        os.path.join(payload_dir, video_url),
+        os.path.abspath(video_url),
+        os.path.join(base_dir, "assets", "videos", os.path.basename(video_url)),
+    ]
+    for path in candidates:
+        path = os.path.normpath(path)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+# ======================================================
+# Temp file helpers
+# ======================================================
+def copy_to_temp(video_path):
+    suffix = os.path.splitext(video_path)[1]
+    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+    with open(video_path, "rb") as src:
+        shutil.copyfileobj(src, tmp)
+    tmp.flush()
+    tmp.close()
+    return tmp.name
+
+
+def cleanup_temp(temp_video_path):
+    audio_path = os.path.splitext(temp_video_path)[0] + "_audio.wav"
+    for path in (temp_video_path, audio_path):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+# ======================================================
+# Folder helpers
+# ======================================================
+SUPPORTED_EXT = {".mp4", ".webm", ".mkv", ".avi", ".mov"}
+
+
+def parse_question_id(filename):
+    try:
+        return int(filename.lower().split("question_")[1].split(".")[0])
+    except (IndexError, ValueError):
+        return None
+
+
+def build_manifest(folder_path):
+    """
+    Daftar video di folder beserta question_id, ukuran, dan mtime.
+    File tanpa `question_<id>` di nama tetap dicatat dengan `skip_reason`.
+    """
+    entries = []
+    for filename in sorted(os.listdir(folder_path)):
+        if os.path.splitext(filename)[1].lower() not in SUPPORTED_EXT:
+            continue
+
+        full_path = os.path.join(folder_path, filename)
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            # Dihapus/di-rename setelah listdir (mis. upload sementara): lewati sampai scan berikutnya
+            continue
+        question_id = parse_question_id(filename)
+
+        entry = {
+            "file": filename,
+            "path": full_path,
+            "question_id": question_id,
+            "size": stat.st_size,
+            "mtime": int(stat.st_mtime),
+        }
+        if question_id is None:
+            entry["skip_reason"] = "Nama file tidak mengandung question_<id>"
+        entries.append(entry)
+    return entries
+
+
+# ======================================================
+# Single video pipeline
+# ======================================================
+def process_video(video_path, question_id=None, question=None, enable_evaluator=True):
+    """
+    Menjalankan transkripsi, analisis fokus mata, dan evaluasi untuk satu video.
+    Media di-probe lebih dulu; file yang ditolak memunculkan `MediaRejected`
+    sebelum stage berat mana pun berjalan. Stage membaca proxy media jika ada.
+
+    Returns:
+        dict: {"transcription", "evaluation", "eye_focus", "media"}
+    """
+    media = prepare_media(video_path)
+    plan = media["plan"]
+
+    try:
+        # Tanpa stream audio: tidak ada yang ditranskripsi, jawaban dianggap kosong
+        transcript_text = transcribe_video(
+            video_path,
+            prompt=TRANSCRIBE_PROMPT,
+            audio_path=plan["audio_path"]
+        ) if plan["transcribe"] else ""
+
+        try:
+            gaze_result = run_gaze_analysis(
+                plan["gaze_video"],
+                fps=plan["gaze_fps"],
+                scale=plan["gaze_scale"]
+            )
+        except Cancelled:
+            raise
+        except Exception as e:
+            gaze_result = {"status": "failed", "error": str(e)}
+    finally:
+        # Proxy boleh di-prune setelah semua stage selesai membacanya
+        release_media(media)
+
+    evaluation = None
+    if enable_evaluator and question is not None:
+        evaluation = evaluate_transcript(
+            question_id=question_id,
+            question=question,
+            answer=transcript_text
+        )
+
+    return {
+        "transcription": transcript_text,
+        "evaluation": evaluation,
+        "eye_focus": gaze_result,
+        "media": media
+    }
+
+
+# ======================================================
+# Candidate pipeline (semua pertanyaan sekaligus)
+# ======================================================
+def _process_candidate_item(item, payload_path, enable_evaluator):
+    question_id = item["positionId"]
+    result = {
+        "question_id": question_id,
+        "question": item.get("question"),
+        "video": item.get("recordedVideoUrl"),
+    }
+
+    if not item.get("isVideoExist", True):
+        result.update({"status": "failed", "error": "Video tidak tersedia untuk pertanyaan ini"})
+        return result
+
+    video_path = resolve_video_path(item.get("recordedVideoUrl"), payload_path)
+    if video_path is None:
+        result.update({"status": "failed", "error": f"File video tidak ditemukan: {item.get('recordedVideoUrl')}"})
+        return result
+
+    temp_video = copy_to_temp(video_path)
+    try:
+        output = process_video(
+            temp_video,
+            question_id=question_id,
+            question=item.get("question"),
+            enable_evaluator=enable_evaluator
+        )
+        result.update({"status": "success", **output})
+    except Exception as e:
+        result.update({"status": "failed", "error": str(e)})
+    finally:
+        cleanup_temp(temp_video)
+
+    return result
+
+
+def aggregate_results(results):
+    """
+    Ringkasan sekumpulan hasil: rata-rata skor, fokus keseluruhan
+    (dibobot durasi video), dan total suspicious events.
+    """
+    scores = [
+        r["evaluation"]["score"] for r in results
+        if r.get("evaluation") and isinstance(r["evaluation"].get("score"), (int, float))
+    ]
+    gazes = [
+        r["eye_focus"] for r in results
+        if r.get("eye_focus") and r["eye_focus"].get("status") == "success"
+    ]
+
+    total_duration = sum(g["video_duration_seconds"] for g in gazes)
+    if total_duration > 0:
+        overall_focus = sum(g["focus_percentage"] * g["video_duration_seconds"] for g in gazes) / total_duration
+    elif gazes:
+        overall_focus = sum(g["focus_percentage"] for g in gazes) / len(gazes)
+    else:
+        overall_focus = None
+
+    return {
+        "total": len(results),
+        "processed": sum(1 for r in results if r.get("status") == "success"),
+        "mean_score": round(sum(scores) / len(scores), 2) if scores else None,
+        "overall_focus_percentage": round(overall_focus, 2) if overall_focus is not None else None,
+        "total_suspicious_events": sum(g["suspicious_event_count"] for g in gazes),
+    }
+
+
+def aggregate_candidate_results(results):
+    summary = aggregate_results(results)
+    return {
+        "questions_total": summary.pop("total"),
+        "questions_processed": summary.pop("processed"),
+        **summary
+    }
+
+
+def process_candidate(payload, payload_path=PAYLOAD_PATH, enable_evaluator=True, max_workers=CANDIDATE_MAX_WORKERS,
+                      priority="batch"):
+    """
+    Memproses semua video jawaban kandidat secara paralel memakai model
+    yang sudah dimuat di proses ini. Default berprioritas batch, jadi
+    request interaktif tidak antre di belakangnya.
+
+    Returns:
+        dict: {"candidate_id", "results", "aggregate"}
+    """
+    items = get_interview_items(payload)
+    workers = max_workers if max_workers and max_workers > 0 else max(len(items), 1)
+
+    with priority_scope(priority), ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            submit_with_context(executor, _process_candidate_item, item, payload_path, enable_evaluator)
+            for item in items
+        ]
+        results = [future.result() for future in futures]
+
+    return {
+        "candidate_id": payload.get("data", {}).get("id"),
+        "results": results,
+        "aggregate": aggregate_candidate_results(results)
+    }
@@ -0,0 +1,180 @@
+import os
+import sys
+import json
+import time
+import uuid
+import pstats
+import cProfile
+import threading
+from io import StringIO
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from utils.config import PROFILE_DIR, PROFILE_SAMPLE_INTERVAL_MS
+
+
+# =======================
+# PROFILING PER REQUEST
+# =======================
+# Opt-in per request (header `X-Profile: 1` atau form `profile=true`). Dua artefak:
+#   - <id>.pstats    : cProfile (deterministik) untuk thread yang menjalankan request
+#   - <id>.collapsed : stack sampling thread request + thread worker yang menerima
+#                      pekerjaannya (SHARED_THREADS), format collapsed untuk flamegraph.pl/speedscope
+# Thread worker dipakai bersama semua request, jadi sampelnya bisa memuat pekerjaan
+# request lain yang berjalan bersamaan (dicatat di metadata "shared_threads").
+# Jika tidak diminta, tidak ada profiler yang dibuat sama sekali.
+
+PROFILE_KINDS = {
+    "pstats": ".pstats",
+    "collapsed": ".collapsed",
+}
+
+# Thread tempat request menyerahkan pekerjaan (transkripsi di-batch di sini)
+SHARED_THREADS = ("whisper-batcher",)
+
+
+def profile_requested(header_value=None, flag=False):
+    if flag:
+        return True
+    return (header_value or "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Ambil stack thread `thread_ids` dan thread bernama `thread_names` setiap `interval` detik.
+    """
+
+    def __init__(self, interval, thread_ids=(), thread_names=()):
+        self.interval = interval
+        self.thread_ids = set(thread_ids)
+        self.thread_names = set(thread_names)
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="profile-sampler")
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id not in self.thread_ids and names.get(thread_id) not in self.thread_names:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write_collapsed(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def _profile_path(profile_id, suffix, profile_dir=PROFILE_DIR):
+    return os.path.join(profile_dir, profile_id + suffix)
+
+
+@contextmanager
+def profile_request(label, enabled, profile_dir=PROFILE_DIR):
+    """
+    Jalankan blok di bawah profiler jika `enabled`.
+
+    Yields:
+        str | None: profile_id (artefak ditulis saat blok selesai), atau None jika tidak diprofil.
+    """
+    if not enabled:
+        yield None
+        return
+
+    os.makedirs(profile_dir, exist_ok=True)
+    profile_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:8]
+    started_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    profiler = cProfile.Profile()
+    sampler = StackSampler(
+        PROFILE_SAMPLE_INTERVAL_MS / 1000,
+        thread_ids=[threading.get_ident()],
+        thread_names=SHARED_THREADS
+    )
+
+    start = time.perf_counter()
+    sampler.start()
+    profiler.enable()
+    try:
+        yield profile_id
+    finally:
+        profiler.disable()
+        sampler.stop()
+        duration = time.perf_counter() - start
+
+        profiler.dump_stats(_profile_path(profile_id, ".pstats", profile_dir))
+        sampler.write_collapsed(_profile_path(profile_id, ".collapsed", profile_dir))
+        with open(_profile_path(profile_id, ".json", profile_dir), "w", encoding="utf-8") as f:
+            json.dump({
+                "id": profile_id,
+                "label": label,
+                "started_at": started_at,
+                "duration_seconds": round(duration, 3),
+                "samples": sampler.samples,
+                "sample_interval_ms": PROFILE_SAMPLE_INTERVAL_MS,
+                "sampled_threads": [threading.current_thread().name, *SHARED_THREADS],
+                "shared_threads": list(SHARED_THREADS),
+            }, f, indent=2, ensure_ascii=False)
+
+
+# =======================
+# BACA ARTEFAK
+# =======================
+def list_profiles(profile_dir=PROFILE_DIR):
+    if not os.path.isdir(profile_dir):
+        return []
+
+    profiles = []
+    for filename in sorted(os.listdir(profile_dir), reverse=True):
+        if not filename.endswith(".json"):
+            continue
+        with open(os.path.join(profile_dir, filename), "r", encoding="utf-8") as f:
+            profiles.append(json.load(f))
+    return profiles
+
+
+def profile_file(profile_id, kind, profile_dir=PROFILE_DIR):
+    """
+    Path artefak, atau None jika id/jenis tidak valid atau file tidak ada.
+    """
+    suffix = PROFILE_KINDS.get(kind)
+    # profile_id dipakai sebagai nama file: tolak path traversal
+    if suffix is None or os.path.basename(profile_id) != profile_id:
+        return None
+
+    path = _profile_path(profile_id, suffix, profile_dir)
+    return path if os.path.exists(path) else None
+
+
+def top_functions(profile_id, limit=30, sort="cumulative", profile_dir=PROFILE_DIR):
+    """
+    Ringkasan teks pstats (fungsi teratas), untuk dilihat tanpa tool tambahan.
+    """
+    path = profile_file(profile_id, "pstats", profile_dir)
+    if path is None:
+        return None
+
+    out = StringIO()
+    pstats.Stats(path, stream=out).sort_stats(sort).print_stats(limit)
+    return out.getvalue()
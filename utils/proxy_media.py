@@ -0,0 +1,300 @@
+import os
+import json
+import time
+import fcntl
+import shutil
+import hashlib
+import tempfile
+import threading
+import subprocess
+
+from utils.config import PROXY_ENABLED, PROXY_INTERACTIVE, PROXY_DIR, PROXY_FPS, PROXY_MAX_WIDTH, PROXY_MAX_CACHE_MB
+from utils.media_probe import preflight_media
+from utils.scheduler import current_priority
+
+
+# =======================
+# PROXY MEDIA
+# =======================
+# Video asli (sering webm VP9 1080p, 30-60 fps) hanya didecode sekali, dalam satu
+# proses ffmpeg, menjadi:
+#   audio.wav  - 16 kHz mono PCM float32 (langsung dipakai Whisper, tanpa extract_audio)
+#   video.mp4  - H.264, lebar <= PROXY_MAX_WIDTH, fps <= PROXY_FPS (untuk gaze)
+# Proxy disimpan di PROXY_DIR/<sha256 isi file>_<parameter>/, jadi upload ulang
+# atau re-run file yang sama tidak mendecode video asli lagi.
+
+AUDIO_FILE = "audio.wav"
+VIDEO_FILE = "video.mp4"
+META_FILE = "meta.json"
+# flock bersama selama proxy dibaca stage (berlaku lintas proses);
+# prune_cache hanya menghapus proxy yang bisa dikunci eksklusif
+LOCK_FILE = ".lock"
+
+_locks = {}
+_locks_lock = threading.Lock()
+
+# key -> [jumlah pemakai di proses ini, file lock]
+_holds = {}
+_holds_lock = threading.Lock()
+
+
+def content_hash(path, block_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def proxy_fps(source_fps):
+    # Jangan menaikkan fps (fps filter akan menduplikasi frame)
+    if source_fps and source_fps < PROXY_FPS:
+        return source_fps
+    return PROXY_FPS
+
+
+def proxy_key(digest, fps):
+    # Parameter ikut di key: mengubah PROXY_FPS/PROXY_MAX_WIDTH membuat proxy baru
+    return f"{digest}_{PROXY_MAX_WIDTH}w_{fps:g}fps"
+
+
+def _key_lock(key):
+    with _locks_lock:
+        return _locks.setdefault(key, threading.Lock())
+
+
+def _hold(key, proxy_dir):
+    """
+    Tandai proxy sedang dipakai. False jika folder sudah terhapus (prune proses lain).
+    """
+    with _holds_lock:
+        entry = _holds.get(key)
+        if entry is not None:
+            entry[0] += 1
+            return True
+        try:
+            lock_file = open(os.path.join(proxy_dir, LOCK_FILE), "a")
+        except OSError:
+            return False
+        fcntl.flock(lock_file, fcntl.LOCK_SH)
+        # Prune bisa menghapus folder tepat sebelum kunci didapat
+        if _read_meta(proxy_dir) is None:
+            lock_file.close()
+            return False
+        _holds[key] = [1, lock_file]
+        return True
+
+
+def release_proxy(key):
+    with _holds_lock:
+        entry = _holds.get(key)
+        if entry is None:
+            return
+        entry[0] -= 1
+        if entry[0] == 0:
+            del _holds[key]
+            entry[1].close()
+
+
+def release_media(media):
+    """
+    Lepas proxy milik hasil `prepare_media` setelah semua stage selesai membacanya.
+    """
+    proxy = (media or {}).get("proxy")
+    if proxy:
+        release_proxy(proxy["key"])
+
+
+def build_proxy(video_path, output_dir, fps, has_audio=True):
+    """
+    Satu decode video asli -> audio.wav + video.mp4 di `output_dir`.
+    """
+    command = ["ffmpeg", "-v", "error", "-i", video_path]
+    if has_audio:
+        command += [
+            "-map", "0:a:0", "-vn",
+            "-acodec", "pcm_f32le",
+            "-ar", "16000",
+            "-ac", "1",
+            os.path.join(output_dir, AUDIO_FILE),
+        ]
+    command += [
+        "-map", "0:v:0", "-an",
+        "-vf", f"fps={fps:g},scale='min(iw,{PROXY_MAX_WIDTH})':-2",
+        "-c:v", "libx264", "-preset", "veryfast", "-crf", "23",
+        os.path.join(output_dir, VIDEO_FILE),
+        "-y"
+    ]
+
+    try:
+        subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to build proxy media using ffmpeg:\n{e.stderr.decode(errors='replace')}")
+
+
+def _read_meta(proxy_dir):
+    try:
+        with open(os.path.join(proxy_dir, META_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def get_proxy(video_path, media=None):
+    """
+    Proxy untuk `video_path`, dibuat jika belum ada di cache. Proxy ditandai
+    sedang dipakai (tidak di-prune) sampai `release_proxy(key)`.
+
+    Args:
+        media (dict, optional): Hasil `preflight_media` (fps, has_audio).
+
+    Returns:
+        dict: {"key", "dir", "audio_path" (None jika tanpa audio), "video_path",
+               "fps", "cached", "build_seconds"}
+    """
+    media = media or {}
+    has_audio = media.get("has_audio", True)
+    fps = proxy_fps(media.get("fps"))
+    key = proxy_key(content_hash(video_path), fps)
+    proxy_dir = os.path.join(PROXY_DIR, key)
+
+    with _key_lock(key):
+        meta = _read_meta(proxy_dir)
+        cached = meta is not None
+        if cached and not _hold(key, proxy_dir):
+            # Terhapus oleh prune di proses lain sejak dibaca: bangun ulang
+            meta, cached = None, False
+        if not cached:
+            os.makedirs(PROXY_DIR, exist_ok=True)
+            # Dibangun di folder sementara lalu di-rename (atomik), jadi proses lain
+            # tidak pernah melihat proxy setengah jadi
+            work_dir = tempfile.mkdtemp(prefix=f".{key}.", dir=PROXY_DIR)
+            try:
+                start = time.perf_counter()
+                build_proxy(video_path, work_dir, fps, has_audio=has_audio)
+                meta = {
+                    "key": key,
+                    "fps": fps,
+                    "has_audio": has_audio,
+                    "source_bytes": os.path.getsize(video_path),
+                    "build_seconds": round(time.perf_counter() - start, 2),
+                    "created_at": int(time.time()),
+                }
+                with open(os.path.join(work_dir, META_FILE), "w", encoding="utf-8") as f:
+                    json.dump(meta, f)
+                try:
+                    os.rename(work_dir, proxy_dir)
+                except OSError:
+                    # Proses lain selesai lebih dulu: pakai miliknya
+                    meta = _read_meta(proxy_dir) or meta
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+            if not _hold(key, proxy_dir):
+                raise RuntimeError(f"Proxy {key} terhapus sebelum dipakai")
+            prune_cache(keep=key)
+        else:
+            # mtime folder = terakhir dipakai (untuk prune LRU)
+            os.utime(proxy_dir)
+
+    return {
+        "key": key,
+        "dir": proxy_dir,
+        "audio_path": os.path.join(proxy_dir, AUDIO_FILE) if meta["has_audio"] else None,
+        "video_path": os.path.join(proxy_dir, VIDEO_FILE),
+        "fps": meta["fps"],
+        "cached": cached,
+        "build_seconds": meta["build_seconds"],
+    }
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def prune_cache(keep=None, max_mb=PROXY_MAX_CACHE_MB):
+    """
+    Hapus proxy yang paling lama tidak dipakai sampai cache di bawah `max_mb`.
+    Proxy yang sedang dibaca (flock bersama di proses mana pun) dilewati.
+    """
+    if max_mb <= 0 or not os.path.isdir(PROXY_DIR):
+        return
+
+    entries = []
+    for name in os.listdir(PROXY_DIR):
+        path = os.path.join(PROXY_DIR, name)
+        if name.startswith(".") or not os.path.isdir(path):
+            continue
+        try:
+            entries.append((os.path.getmtime(path), name, path, _dir_size(path)))
+        except OSError:
+            # Dihapus prune proses lain
+            continue
+
+    total = sum(size for *_, size in entries)
+    for _, name, path, size in sorted(entries):
+        if total <= max_mb * 1024 ** 2:
+            break
+        if name == keep:
+            continue
+        try:
+            lock_file = open(os.path.join(path, LOCK_FILE), "a")
+        except OSError:
+            continue
+        with lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+        total -= size
+
+
+def use_proxy():
+    """
+    Proxy dipakai untuk pekerjaan berprioritas batch; request interaktif hanya
+    jika PROXY_INTERACTIVE (membangun proxy menunda hasil pertama).
+    """
+    return PROXY_ENABLED and (PROXY_INTERACTIVE or current_priority() == "batch")
+
+
+def prepare_media(video_path):
+    """
+    Pre-flight probe lalu proxy. Plan mendapat sumber yang dipakai stage:
+    `audio_path` (None = ekstrak dari video asli) dan `gaze_video`, dengan
+    `gaze_fps`/`gaze_scale` disesuaikan ke proxy.
+
+    Jika proxy tidak dipakai (lihat `use_proxy`) atau gagal dibuat, stage
+    membaca video asli (perilaku lama).
+
+    Raises:
+        MediaRejected
+    """
+    media = preflight_media(video_path)
+    plan = media["plan"]
+    plan.update(audio_path=None, gaze_video=video_path)
+
+    if not use_proxy():
+        return media
+
+    try:
+        proxy = get_proxy(video_path, media)
+    except Exception as e:
+        print(f"[PROXY] Proxy gagal dibuat, memakai video asli: {e}")
+        return media
+
+    plan.update(
+        audio_path=proxy["audio_path"],
+        gaze_video=proxy["video_path"],
+        gaze_fps=proxy["fps"],
+        # Proxy sudah diperkecil ke PROXY_MAX_WIDTH
+        gaze_scale=1.0
+    )
+    media["proxy"] = {key: proxy[key] for key in ("key", "cached", "build_seconds")}
+    return media
@@ -0,0 +1,211 @@
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+from utils.config import RESULTS_DB, RESULTS_JOURNAL_MODE
+
+
+# =======================
+# RESULTS STORE (SQLite)
+# =======================
+# Tabel `results` berisi kolom ringkas yang diindeks untuk filter/sort,
+# tabel `result_details` berisi field besar (transkrip, evaluasi, event list)
+# yang hanya dibaca saat detail satu hasil diminta.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    candidate_id INTEGER,
+    question_id INTEGER,
+    source TEXT NOT NULL,
+    file TEXT,
+    status TEXT NOT NULL,
+    score REAL,
+    focus_percentage REAL,
+    suspicious_event_count INTEGER,
+    processed_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_candidate ON results(candidate_id);
+CREATE INDEX IF NOT EXISTS idx_results_question ON results(question_id);
+CREATE INDEX IF NOT EXISTS idx_results_score ON results(score);
+CREATE INDEX IF NOT EXISTS idx_results_focus ON results(focus_percentage);
+CREATE INDEX IF NOT EXISTS idx_results_processed_at ON results(processed_at);
+
+CREATE TABLE IF NOT EXISTS result_details (
+    result_id INTEGER PRIMARY KEY REFERENCES results(id) ON DELETE CASCADE,
+    transcript TEXT,
+    evaluation_json TEXT,
+    eye_focus_json TEXT
+);
+"""
+
+SUMMARY_COLUMNS = [
+    "id", "candidate_id", "question_id", "source", "file", "status",
+    "score", "focus_percentage", "suspicious_event_count", "processed_at",
+]
+
+ORDER_COLUMNS = {"id", "candidate_id", "question_id", "score", "focus_percentage", "processed_at"}
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = set()
+
+
+def get_connection(db_path=RESULTS_DB):
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(db_path)
+    if conn is None:
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        conn = sqlite3.connect(db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        # Sama seperti job broker: broker worker di node lain menulis ke file ini lewat volume bersama
+        if RESULTS_JOURNAL_MODE not in {"DELETE", "WAL"}:
+            raise ValueError(f"RESULTS_JOURNAL_MODE harus DELETE atau WAL, dapat {RESULTS_JOURNAL_MODE!r}")
+        conn.execute(f"PRAGMA journal_mode={RESULTS_JOURNAL_MODE}")
+        conn.execute("PRAGMA busy_timeout=30000")
+        conn.execute("PRAGMA foreign_keys=ON")
+        with _init_lock:
+            if db_path not in _initialized:
+                conn.executescript(SCHEMA)
+                _initialized.add(db_path)
+        connections[db_path] = conn
+    return conn
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def save_result(result, source, candidate_id=None, question_id=None, file=None, db_path=RESULTS_DB):
+    """
+    Simpan satu hasil pipeline ({"transcription"/"transcript", "evaluation", "eye_focus"}).
+
+    Returns:
+        int: id baris di tabel results.
+    """
+    evaluation = result.get("evaluation")
+    eye_focus = result.get("eye_focus")
+    transcript = result.get("transcription", result.get("transcript"))
+
+    score = evaluation.get("score") if isinstance(evaluation, dict) else None
+    gaze_ok = isinstance(eye_focus, dict) and eye_focus.get("status") == "success"
+    if result.get("status") == "failed":
+        status = "failed"
+    else:
+        status = "success" if gaze_ok and evaluation is not None else "partial"
+
+    if question_id is None and isinstance(evaluation, dict):
+        question_id = evaluation.get("id")
+
+    conn = get_connection(db_path)
+    with conn:
+        cursor = conn.execute(
+            """
+            INSERT INTO results (candidate_id, question_id, source, file, status, score,
+                                 focus_percentage, suspicious_event_count, processed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                candidate_id, question_id, source, file, status,
+                score if isinstance(score, (int, float)) else None,
+                eye_focus.get("focus_percentage") if gaze_ok else None,
+                eye_focus.get("suspicious_event_count") if gaze_ok else None,
+                _now(),
+            )
+        )
+        result_id = cursor.lastrowid
+        conn.execute(
+            "INSERT INTO result_details (result_id, transcript, evaluation_json, eye_focus_json) VALUES (?, ?, ?, ?)",
+            (
+                result_id,
+                transcript,
+                json.dumps(evaluation, ensure_ascii=False) if evaluation is not None else None,
+                json.dumps(eye_focus, ensure_ascii=False) if eye_focus is not None else None,
+            )
+        )
+    return result_id
+
+
+def try_save_result(*args, **kwargs):
+    """
+    Seperti `save_result`, tapi error penyimpanan tidak menggagalkan request.
+    """
+    try:
+        return save_result(*args, **kwargs)
+    except sqlite3.Error as e:
+        print(f"[RESULTS] Gagal menyimpan hasil: {e}")
+        return None
+
+
+def query_results(candidate_id=None, question_id=None, min_score=None, max_score=None,
+                  min_focus=None, max_focus=None, processed_from=None, processed_to=None,
+                  source=None, order_by="processed_at", descending=True, limit=50, offset=0,
+                  db_path=RESULTS_DB):
+    """
+    Cari hasil tersimpan (tanpa field besar).
+
+    Returns:
+        dict: {"total", "limit", "offset", "items"}
+    """
+    filters = [
+        ("candidate_id = ?", candidate_id),
+        ("question_id = ?", question_id),
+        ("score >= ?", min_score),
+        ("score <= ?", max_score),
+        ("focus_percentage >= ?", min_focus),
+        ("focus_percentage <= ?", max_focus),
+        ("processed_at >= ?", processed_from),
+        ("processed_at <= ?", processed_to),
+        ("source = ?", source),
+    ]
+    clauses = [clause for clause, value in filters if value is not None]
+    params = [value for _, value in filters if value is not None]
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    if order_by not in ORDER_COLUMNS:
+        raise ValueError(f"order_by harus salah satu dari: {', '.join(sorted(ORDER_COLUMNS))}")
+    direction = "DESC" if descending else "ASC"
+
+    conn = get_connection(db_path)
+    total = conn.execute(f"SELECT COUNT(*) FROM results {where}", params).fetchone()[0]
+    rows = conn.execute(
+        f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM results {where} "
+        f"ORDER BY {order_by} {direction}, id {direction} LIMIT ? OFFSET ?",
+        params + [limit, offset]
+    ).fetchall()
+
+    return {
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "items": [dict(row) for row in rows]
+    }
+
+
+def get_result(result_id, db_path=RESULTS_DB):
+    """
+    Satu hasil lengkap termasuk transkrip dan detail eye focus, atau None.
+    """
+    conn = get_connection(db_path)
+    row = conn.execute(
+        f"""
+        SELECT {', '.join('r.' + c for c in SUMMARY_COLUMNS)},
+               d.transcript, d.evaluation_json, d.eye_focus_json
+        FROM results r LEFT JOIN result_details d ON d.result_id = r.id
+        WHERE r.id = ?
+        """,
+        (result_id,)
+    ).fetchone()
+    if row is None:
+        return None
+
+    result = {c: row[c] for c in SUMMARY_COLUMNS}
+    result["transcription"] = row["transcript"]
+    result["evaluation"] = json.loads(row["evaluation_json"]) if row["evaluation_json"] else None
+    result["eye_focus"] = json.loads(row["eye_focus_json"]) if row["eye_focus_json"] else None
+    return result
@@ -0,0 +1,212 @@
+import time
+import queue
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+
+from utils.config import SCHED_AGING_SECONDS
+
+
+# =======================
+# PRIORITY SCHEDULER
+# =======================
+# Dua prioritas: "interactive" (reviewer menunggu hasil) dan "batch".
+# Prioritas dibawa lewat contextvar, jadi kode pipeline tidak perlu
+# meneruskannya sebagai argumen; jalur batch cukup membungkus kerjanya
+# dengan `priority_scope("batch")`.
+#
+# Interactive selalu didahulukan, kecuali item batch terdepan sudah menunggu
+# lebih dari SCHED_AGING_SECONDS (anti-starvation).
+
+PRIORITIES = ("interactive", "batch")
+
+_current_priority = contextvars.ContextVar("priority", default="interactive")
+
+
+def current_priority():
+    return _current_priority.get()
+
+
+def check_priority(priority):
+    if priority not in PRIORITIES:
+        raise ValueError(f"Prioritas harus salah satu dari: {', '.join(PRIORITIES)}, dapat {priority!r}")
+    return priority
+
+
+@contextmanager
+def priority_scope(priority):
+    token = _current_priority.set(check_priority(priority))
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def submit_with_context(executor, fn, *args, **kwargs):
+    """
+    `executor.submit` yang membawa contextvar (termasuk prioritas) ke thread worker.
+    """
+    context = contextvars.copy_context()
+    return executor.submit(context.run, fn, *args, **kwargs)
+
+
+class _PriorityStats:
+
+    def __init__(self):
+        self.completed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait):
+        self.completed += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def as_dict(self, depth, **extra):
+        return {
+            "depth": depth,
+            **extra,
+            "completed": self.completed,
+            "avg_wait_ms": round(self.total_wait / self.completed * 1000, 1) if self.completed else None,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+        }
+
+
+def _pick(queues, now, aging):
+    # Batch terdepan yang terlalu lama menunggu didahulukan, selain itu urut prioritas
+    batch = queues["batch"]
+    if batch and now - batch[0][0] >= aging:
+        return "batch"
+    for priority in PRIORITIES:
+        if queues[priority]:
+            return priority
+    return None
+
+
+class PriorityQueue:
+    """
+    Antrean item (mis. chunk audio) per prioritas dengan aging.
+    Antarmuka `get`/`get_nowait` mengikuti `queue.Queue`.
+    """
+
+    def __init__(self, aging_seconds=SCHED_AGING_SECONDS):
+        self.aging = aging_seconds
+        self._queues = {p: deque() for p in PRIORITIES}
+        self._stats = {p: _PriorityStats() for p in PRIORITIES}
+        self._cond = threading.Condition()
+
+    def put(self, item, priority=None):
+        priority = check_priority(priority or current_priority())
+        with self._cond:
+            self._queues[priority].append((time.monotonic(), item))
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                priority = _pick(self._queues, now, self.aging)
+                if priority is not None:
+                    enqueued_at, item = self._queues[priority].popleft()
+                    self._stats[priority].record(now - enqueued_at)
+                    return item
+
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise queue.Empty
+                    self._cond.wait(remaining)
+                else:
+                    self._cond.wait()
+
+    def get_nowait(self):
+        return self.get(timeout=0)
+
+    def stats(self):
+        with self._cond:
+            return {p: self._stats[p].as_dict(len(self._queues[p])) for p in PRIORITIES}
+
+
+class PriorityGate:
+    """
+    Batas jumlah pekerjaan bersamaan (mis. slot worker gaze, panggilan LLM).
+    Saat slot penuh, yang menunggu dilayani per prioritas dengan aging.
+    `slots` <= 0 berarti tanpa batas (hanya mencatat statistik).
+    """
+
+    def __init__(self, slots, aging_seconds=SCHED_AGING_SECONDS):
+        self.slots = slots
+        self.aging = aging_seconds
+        self._queues = {p: deque() for p in PRIORITIES}
+        self._active = {p: 0 for p in PRIORITIES}
+        self._stats = {p: _PriorityStats() for p in PRIORITIES}
+        self._cond = threading.Condition()
+
+    def _has_free_slot(self):
+        return self.slots <= 0 or sum(self._active.values()) < self.slots
+
+    def acquire(self, priority=None):
+        priority = check_priority(priority or current_priority())
+        waiter = (time.monotonic(), object())
+
+        with self._cond:
+            self._queues[priority].append(waiter)
+            try:
+                while True:
+                    now = time.monotonic()
+                    if self._has_free_slot() and _pick(self._queues, now, self.aging) == priority \
+                            and self._queues[priority][0] is waiter:
+                        break
+                    self._cond.wait()
+            except BaseException:
+                self._queues[priority].remove(waiter)
+                self._cond.notify_all()
+                raise
+
+            self._queues[priority].popleft()
+            self._active[priority] += 1
+            self._stats[priority].record(now - waiter[0])
+            # Waiter berikutnya mungkin juga bisa jalan (slot masih ada)
+            self._cond.notify_all()
+        return priority
+
+    def release(self, priority):
+        with self._cond:
+            self._active[priority] -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, priority=None):
+        priority = self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    def stats(self):
+        with self._cond:
+            return {
+                p: self._stats[p].as_dict(len(self._queues[p]), active=self._active[p])
+                for p in PRIORITIES
+            }
+
+
+# =======================
+# METRICS
+# =======================
+_registry = {}
+
+
+def register_scheduler(name, scheduler):
+    _registry[name] = scheduler
+    return scheduler
+
+
+def scheduler_stats():
+    """
+    Kedalaman antrean dan waktu tunggu per prioritas untuk setiap stage
+    yang terdaftar di proses ini.
+    """
+    return {name: scheduler.stats() for name, scheduler in _registry.items()}
@@ -3,71 +3,296 @@ import torch
 import soundfile as sf
 import math
 import numpy as np
+from collections import deque, namedtuple
 from transformers import WhisperProcessor, WhisperForConditionalGeneration
 from utils.video_audio_utils import extract_audio
+from utils.whisper_batcher import WhisperBatcher
+from utils.scheduler import PriorityGate, register_scheduler
+from utils.cpu_budget import configure_torch
+from utils.model_manager import register_model
+from utils.cancellation import check_cancelled
+from utils.config import (
+    WHISPER_BATCHING, WHISPER_BATCH_WINDOW_MS, WHISPER_MAX_BATCH_SIZE,
+    WHISPER_DRAFT_MODEL_DIR, WHISPER_MAX_INFLIGHT_CHUNKS, WHISPER_WEIGHTS, MODEL_PRELOAD
+)
 
 
 # =======================
 # LOAD MODEL LOKAL
 # =======================
 
+configure_torch()
+
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 MODEL_DIR = os.path.join(BASE_DIR, "models", "whisper-large-v2-en")
 
-processor = WhisperProcessor.from_pretrained(MODEL_DIR)
-model = WhisperForConditionalGeneration.from_pretrained(MODEL_DIR)
+WEIGHT_DTYPES = {
+    "fp32": torch.float32,
+    "bf16": torch.bfloat16,
+    "fp16": torch.float16,
+}
+
+
+def resolve_weights(weights=WHISPER_WEIGHTS):
+    """
+    Folder model dan dtype sesuai WHISPER_WEIGHTS. Snapshot presisi rendah
+    ada di `<MODEL_DIR>-bf16` / `<MODEL_DIR>-fp16` (lihat convert_whisper_weights.py).
+
+    Returns:
+        (str, torch.dtype)
+    """
+    if weights == "auto":
+        for name in ("bf16", "fp16"):
+            if os.path.exists(os.path.join(f"{MODEL_DIR}-{name}", "config.json")):
+                return f"{MODEL_DIR}-{name}", WEIGHT_DTYPES[name]
+        return MODEL_DIR, torch.float32
+
+    if weights not in WEIGHT_DTYPES:
+        raise ValueError(f"WHISPER_WEIGHTS harus auto/{'/'.join(WEIGHT_DTYPES)}, dapat {weights!r}")
+
+    model_dir = MODEL_DIR if weights == "fp32" else f"{MODEL_DIR}-{weights}"
+    return model_dir, WEIGHT_DTYPES[weights]
+
+
+WEIGHTS_DIR, WEIGHTS_DTYPE = resolve_weights()
 
 device = "cuda" if torch.cuda.is_available() else "cpu"
-model.to(device)
+
+CHUNK_SECONDS = 30   # 30 detik per chunk (panjang input Whisper)
+
+WhisperModels = namedtuple("WhisperModels", ["processor", "model", "draft_model"])
+
+
+def load_whisper():
+    processor = WhisperProcessor.from_pretrained(WEIGHTS_DIR)
+    # Safetensors dibaca langsung ke dtype target tanpa salinan fp32 sementara (puncak RAM
+    # saat load tidak dobel). Bobot tetap disalin ke memori anonim per proses: replika lain
+    # hanya berbagi page cache untuk pembacaan file, bukan bobot yang resident.
+    model = WhisperForConditionalGeneration.from_pretrained(
+        WEIGHTS_DIR,
+        torch_dtype=WEIGHTS_DTYPE,
+        low_cpu_mem_usage=True
+    )
+    model.to(device)
+
+    # Draft model kecil untuk speculative decoding (opsional).
+    # Harus memakai tokenizer yang sama dengan large-v2, misalnya whisper-tiny
+    # atau distil-large-v2 di folder models/.
+    draft_model = None
+    if WHISPER_DRAFT_MODEL_DIR:
+        draft_dir = WHISPER_DRAFT_MODEL_DIR
+        if not os.path.isabs(draft_dir):
+            draft_dir = os.path.join(BASE_DIR, draft_dir)
+        # Dtype harus sama dengan model utama untuk assisted generation
+        draft_model = WhisperForConditionalGeneration.from_pretrained(
+            draft_dir,
+            torch_dtype=WEIGHTS_DTYPE,
+            low_cpu_mem_usage=True
+        )
+        draft_model.to(device)
+
+    return WhisperModels(processor, model, draft_model)
+
+
+# Dilepas saat idle / memori kurang, dimuat ulang saat chunk berikutnya datang
+whisper = register_model("whisper", load_whisper)
+if MODEL_PRELOAD:
+    whisper.get()
 
 
 # =======================
 # TRANSCRIBE VIDEO
 # =======================
 
-def transcribe_video(video_path, prompt=""):
+def transcribe_video(video_path, prompt="", audio_path=None):
 
-    audio_path = extract_audio(video_path)
-    audio, sr = sf.read(audio_path)
+    texts = [segment["text"] for segment in iter_transcribe_video(video_path, prompt=prompt, audio_path=audio_path)]
 
-    if sr != 16000:
-        raise ValueError(f"Audio sample rate harus 16000Hz, dapat {sr}")
-
-    chunk_size = sr * 30   # 30 detik per chunk
-    overlap = 2 * sr   # overlap 2 detik
-    total_samples = len(audio)
-    num_chunks = math.ceil(total_samples / chunk_size)
-
-    texts = []
+    return " ".join(texts)
 
-    for i in range(num_chunks):
-        start = i * chunk_size
-        end = min((i + 1) * chunk_size, total_samples)
 
-        chunk = audio[start:end]
+def generate_texts(chunks):
+    """
+    Transkripsi beberapa chunk audio (maks. 30 detik) dalam satu `generate`.
+    """
+    with whisper.use() as models:
+        # Assisted generation di transformers hanya mendukung batch size 1
+        if models.draft_model is not None:
+            return [assisted_generate_text(models, chunk) for chunk in chunks]
 
-        inputs = processor(
-            chunk,
+        inputs = models.processor(
+            chunks,
             sampling_rate=16000,
             return_tensors="pt"
         ).to(device)
 
         with torch.no_grad():
-            predicted_ids = model.generate(
-                inputs["input_features"],
+            predicted_ids = models.model.generate(
+                inputs["input_features"].to(WEIGHTS_DTYPE),
                 task="transcribe",
                 language="en"
             )
 
-        text = processor.batch_decode(
+        texts = models.processor.batch_decode(
             predicted_ids,
             skip_special_tokens=True
-        )[0]
+        )
+
+    return [text.strip() for text in texts]
+
+
+def assisted_generate_text(models, chunk):
+    """
+    Speculative decoding: draft model mengusulkan token, large-v2 memverifikasi.
+    Decoding tetap greedy, jadi hasilnya sama dengan `generate` tanpa draft.
+    """
+    inputs = models.processor(
+        chunk,
+        sampling_rate=16000,
+        return_tensors="pt"
+    ).to(device)
+
+    with torch.no_grad():
+        predicted_ids = models.model.generate(
+            inputs["input_features"].to(WEIGHTS_DTYPE),
+            task="transcribe",
+            language="en",
+            assistant_model=models.draft_model
+        )
 
-        texts.append(text.strip())
+    return models.processor.batch_decode(
+        predicted_ids,
+        skip_special_tokens=True
+    )[0].strip()
+
+
+batcher = WhisperBatcher(
+    generate_texts,
+    window_ms=WHISPER_BATCH_WINDOW_MS,
+    max_batch_size=WHISPER_MAX_BATCH_SIZE
+) if WHISPER_BATCHING else None
+
+# Tanpa batcher: satu `generate` sekaligus, antrean tetap per prioritas
+whisper_gate = PriorityGate(1) if batcher is None else None
+
+register_scheduler("whisper", batcher or whisper_gate)
+
+
+def transcribe_audio(audio, sr=16000, prompt=""):
+
+    texts = [segment["text"] for segment in iter_transcribe_audio(audio, sr, prompt=prompt)]
 
     return " ".join(texts)
 
+
+def iter_transcribe_video(video_path, prompt="", audio_path=None):
+    """
+    `audio_path`: audio 16 kHz yang sudah ada (mis. dari proxy media), ekstraksi dilewati.
+    """
+    audio_path = audio_path or extract_audio(video_path)
+
+    yield from iter_transcribe_file(audio_path, prompt=prompt)
+
+
+def iter_audio_blocks(audio_path, chunk_seconds=CHUNK_SECONDS):
+    """
+    Baca file audio per blok float32 (satu blok = satu chunk Whisper),
+    tanpa memuat seluruh rekaman ke memori.
+
+    Yields:
+        (int, np.ndarray): Sample awal blok dan isi blok.
+    """
+    with sf.SoundFile(audio_path) as f:
+        sr = f.samplerate
+        if sr != 16000:
+            raise ValueError(f"Audio sample rate harus 16000Hz, dapat {sr}")
+
+        chunk_size = sr * chunk_seconds
+        start = 0
+        while True:
+            block = f.read(chunk_size, dtype="float32")
+            if len(block) == 0:
+                break
+            yield start, block
+            start += len(block)
+
+
+def iter_transcribe_file(audio_path, prompt=""):
+    """
+    Transkripsi bertahap langsung dari file audio. Memori tetap datar:
+    hanya chunk yang sedang di-featurize/di-decode yang ada di memori.
+    """
+    yield from iter_transcribe_blocks(iter_audio_blocks(audio_path), 16000, prompt=prompt)
+
+
+def iter_transcribe_audio(audio, sr=16000, prompt=""):
+    """
+    Transkripsi bertahap: yield setiap segmen begitu selesai di-decode.
+
+    Yields:
+        dict: {"index", "start_time_seconds", "end_time_seconds", "text"}
+    """
+    if sr != 16000:
+        raise ValueError(f"Audio sample rate harus 16000Hz, dapat {sr}")
+
+    chunk_size = sr * CHUNK_SECONDS
+    total_samples = len(audio)
+    num_chunks = math.ceil(total_samples / chunk_size)
+
+    blocks = ((i * chunk_size, audio[i * chunk_size:(i + 1) * chunk_size]) for i in range(num_chunks))
+
+    yield from iter_transcribe_blocks(blocks, sr, prompt=prompt)
+
+
+def iter_transcribe_blocks(blocks, sr=16000, prompt=""):
+    """
+    Transkripsi urutan blok (start_sample, chunk). Chunk masuk antrean batcher
+    (digabung dengan request lain), maksimal WHISPER_MAX_INFLIGHT_CHUNKS per
+    request sekaligus, dan hasilnya di-yield sesuai urutan.
+    Berhenti dengan `Cancelled` di antara chunk jika request dibatalkan.
+    """
+    pending = deque()
+    index = 0
+
+    def segment(start, end, text):
+        return {
+            "index": index,
+            "start_time_seconds": round(start / sr, 2),
+            "end_time_seconds": round(end / sr, 2),
+            "text": text
+        }
+
+    try:
+        for start, chunk in blocks:
+            check_cancelled()
+            end = start + len(chunk)
+
+            if batcher is None:
+                with whisper_gate.slot():
+                    text = generate_texts([chunk])[0]
+                yield segment(start, end, text)
+                index += 1
+                continue
+
+            pending.append((start, end, batcher.submit_async([chunk])[0]))
+            del chunk
+
+            while len(pending) >= WHISPER_MAX_INFLIGHT_CHUNKS:
+                check_cancelled()
+                start, end, future = pending.popleft()
+                yield segment(start, end, future.result())
+                index += 1
+
+        while pending:
+            check_cancelled()
+            start, end, future = pending.popleft()
+            yield segment(start, end, future.result())
+            index += 1
+    finally:
+        # Dibatalkan / generator ditutup: chunk yang masih antre tidak perlu di-decode
+        for _, _, future in pending:
+            future.cancel()
+
 # ============================= alternatif
 '''
 import os
@@ -1,21 +1,55 @@
 import json
+import threading
 import numpy as np
+from utils.cpu_budget import configure_tokenizers, configure_torch
+from utils.scheduler import PriorityGate, register_scheduler
+from utils.model_manager import register_model
+from utils.cancellation import check_cancelled
+from utils.config import (
+    EVAL_CASCADE, EVAL_MIN_WORDS, EVAL_MIN_MARGIN, EVAL_MIN_SIMILARITY, EVAL_ESCALATE_BOUNDARY,
+    SCHED_LLM_SLOTS, MODEL_IDLE_TTL_SECONDS, MODEL_PRELOAD
+)
+
+configure_tokenizers()
+
 from sentence_transformers import SentenceTransformer
 import ollama
 from utils.transcript_rubric import RUBRIC
 
 client = ollama.Client(host='http://ollama:11434')
 
+LLM_MODEL = "llama3.2"
+# Ollama ikut TTL yang sama (-1 = tetap di memori)
+LLM_KEEP_ALIVE = f"{int(MODEL_IDLE_TTL_SECONDS)}s" if MODEL_IDLE_TTL_SECONDS > 0 else -1
+
+
+def unload_llm(_client):
+    # Request kosong dengan keep_alive=0 membuat Ollama melepas model dari memori
+    _client.generate(model=LLM_MODEL, prompt="", keep_alive=0)
+
+
+llm = register_model("llm", lambda: client, unload_llm)
+
+# Panggilan Ollama per prioritas: evaluasi interaktif tidak antre di belakang batch
+llm_gate = register_scheduler("llm", PriorityGate(SCHED_LLM_SLOTS))
+
 # ============================================================
 # 1. Embedding 
 # ============================================================
-embedding_model = SentenceTransformer("sentence-transformers/all-mpnet-base-v2")
+configure_torch()
+embedder = register_model(
+    "mpnet",
+    lambda: SentenceTransformer("sentence-transformers/all-mpnet-base-v2")
+)
+if MODEL_PRELOAD:
+    embedder.get()
 
 def embed_text(text: str) -> np.ndarray:
     """
     Generate embeddings locally
     """
-    return embedding_model.encode(text)
+    with embedder.use() as embedding_model:
+        return embedding_model.encode(text)
 
 
 # ============================================================
@@ -45,11 +79,13 @@ Output JSON ONLY, like:
 }}
 """
 
-    response = client.generate(
-        model="llama3.2",
-        prompt=prompt,
-        stream=False
-    )
+    with llm.use() as llm_client:
+        response = llm_client.generate(
+            model=LLM_MODEL,
+            prompt=prompt,
+            stream=False,
+            keep_alive=LLM_KEEP_ALIVE
+        )
 
     raw = response["response"].strip()
 
@@ -69,13 +105,113 @@ Output JSON ONLY, like:
 
 
 # ============================================================
-# 3. Final evaluator
+# 3. Tier 1: Rubric Similarity (tanpa LLM)
 # ============================================================
-def evaluate_transcript(question_id: int, question: str, answer: str) -> dict:
-    scoring = llm_score_answer(question_id, question, answer)
+_level_cache = {}
+_level_lock = threading.Lock()
+
+
+def rubric_level_embeddings(question_id: int):
+    """
+    Embedding (ternormalisasi) deskripsi level 1-4 RUBRIC, di-cache per pertanyaan.
+    Level 0 ("Unanswered.") ditangani aturan jumlah kata, bukan similarity.
+    """
+    with _level_lock:
+        cached = _level_cache.get(question_id)
+    if cached is not None:
+        return cached
+
+    levels = sorted(level for level in RUBRIC[question_id] if level > 0)
+    with embedder.use() as embedding_model:
+        vectors = embedding_model.encode(
+            [RUBRIC[question_id][level] for level in levels],
+            normalize_embeddings=True
+        )
+
+    with _level_lock:
+        _level_cache[question_id] = (levels, vectors)
+    return levels, vectors
+
+
+def similarity_score_answer(question_id: int, answer: str) -> dict:
+    """
+    Skor dari level RUBRIC yang paling mirip dengan jawaban.
+
+    Returns:
+        dict: {"score", "reason", "similarity", "margin", "confident"}
+    """
+    levels, vectors = rubric_level_embeddings(question_id)
+    with embedder.use() as embedding_model:
+        answer_vector = embedding_model.encode(answer, normalize_embeddings=True)
+
+    similarities = vectors @ answer_vector
+    order = np.argsort(similarities)[::-1]
+    best, second = order[0], order[1]
+
+    score = levels[best]
+    similarity = float(similarities[best])
+    margin = float(similarities[best] - similarities[second])
+    on_boundary = {levels[best], levels[second]} == {2, 3}
+
+    confident = (
+        similarity >= EVAL_MIN_SIMILARITY
+        and margin >= EVAL_MIN_MARGIN
+        and not (EVAL_ESCALATE_BOUNDARY and on_boundary)
+    )
+
+    # Kalimat pertama deskripsi level, mis. "Specific Challenge with Basic Solution."
+    summary = RUBRIC[question_id][score].split(". ")[0].rstrip(".")
 
     return {
+        "score": score,
+        "reason": f"Closest rubric level {score}: {summary}.",
+        "similarity": round(similarity, 4),
+        "margin": round(margin, 4),
+        "confident": confident
+    }
+
+
+# ============================================================
+# 4. Final evaluator (cascade)
+# ============================================================
+def evaluate_transcript(question_id: int, question: str, answer: str, cascade: bool = EVAL_CASCADE) -> dict:
+    """
+    Nilai jawaban secara bertingkat (jika `cascade`):
+      - "rule"      : jawaban kosong/terlalu pendek -> skor 0
+      - "embedding" : level RUBRIC paling mirip, jika cukup yakin
+      - "llm"       : llama3.2 via Ollama untuk sisanya
+
+    Tanpa `cascade` semua jawaban langsung dinilai LLM (perilaku lama).
+
+    Returns:
+        dict: {"id", "score", "reason", "tier"} (+ "similarity"/"margin" dari tier 1)
+    """
+    if cascade and len((answer or "").split()) < EVAL_MIN_WORDS:
+        return {
+            "id": question_id,
+            "score": 0,
+            "reason": RUBRIC[question_id][0],
+            "tier": "rule"
+        }
+
+    first = similarity_score_answer(question_id, answer) if cascade else None
+
+    if first is not None and first["confident"]:
+        scoring, tier = first, "embedding"
+    else:
+        check_cancelled()
+        with llm_gate.slot():
+            # Request bisa dibatalkan selama antre slot LLM
+            check_cancelled()
+            scoring = llm_score_answer(question_id, question, answer)
+        tier = "llm"
+
+    result = {
         "id": question_id,
         "score": scoring["score"],
-        "reason": scoring["reason"]
+        "reason": scoring["reason"],
+        "tier": tier
     }
+    if first is not None:
+        result.update(similarity=first["similarity"], margin=first["margin"])
+    return result
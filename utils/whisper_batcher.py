@@ -0,0 +1,123 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from utils.scheduler import PriorityQueue
+
+
+# =======================
+# DYNAMIC BATCHING WHISPER
+# =======================
+# Chunk audio dari semua request yang sedang berjalan dikumpulkan selama
+# `window_ms` (atau sampai `max_batch_size`), lalu dijalankan dalam satu
+# panggilan `generate`. Hasil dikembalikan ke pemiliknya sesuai urutan.
+# Antrean berprioritas: chunk request interaktif diambil sebelum chunk batch,
+# jadi batch mengalah di antara chunk (lihat utils/scheduler.py).
+
+class WhisperBatcher:
+
+    def __init__(self, run_batch, window_ms=50, max_batch_size=8):
+        """
+        Args:
+            run_batch (callable): Fungsi list[np.ndarray] -> list[str].
+            window_ms (float): Waktu tunggu maksimum untuk mengumpulkan batch.
+            max_batch_size (int): Jumlah chunk maksimum per `generate`.
+        """
+        self.run_batch = run_batch
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+
+        self._queue = PriorityQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="whisper-batcher", daemon=True)
+                self._thread.start()
+
+    def submit_async(self, chunks, priority=None):
+        """
+        Masukkan chunk audio ke antrean tanpa menunggu.
+        `priority` default: prioritas request saat ini (`current_priority`).
+
+        Returns:
+            list[Future]: Satu future per chunk, urutan sama dengan input.
+        """
+        self._ensure_started()
+
+        futures = []
+        for chunk in chunks:
+            future = Future()
+            self._queue.put((chunk, future), priority)
+            futures.append(future)
+
+        return futures
+
+    def submit(self, chunks, priority=None):
+        """
+        Kirim chunk audio milik satu request dan tunggu hasilnya.
+
+        Returns:
+            list[str]: Teks per chunk, urutan sama dengan input.
+        """
+        if not chunks:
+            return []
+
+        return [f.result() for f in self.submit_async(chunks, priority)]
+
+    def stats(self):
+        return self._queue.stats()
+
+    def _collect(self):
+        batch = []
+        while not batch:
+            self._take(batch, self._queue.get())
+        deadline = time.monotonic() + self.window
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    # Window habis: ambil yang sudah antre saja, tanpa menunggu
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._take(batch, item)
+
+        return batch
+
+    @staticmethod
+    def _take(batch, item):
+        # Chunk milik request yang dibatalkan (future.cancel()) tidak ikut di-decode
+        if item[1].set_running_or_notify_cancel():
+            batch.append(item)
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            chunks = [chunk for chunk, _ in batch]
+            futures = [future for _, future in batch]
+            del batch
+
+            error = None
+            try:
+                texts = self.run_batch(chunks)
+            except Exception as e:
+                error = e.with_traceback(None)
+
+            # Lepas referensi ke audio sebelum pemilik dibangunkan, supaya buffer
+            # pemilik (mis. shared memory) bisa langsung ditutup
+            del chunks
+
+            if error is not None:
+                for future in futures:
+                    future.set_exception(error)
+                continue
+
+            for future, text in zip(futures, texts):
+                future.set_result(text)
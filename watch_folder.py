@@ -0,0 +1,241 @@
+import os
+import sys
+import time
+import signal
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.config import BASE_DIR, PAYLOAD_PATH, BATCH_WORKERS, WATCH_POLL_SECONDS, WATCH_STABLE_SECONDS
+from utils.pipeline import load_payload, build_manifest
+from utils.results_store import try_save_result
+from batch_runner import Checkpoint, file_key, process_entry
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:
+    INotify = None
+
+
+# =============================
+# WATCHER
+# =============================
+class FolderWatcher:
+    """
+    Menunggu perubahan folder. Dengan inotify, `wait` kembali begitu ada file
+    selesai ditulis/dipindahkan ke folder; tanpa inotify cukup tidur `timeout` detik.
+    Folder tetap di-scan ulang setiap kali, jadi event yang terlewat tidak masalah.
+    """
+
+    def __init__(self, folder):
+        self.inotify = None
+        if INotify is not None:
+            try:
+                self.inotify = INotify()
+                self.inotify.add_watch(folder, flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE)
+            except OSError as e:
+                # mis. batas max_user_watches, atau filesystem jaringan
+                print(f"⚠️ inotify tidak tersedia ({e}), memakai polling.")
+                self.inotify = None
+
+    @property
+    def mode(self):
+        return "inotify" if self.inotify is not None else "polling"
+
+    def wait(self, timeout):
+        if self.inotify is None:
+            time.sleep(timeout)
+            return
+        self.inotify.read(timeout=int(timeout * 1000))
+
+    def close(self):
+        if self.inotify is not None:
+            self.inotify.close()
+
+
+# =============================
+# WATCH LOOP
+# =============================
+class WatchRunner:
+
+    def __init__(self, folder, output_dir, workers=BATCH_WORKERS, payload_path=PAYLOAD_PATH,
+                 retry_failed=True, stable_seconds=WATCH_STABLE_SECONDS):
+        self.folder = folder
+        self.payload_path = payload_path
+        self.workers = max(1, workers)
+        self.stable_seconds = stable_seconds
+
+        os.makedirs(output_dir, exist_ok=True)
+        self.checkpoint = Checkpoint(os.path.join(output_dir, "checkpoint.jsonl"))
+        # Status tersimpan lintas restart; yang gagal diulang sekali saat start jika retry_failed
+        self.done = {
+            key: record for key, record in self.checkpoint.load().items()
+            if record["status"] == "success" or not retry_failed
+        }
+
+        self.inflight = set()
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="watch")
+        self.stop = threading.Event()
+
+        self._seen = {}       # path -> ((size, mtime), pertama kali terlihat dengan ukuran itu)
+        self._skipped = set()
+        self._payload = None
+        self._payload_mtime = None
+
+    def payload(self):
+        """
+        Payload dibaca ulang jika berubah (kandidat/pertanyaan baru). Jika file
+        sedang ditulis ulang atau hilang, payload terakhir tetap dipakai
+        (None jika belum pernah terbaca).
+        """
+        try:
+            mtime = os.path.getmtime(self.payload_path)
+            if mtime != self._payload_mtime:
+                self._payload = load_payload(self.payload_path)
+                self._payload_mtime = mtime
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Payload tidak terbaca ({e}), dicoba lagi di scan berikutnya", flush=True)
+        return self._payload
+
+    def is_stable(self, entry, now):
+        """
+        True jika ukuran dan mtime file tidak berubah selama `stable_seconds`.
+        """
+        signature = (entry["size"], entry["mtime"])
+        seen = self._seen.get(entry["path"])
+        if seen is None or seen[0] != signature:
+            self._seen[entry["path"]] = (signature, now)
+            return False
+        return entry["size"] > 0 and now - seen[1] >= self.stable_seconds
+
+    def scan(self):
+        """
+        Submit file yang baru dan sudah stabil. Returns jumlah file yang masih menunggu stabil.
+        """
+        now = time.monotonic()
+        waiting = 0
+        for entry in build_manifest(self.folder):
+            if "skip_reason" in entry:
+                if entry["file"] not in self._skipped:
+                    self._skipped.add(entry["file"])
+                    print(f"⚠️ Dilewati: {entry['file']} ({entry['skip_reason']})")
+                continue
+
+            key = file_key(entry)
+            with self.lock:
+                if key in self.done or key in self.inflight:
+                    continue
+
+            if not self.is_stable(entry, now):
+                waiting += 1
+                continue
+
+            payload = self.payload()
+            if payload is None:
+                waiting += 1
+                continue
+
+            with self.lock:
+                self.inflight.add(key)
+            self._seen.pop(entry["path"], None)
+            self.executor.submit(self.run_entry, entry, payload)
+        return waiting
+
+    def run_entry(self, entry, payload):
+        key = file_key(entry)
+        try:
+            record = process_entry(entry, payload)
+            # Hasil ditulis per file: checkpoint (status restart) + results store (query/API)
+            self.checkpoint.append(record)
+            if record["status"] == "success":
+                try_save_result(
+                    record,
+                    source="watch",
+                    candidate_id=payload.get("data", {}).get("id"),
+                    question_id=entry["question_id"],
+                    file=entry["file"]
+                )
+            with self.lock:
+                self.done[key] = record
+
+            status = "✅" if record["status"] == "success" else "❌"
+            print(f"{status} {record['file']} ({record.get('elapsed_seconds', 0)} s)", flush=True)
+        except Exception as e:
+            print(f"❌ {entry['file']}: {type(e).__name__}: {e}", flush=True)
+            # Tanpa ini file langsung di-submit lagi di scan berikutnya (error berulang terus)
+            record = {
+                "key": key,
+                "file": entry["file"],
+                "question_id": entry["question_id"],
+                "status": "failed",
+                "error": f"{type(e).__name__}: {e}",
+            }
+            try:
+                self.checkpoint.append(record)
+            except Exception as write_error:
+                print(f"❌ Checkpoint gagal ditulis untuk {entry['file']}: {write_error}", flush=True)
+            with self.lock:
+                self.done[key] = record
+        finally:
+            with self.lock:
+                self.inflight.discard(key)
+
+    def run(self, poll_seconds=WATCH_POLL_SECONDS):
+        watcher = FolderWatcher(self.folder)
+        print(f"👀 Memantau {os.path.abspath(self.folder)} ({watcher.mode}, {self.workers} worker). Ctrl+C untuk berhenti.")
+        try:
+            while not self.stop.is_set():
+                waiting = self.scan()
+                # Ada file yang sedang ditulis: cek lagi segera setelah bisa stabil
+                timeout = min(poll_seconds, self.stable_seconds) if waiting else poll_seconds
+                watcher.wait(timeout)
+        finally:
+            watcher.close()
+            print("⏹️ Berhenti memantau, menunggu video yang sedang diproses...")
+            # Video yang belum selesai tidak masuk checkpoint, jadi diproses lagi saat start berikutnya
+            self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+# =============================
+# ENTRYPOINT
+# =============================
+def main():
+    parser = argparse.ArgumentParser(description="Pantau folder dan proses video question_<id>.* begitu selesai ditulis.")
+    parser.add_argument("folder", help="Folder yang dipantau")
+    parser.add_argument("--output", help="Folder checkpoint (default: data/watch_runs/<nama folder>)")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="Jumlah video yang diproses bersamaan")
+    parser.add_argument("--payload", default=PAYLOAD_PATH, help="Path payload.json")
+    parser.add_argument("--poll", type=float, default=WATCH_POLL_SECONDS, help="Interval scan ulang (detik)")
+    parser.add_argument("--stable", type=float, default=WATCH_STABLE_SECONDS,
+                        help="Detik tanpa perubahan ukuran sebelum file diproses")
+    parser.add_argument("--no-retry-failed", action="store_true", help="Jangan ulangi file yang gagal di run sebelumnya")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.folder):
+        print(f"❌ Folder tidak ditemukan: {args.folder}")
+        sys.exit(1)
+
+    output_dir = args.output or os.path.join(
+        BASE_DIR, "data", "watch_runs", os.path.basename(os.path.normpath(args.folder))
+    )
+
+    runner = WatchRunner(
+        args.folder,
+        output_dir,
+        workers=args.workers,
+        payload_path=args.payload,
+        retry_failed=not args.no_retry_failed,
+        stable_seconds=args.stable
+    )
+    # docker stop mengirim SIGTERM: berhenti dengan rapi seperti Ctrl+C
+    signal.signal(signal.SIGTERM, lambda *_: runner.stop.set())
+
+    try:
+        runner.run(poll_seconds=args.poll)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()